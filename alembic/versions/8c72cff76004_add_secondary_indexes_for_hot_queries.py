@@ -0,0 +1,56 @@
+"""Add secondary indexes for hot queries
+
+Revision ID: 8c72cff76004
+Revises: 5801403ae0e1
+Create Date: 2026-10-18 11:40:07.552914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa  # noqa: F401
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c72cff76004'
+down_revision: Union[str, Sequence[str], None] = '5801403ae0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя индекса, таблица, колонки)
+INDEXES = [
+    # ProductRepository.get_by_category_id -> публичный /api/products
+    ('ix_products_category_id', 'products', ['category_id']),
+    # OrderItemRepository.get_by_order_id -> детали заказа в админке
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    # Админский список заказов: диапазон дат и keyset по (created_at, id)
+    ('ix_orders_created_at_id', 'orders', ['created_at', 'id']),
+    ('ix_orders_status', 'orders', ['status']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в таблицы, но не может выполняться
+    # внутри транзакции — поэтому autocommit_block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
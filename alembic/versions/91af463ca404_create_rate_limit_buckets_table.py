@@ -0,0 +1,34 @@
+"""Create rate_limit_buckets table
+
+Revision ID: 91af463ca404
+Revises: 8f1921e40420
+Create Date: 2026-10-18 16:48:12.530672
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '91af463ca404'
+down_revision: Union[str, Sequence[str], None] = '8f1921e40420'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # UNLOGGED: состояние rate limit не переживает падение сервера — и не должно
+    op.create_table('rate_limit_buckets',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('tat', sa.Float(precision=53), nullable=False),
+    sa.PrimaryKeyConstraint('key'),
+    prefixes=['UNLOGGED'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rate_limit_buckets')
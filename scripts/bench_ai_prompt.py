@@ -0,0 +1,84 @@
+"""
+Бенчмарк сборки промпта AI-консультанта.
+
+Сравнивает прежнюю сборку (каждая строка каталога форматируется заново на
+каждую консультацию) с готовым блоком каталога из ProductIndex и с
+предотбором top-K кандидатов. БД и Gemini не используются.
+
+Запуск:  python scripts/bench_ai_prompt.py [--products 10000] [--calls 200]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.application.services.ai_prompt import build_prompt, format_product_line
+from src.domain.entities.product import Product
+from src.infrastructure.search.product_index import ProductIndex
+
+QUERY = "Ищу игровой ноутбук с хорошим экраном для работы с графикой"
+
+_WORDS = (
+    "ноутбук игровой экран мощный лёгкий беспроводные наушники клавиатура "
+    "механическая мышь монитор видеокарта процессор память быстрый тихий "
+    "компактный подсветка батарея автономность графика работа учёба"
+).split()
+
+
+def make_products(count: int) -> list[Product]:
+    rnd = random.Random(0)
+    return [
+        Product(
+            id=i,
+            name=" ".join(rnd.choices(_WORDS, k=3)).capitalize(),
+            description=" ".join(rnd.choices(_WORDS, k=25)),
+            price=Decimal(rnd.randint(1000, 300000)),
+            category_id=rnd.randint(1, 20),
+            created_at=datetime(2025, 1, 1),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def bench(label: str, build, calls: int) -> None:
+    prompt = build()
+    started = time.perf_counter()
+    for _ in range(calls):
+        build()
+    per_call = (time.perf_counter() - started) / calls * 1e3
+    print(f"{label}: {per_call:.3f} ms/prompt, {len(prompt)} chars")
+
+
+def main(count: int, calls: int) -> None:
+    products = make_products(count)
+
+    started = time.perf_counter()
+    index = ProductIndex()
+    index.rebuild(products)
+    print(f"ProductIndex.rebuild({count}): {(time.perf_counter() - started) * 1e3:.1f} ms (once per version)")
+
+    bench(
+        "per-request formatting (old)",
+        lambda: build_prompt("\n".join(format_product_line(p) for p in products), QUERY),
+        calls,
+    )
+    bench("prebuilt catalog block", lambda: build_prompt(index.catalog_block(), QUERY), calls)
+    bench(
+        "top-20 candidates",
+        lambda: build_prompt(index.context_block(index.search(QUERY, 20)), QUERY),
+        calls,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    main(args.products, args.calls)
@@ -0,0 +1,82 @@
+"""
+Бенчмарк проверки Telegram WebApp initData.
+
+Замеряет validate_telegram_data напрямую и эндпоинт
+POST /api/v1/auth/telegram/validate через in-process сервер aiohttp.
+Один и тот же initData отправляется многократно, как при повторных
+открытиях WebApp в одной сессии.
+
+Запуск:  python scripts/bench_telegram_auth.py [--calls 20000] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.infrastructure.config import settings
+from src.presentation.web.api_handlers import routes
+from src.presentation.web.auth.telegram import validate_telegram_data
+
+
+def signed_payload() -> dict:
+    """initData, подписанный так же, как его проверяет сервер."""
+    payload = {
+        "auth_date": str(int(time.time())),
+        "query_id": "AAHdF6IQAAAAAN0XohDhrOrc",
+        "user": {"id": 123456789, "first_name": "Bench", "username": "bench"},
+    }
+    secret_key = hashlib.sha256(settings.bot.token.get_secret_value().encode()).digest()
+    check_string = "\n".join(f"{k}={payload[k]}" for k in sorted(payload))
+    payload["hash"] = hmac.new(secret_key, check_string.encode(), hashlib.sha256).hexdigest()
+    return payload
+
+
+async def bench_function(payload: dict, calls: int) -> float:
+    assert (await validate_telegram_data(dict(payload)))["status"] == "ok"
+    started = time.perf_counter()
+    for _ in range(calls):
+        await validate_telegram_data(dict(payload))
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+async def bench_endpoint(payload: dict, requests: int) -> float:
+    app = web.Application()
+    app.add_routes(routes)
+    body = json.dumps(payload)
+    async with TestClient(TestServer(app)) as client:
+        started = time.perf_counter()
+        for _ in range(requests):
+            resp = await client.post(
+                "/api/v1/auth/telegram/validate",
+                data=body,
+                headers={"Content-Type": "application/json"},
+            )
+            assert resp.status == 200
+            await resp.read()
+        return requests / (time.perf_counter() - started)
+
+
+async def main(calls: int, requests: int) -> None:
+    payload = signed_payload()
+    per_call = await bench_function(payload, calls)
+    print(f"validate_telegram_data: {per_call:.2f} us/call ({calls} calls)")
+    rps = await bench_endpoint(payload, requests)
+    print(f"POST /api/v1/auth/telegram/validate: {rps:.0f} req/s ({requests} requests)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.requests))
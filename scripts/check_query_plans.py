@@ -0,0 +1,175 @@
+"""
+Проверка планов запросов репозиториев («index advisor»).
+
+Скрипт вызывает методы репозиториев против настоящей БД, перехватывает
+сгенерированный SQL, выполняет для каждого запроса EXPLAIN и завершается
+с кодом 1, если в плане есть Seq Scan по таблице из списка проверяемых.
+
+Запуск:  python scripts/check_query_plans.py [--min-rows 0]
+
+По умолчанию планировщику запрещены последовательные сканы
+(SET enable_seqscan = off), поэтому на маленькой dev-базе Seq Scan в плане
+означает, что для запроса просто нет подходящего индекса. Методы, которые
+по смыслу читают всю таблицу (get_all), не проверяются.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.application.contracts.order.order_repository import OrderQuery
+from src.application.interfaces.repositories.product_repository import ProductQuery
+from src.domain.entities.order import OrderStatus
+from src.domain.entities.user import User as DomainUser
+from src.infrastructure.config import settings
+from src.infrastructure.database.repositories.category_repository import (
+    CategoryRepository,
+)
+from src.infrastructure.database.repositories.idempotency_repository import (
+    IdempotencyRepository,
+)
+from src.infrastructure.database.repositories.order_repository import (
+    OrderItemRepository,
+    OrderRepository,
+)
+from src.infrastructure.database.repositories.outbox_repository import (
+    OutboxRepository,
+)
+from src.infrastructure.database.repositories.product_repository import (
+    ProductRepository,
+)
+from src.infrastructure.database.repositories.user_repository import UserRepository
+
+CHECKED_TABLES = {
+    "products",
+    "orders",
+    "order_items",
+    "users",
+    "outbox_messages",
+    "idempotency_keys",
+}
+
+
+def repository_calls(session: AsyncSession):
+    """(название, фабрика корутины) для каждого проверяемого запроса репозиториев."""
+    products = ProductRepository(session)
+    orders = OrderRepository(session)
+    order_items = OrderItemRepository(session)
+    users = UserRepository(session)
+    categories = CategoryRepository(session)
+    outbox = OutboxRepository(session)
+    idempotency = IdempotencyRepository(session)
+    buyers = [DomainUser(id=0, telegram_id=i, full_name="check", username=None) for i in (1, 2)]
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+
+    return [
+        ("products.get_by_id", lambda: products.get_by_id(1)),
+        ("products.get_by_ids", lambda: products.get_by_ids([1, 2, 3])),
+        ("products.get_by_category_id", lambda: products.get_by_category_id(1)),
+        ("products.find(category)", lambda: products.find(ProductQuery(category_id=1, limit=20))),
+        ("products.find(after_id)", lambda: products.find(ProductQuery(limit=20, after_id=100))),
+        ("products.find(search)", lambda: products.find(ProductQuery(search="ноут", limit=20))),
+        ("products.count(category)", lambda: products.count(ProductQuery(category_id=1))),
+        (
+            "products.find(search, relevance)",
+            lambda: products.find(ProductQuery(search="ноут", order_by="relevance", limit=20)),
+        ),
+        ("orders.get_by_id", lambda: orders.get_by_id(1)),
+        ("orders.get_with_items", lambda: orders.get_with_items(1)),
+        ("orders.find(status)", lambda: orders.find(OrderQuery(status=OrderStatus.PAID, limit=50))),
+        (
+            "orders.find(created range)",
+            lambda: orders.find(OrderQuery(created_from=week_ago, created_to=now, limit=50)),
+        ),
+        ("orders.find(after)", lambda: orders.find(OrderQuery(limit=50, after=(now, 1000)))),
+        ("orders.count(status)", lambda: orders.count(OrderQuery(status=OrderStatus.PENDING))),
+        ("order_items.get_by_order_id", lambda: order_items.get_by_order_id(1)),
+        ("users.get_by_id", lambda: users.get_by_id(1)),
+        ("users.get_by_telegram_id", lambda: users.get_by_telegram_id(1)),
+        ("users.upsert", lambda: users.upsert(buyers[0])),
+        ("users.upsert_many", lambda: users.upsert_many(buyers)),
+        ("idempotency.get", lambda: idempotency.get(1, "check")),
+        ("categories.get_by_id", lambda: categories.get_by_id(1)),
+        ("outbox.claim_batch", lambda: outbox.claim_batch(50)),
+    ]
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    """Имена таблиц, которые план читает последовательным сканом."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+async def check_query_plans(min_rows: int) -> int:
+    engine = create_async_engine(settings.db.url)
+    captured: list[tuple[str, object]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "INSERT")):
+            captured.append((statement, parameters))
+
+    problems: list[str] = []
+    async with engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        rows = await conn.execute(
+            text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'")
+        )
+        # reltuples = -1 у ещё не проанализированных таблиц
+        table_rows = {name: max(int(tuples), 0) for name, tuples in rows}
+
+        session = AsyncSession(bind=conn)
+        for name, call in repository_calls(session):
+            captured.clear()
+            event.listen(conn.sync_connection, "before_cursor_execute", _capture)
+            try:
+                await call()
+            finally:
+                event.remove(conn.sync_connection, "before_cursor_execute", _capture)
+
+            for statement, parameters in captured:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar_one()[0]["Plan"]
+                for table in _seq_scans(plan):
+                    if table in CHECKED_TABLES and table_rows.get(table, 0) >= min_rows:
+                        problems.append(f"{name}: Seq Scan on {table}")
+            print(f"checked {name}")
+        await session.close()
+        # UPDATE (аренда outbox) и upsert пользователей выполнялись
+        # по-настоящему — откатываем
+        await conn.rollback()
+
+    await engine.dispose()
+
+    if problems:
+        print("\nQueries without a usable index:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print("\nAll repository queries use indexes.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=0,
+        help="игнорировать Seq Scan по таблицам меньше этого числа строк (оценка pg_class)",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(check_query_plans(args.min_rows)))
@@ -0,0 +1,48 @@
+# src/application/contracts/ai/product_index.py
+from __future__ import annotations
+from typing import Awaitable, Callable, Iterable, Protocol
+
+from src.domain.entities.product import Product
+
+
+class IProductIndex(Protocol):
+    """Локальный полнотекстовый индекс товаров для предотбора кандидатов AI."""
+
+    # Растёт при каждом изменении содержимого индекса
+    version: int
+
+    def is_stale(self) -> bool:
+        """True, если индекс ещё не построен или устарел и его надо перестроить."""
+        ...
+
+    def rebuild(self, products: Iterable[Product]) -> None:
+        ...
+
+    async def refresh(self, load: Callable[[], Awaitable[Iterable[Product]]]) -> None:
+        """Перестраивает устаревший индекс по load(); одна перестройка на всех ждущих."""
+        ...
+
+    def upsert(self, product: Product) -> None:
+        ...
+
+    def remove(self, product_id: int) -> None:
+        ...
+
+    def __contains__(self, product_id: object) -> bool:
+        """True, если товар с таким id есть в индексе."""
+        ...
+
+    def search(self, query: str, limit: int) -> list[Product]:
+        """
+        До limit товаров, наиболее релевантных запросу, по убыванию релевантности.
+        Если запрос не совпал ни с одним товаром — первые limit товаров каталога.
+        """
+        ...
+
+    def context_block(self, products: Iterable[Product]) -> str:
+        """Блок каталога для промпта из заранее отформатированных строк товаров."""
+        ...
+
+    def catalog_block(self) -> str:
+        """Блок всего каталога, собранный один раз на версию индекса."""
+        ...
@@ -0,0 +1,14 @@
+# src/application/contracts/ai/recommendation_cache.py
+from __future__ import annotations
+from typing import Any, Optional, Protocol
+
+
+class IRecommendationCache(Protocol):
+    """Кэш ответов AI-консультанта по нормализованному запросу и версии каталога."""
+
+    def get(self, query: str, catalog_version: int) -> Optional[dict[str, Any]]:
+        """Сохранённый ответ на тот же (или достаточно похожий) запрос."""
+        ...
+
+    def put(self, query: str, catalog_version: int, response: dict[str, Any]) -> None:
+        ...
@@ -0,0 +1,38 @@
+# src/application/contracts/notifications/outbox.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Protocol
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    """Сообщение из outbox, которое диспетчер должен доставить."""
+    id: int
+    kind: str
+    payload: dict[str, Any]
+    attempts: int = 0
+
+
+class IOutboxRepository(Protocol):
+    async def add(self, kind: str, payload: dict[str, Any]) -> None: ...
+
+    async def claim_batch(self, limit: int, *, lease: float = 300.0) -> list[OutboxMessage]:
+        """
+        Берёт в аренду неотправленные сообщения, срок очередной попытки которых
+        наступил: их next_attempt_at сдвигается на lease секунд, поэтому после
+        коммита другие диспетчеры их не возьмут, а строки не остаются
+        заблокированными на время отправки.
+        """
+        ...
+
+    async def mark_sent(self, message_ids: Iterable[int]) -> None: ...
+
+    async def mark_failed(
+        self, message_id: int, error: str, retry_in: Optional[float]
+    ) -> None:
+        """Фиксирует неудачную попытку; retry_in=None — больше не повторять."""
+        ...
+
+    async def release(self, message_ids: Iterable[int], retry_in: float) -> None:
+        """Возвращает арендованные, но не отправленные сообщения через retry_in секунд."""
+        ...
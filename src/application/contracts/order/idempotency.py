@@ -0,0 +1,24 @@
+# src/application/contracts/order/idempotency.py
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """Ответ, сохранённый под Idempotency-Key, и отпечаток исходного запроса."""
+    request_hash: str
+    status: int
+    body: dict[str, Any]
+
+
+class IIdempotencyRepository(Protocol):
+    async def get(self, telegram_id: int, key: str) -> Optional[StoredResponse]: ...
+
+    async def save(self, telegram_id: int, key: str, response: StoredResponse) -> bool:
+        """
+        Сохраняет ответ под ключом. Возвращает False, если ключ уже занят
+        (параллельный запрос с тем же ключом успел закоммититься раньше).
+        """
+        ...
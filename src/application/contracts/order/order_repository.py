@@ -1,14 +1,34 @@
 # src/application/contracts/order/order_repository.py
 
 from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Protocol, Iterable, Optional
-from src.domain.entities.order import Order as DomainOrder
+from src.domain.entities.order import Order as DomainOrder, OrderStatus
 from src.domain.entities.order_item import OrderItem as DomainOrderItem
 
+@dataclass(frozen=True)
+class OrderQuery:
+    """
+    Фильтры и страница для выборки заказов (limit=0 — без ограничения).
+    Заказы идут от новых к старым; after=(created_at, id) последнего заказа
+    предыдущей страницы включает keyset-пагинацию вместо offset.
+    """
+    status: Optional[OrderStatus] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    search: Optional[str] = None
+    limit: int = 0
+    offset: int = 0
+    after: Optional[tuple[datetime, int]] = None
+
 class IOrderRepository(Protocol):
     async def create(self, order: DomainOrder) -> DomainOrder: ...
     async def get_by_id(self, order_id: int) -> Optional[DomainOrder]: ...
+    async def get_with_items(self, order_id: int) -> Optional[DomainOrder]: ...
     async def get_all(self) -> list[DomainOrder]: ...
+    async def find(self, query: OrderQuery) -> list[DomainOrder]: ...
+    async def count(self, query: OrderQuery) -> int: ...
     async def update_status(self, order_id: int, status: str) -> Optional[DomainOrder]: ...
 
 class IOrderItemRepository(Protocol):
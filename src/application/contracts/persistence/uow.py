@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import AsyncContextManager
 
+from src.application.contracts.order.idempotency import IIdempotencyRepository
 from src.application.contracts.order.order_repository import (
     IOrderItemRepository,
     IOrderRepository,
@@ -17,6 +18,7 @@ class IUnitOfWork(ABC):
     order_items: IOrderItemRepository
     users: IUserRepository
     products: IProductRepository
+    idempotency: IIdempotencyRepository
 
     @abstractmethod
     def atomic(self) -> AsyncContextManager[None]:
@@ -0,0 +1,13 @@
+# src/application/contracts/rate_limit/backend.py
+from __future__ import annotations
+from typing import Protocol
+
+
+class IRateLimitBackend(Protocol):
+    async def hit(self, key: str, requests: int, period: float) -> float:
+        """
+        Учитывает запрос по ключу при лимите `requests` за `period` секунд.
+        Возвращает 0, если запрос пропускается, иначе — через сколько секунд
+        можно повторить.
+        """
+        ...
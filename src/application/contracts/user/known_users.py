@@ -0,0 +1,15 @@
+# src/application/contracts/user/known_users.py
+from __future__ import annotations
+from typing import Optional, Protocol
+
+from src.domain.entities.user import User
+
+
+class IKnownUserCache(Protocol):
+    """Недавно зарегистрированные пользователи в памяти процесса."""
+
+    def get(self, telegram_id: int) -> Optional[User]:
+        ...
+
+    def put(self, user: User) -> None:
+        ...
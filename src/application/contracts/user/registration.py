@@ -0,0 +1,23 @@
+# src/application/contracts/user/registration.py
+from __future__ import annotations
+from typing import Optional, Protocol
+
+
+class IRegistrationBuffer(Protocol):
+    """Отложенная (пакетная) запись регистраций пользователей."""
+
+    def enqueue(self, telegram_id: int, full_name: str, username: Optional[str]) -> bool:
+        """
+        Ставит регистрацию в буфер; в БД она попадёт со следующей пачкой.
+        False — буфер переполнен, регистрацию надо записать напрямую.
+        """
+        ...
+
+    async def ensure_flushed(self, telegram_id: int) -> None:
+        """
+        Если регистрация пользователя ещё в буфере — синхронно записывает
+        только его строку (или дожидается пачки, которая его уже пишет).
+        После возврата строка пользователя есть в БД. Вызывается до открытия
+        транзакции заказа: запись идёт отдельным соединением.
+        """
+        ...
@@ -1,10 +1,31 @@
 # src/application/interfaces/repositories/product_repository.py - ИСПРАВЛЕННАЯ ВЕРСИЯ
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterable
 
 from src.domain.entities.product import Product
 
 
+@dataclass(frozen=True)
+class ProductQuery:
+    """
+    Параметры выборки товаров: фильтры, поисковая строка, сортировка и страница.
+
+    limit=0 означает «без ограничения» (как и в админском API).
+    order_by="relevance" сортирует по релевантности поисковой строке search.
+    after_id включает keyset-пагинацию по id (используется вместо offset
+    и только с сортировкой по id).
+    """
+    category_id: int | None = None
+    search: str | None = None
+    order_by: str = "id"
+    descending: bool = False
+    limit: int = 0
+    offset: int = 0
+    after_id: int | None = None
+
+
 class IProductRepository(ABC):
     """
     Абстрактный контракт для работы с данными товаров.
@@ -14,6 +35,11 @@ class IProductRepository(ABC):
     async def get_by_id(self, product_id: int) -> Product | None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_by_ids(self, product_ids: Iterable[int]) -> dict[int, Product]:
+        """Возвращает найденные товары одним запросом: {id: товар}."""
+        raise NotImplementedError
+
     @abstractmethod
     async def get_by_category_id(self, category_id: int) -> list[Product]:
         raise NotImplementedError
@@ -24,6 +50,16 @@ class IProductRepository(ABC):
         """Возвращает все товары."""
         raise NotImplementedError
 
+    @abstractmethod
+    async def find(self, query: ProductQuery) -> list[Product]:
+        """Возвращает страницу товаров, подходящих под запрос."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(self, query: ProductQuery) -> int:
+        """Возвращает общее число товаров под запрос (без учёта limit/offset)."""
+        raise NotImplementedError
+
     @abstractmethod
     async def add(self, product: Product) -> Product:
         """Создаёт товар и возвращает его с присвоенным идентификатором."""
@@ -18,4 +18,18 @@ class IUserRepository(ABC):
 
     @abstractmethod
     async def add(self, user: User) -> User:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert(self, user: User) -> User:
+        """
+        Создаёт пользователя или обновляет имя/username существующего
+        (по telegram_id) и возвращает актуальную запись.
+        """
+        raise NotImplementedError
+
+
+    @abstractmethod
+    async def upsert_many(self, users: list[User]) -> list[User]:
+        """Пакетный upsert: один многострочный INSERT ... ON CONFLICT на всю пачку."""
+        raise NotImplementedError
@@ -1,10 +1,13 @@
 # src/application/services/ai_consultant.py
 
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from src.application.contracts.ai.ai_consultant import IAIConsultantService
+from src.application.contracts.ai.product_index import IProductIndex
+from src.application.contracts.ai.recommendation_cache import IRecommendationCache
 from src.application.interfaces.repositories.product_repository import IProductRepository
+from src.application.services.ai_prompt import build_prompt, format_product_line
 from src.infrastructure.ai.gemini_client import GeminiClient
 
 class AIConsultantService(IAIConsultantService):
@@ -12,49 +15,79 @@ class AIConsultantService(IAIConsultantService):
         self,
         gemini_client: GeminiClient,
         product_repo: IProductRepository,
+        product_index: Optional[IProductIndex] = None,
+        max_candidates: int = 20,
+        response_cache: Optional[IRecommendationCache] = None,
+        confirm_cached_in_db: bool = True,
     ):
         self._gemini_client = gemini_client
         self._product_repo = product_repo
+        self._product_index = product_index
+        self._max_candidates = max_candidates
+        self._response_cache = response_cache
+        self._confirm_cached_in_db = confirm_cached_in_db
+
+    async def _catalog_version(self) -> int:
+        """Версия каталога для ключа кэша ответов (перестраивает устаревший индекс)."""
+        if self._product_index is None:
+            return 0
+        if self._product_index.is_stale():
+            await self._product_index.refresh(self._product_repo.get_all)
+        return self._product_index.version
+
+    async def _cached_response(self, user_query: str, version: int) -> Optional[Dict[str, Any]]:
+        if self._response_cache is None:
+            return None
+        cached = self._response_cache.get(user_query, version)
+        if cached is None:
+            return None
+        # Удалённый товар не рекомендуем. Удаления в этом процессе индекс
+        # видит сразу, а удаления в другом — только после перестройки по TTL
+        # (ai_index_ttl), поэтому при нескольких процессах попадание
+        # подтверждается запросом в БД (confirm_cached_in_db)
+        try:
+            product_id = int(cached.get("product_id"))
+        except (TypeError, ValueError):
+            return None
+        if self._product_index is not None:
+            if product_id not in self._product_index:
+                return None
+            if not self._confirm_cached_in_db:
+                return cached
+        if await self._product_repo.get_by_id(product_id) is None:
+            return None
+        return cached
+
+    async def _catalog_block(self, user_query: str) -> str:
+        """
+        Блок каталога для промпта: top-K из локального индекса вместо всего
+        каталога, чтобы размер промпта (и задержка/стоимость Gemini) не рос с
+        каталогом. При max_candidates <= 0 — весь каталог, собранный индексом
+        заранее. Строки товаров не форматируются заново на каждый запрос.
+        Индекс к этому моменту уже актуален (_catalog_version).
+        """
+        if self._product_index is None:
+            products = await self._product_repo.get_all()
+            return "\n".join(format_product_line(p) for p in products)
+        if self._max_candidates <= 0:
+            return self._product_index.catalog_block()
+        products = self._product_index.search(user_query, self._max_candidates)
+        return self._product_index.context_block(products)
 
     async def get_recommendation(self, user_query: str) -> Dict[str, Any]:
-        products = await self._product_repo.get_all()
-        if not products:
+        version = await self._catalog_version()
+        cached = await self._cached_response(user_query, version)
+        if cached is not None:
+            return cached
+
+        catalog_block = await self._catalog_block(user_query)
+        if not catalog_block:
             return {
                 "product_id": None,
                 "explanation": "К сожалению, в данный момент товары отсутствуют."
             }
 
-        # Формируем контекст для AI
-        products_context = "\n".join(
-            [f"ID: {p.id}, Имя: {p.name}, Описание: {p.description}, Цена: {p.price}" for p in products]
-        )
-
-        # Создаем промпт
-        prompt = f"""
-Ты — "AI-Сомелье Техники" в интернет-магазине. Твоя задача — помочь пользователю выбрать один, самый подходящий товар на основе его запроса.
-
-Вот список доступных товаров:
---- НАЧАЛО СПИСКА ТОВАРОВ ---
-{products_context}
---- КОНЕЦ СПИСКА ТОВАРОВ ---
-
-Вот запрос пользователя:
---- НАЧАЛО ЗАПРОСА ---
-{user_query}
---- КОНЕЦ ЗАПРОСА ---
-
-Твои действия:
-1. Внимательно проанализируй запрос пользователя и пойми его скрытые потребности.
-2. Выбери из списка ОДИН, самый подходящий товар.
-3. Напиши краткое (2-3 предложения), но убедительное объяснение, почему именно этот товар является лучшим выбором для пользователя. Обращайся к пользователю на "ты".
-4. Верни ответ СТРОГО в формате JSON, без каких-либо других слов до или после.
-
-Пример формата JSON:
-{{
-  "product_id": 123,
-  "explanation": "Этот ноутбук идеально подойдет для твоих задач, потому что..."
-}}
-"""
+        prompt = build_prompt(catalog_block, user_query)
         
         raw_response = await self._gemini_client.get_recommendation(prompt)
         
@@ -62,6 +95,13 @@ class AIConsultantService(IAIConsultantService):
             # Убираем "мусор" вокруг JSON, если он есть
             json_response_str = raw_response.strip().replace("```json", "").replace("```", "")
             parsed_response = json.loads(json_response_str)
+            # Кэшируем только состоявшиеся рекомендации, не отказы и не ошибки
+            if (
+                self._response_cache is not None
+                and isinstance(parsed_response, dict)
+                and parsed_response.get("product_id")
+            ):
+                self._response_cache.put(user_query, version, parsed_response)
             return parsed_response
         except (json.JSONDecodeError, KeyError):
             # Если AI вернул что-то не то, возвращаем ошибку
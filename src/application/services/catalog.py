@@ -8,6 +8,7 @@ from src.application.interfaces.repositories.category_repository import (
 )
 from src.application.interfaces.repositories.product_repository import (
     IProductRepository,
+    ProductQuery,
 )
 from src.domain.entities.category import Category
 from src.domain.entities.product import Product
@@ -50,6 +51,23 @@ class ProductService:
         """Возвращает все товары."""
         return await self.product_repo.get_all()
 
+    async def search_products(
+        self, query: ProductQuery, *, with_total: bool = True
+    ) -> tuple[list[Product], int | None]:
+        """
+        Возвращает страницу товаров и общее количество подходящих товаров.
+        При with_total=False (keyset-режим) количество не считается и равно None.
+        """
+        products = await self.product_repo.find(query)
+        if not with_total:
+            return products, None
+        # Неполная (и непустая) страница — последняя: COUNT(*) можно не выполнять.
+        if products or not query.offset:
+            if not query.limit or len(products) < query.limit:
+                return products, query.offset + len(products)
+        total = await self.product_repo.count(query)
+        return products, total
+
     async def get_by_category(self, category_id: int) -> list[Product]:
         return await self.product_repo.get_by_category_id(category_id)
 
@@ -5,9 +5,12 @@ from typing import List, Dict, Optional
 
 from src.application.contracts.cart.cart_repository import ICartRepository
 from src.application.contracts.notifications.notifier import INotifier
+from src.application.contracts.order.order_repository import OrderQuery
 from src.application.contracts.persistence.uow import IUnitOfWork
+from src.application.contracts.user.registration import IRegistrationBuffer
 from src.domain.entities.order import Order, OrderStatus
 from src.domain.entities.order_item import OrderItem
+from src.domain.entities.user import User
 
 
 class OrderService:
@@ -16,16 +19,48 @@ class OrderService:
         uow: IUnitOfWork,
         cart_repo: Optional[ICartRepository] = None,
         notifier: Optional[INotifier] = None,
+        registrations: Optional[IRegistrationBuffer] = None,
     ):
         self.uow = uow
         self.cart_repo = cart_repo
         self.notifier = notifier
+        self.registrations = registrations
 
-    async def create_order(self, telegram_id: int) -> Order:
-        """Создает заказ на основе содержимого корзины пользователя."""
+    async def ensure_user_registered(self, telegram_id: int) -> None:
+        """
+        Регистрация после /start могла ещё не дойти до БД — дописывает её.
+        Вызывать до uow.atomic(): запись идёт отдельным коротким соединением,
+        а не внутри транзакции заказа.
+        """
+        if self.registrations is not None:
+            await self.registrations.ensure_flushed(telegram_id)
+
+    async def _get_user(self, telegram_id: int) -> User:
         user = await self.uow.users.get_by_telegram_id(telegram_id)
         if not user:
             raise ValueError(f"Пользователь с telegram_id {telegram_id} не найден.")
+        return user
+
+    async def search_orders(
+        self, query: OrderQuery, *, with_total: bool = True
+    ) -> tuple[list[Order], Optional[int]]:
+        """
+        Возвращает страницу заказов и общее количество подходящих заказов.
+        При with_total=False (keyset-режим) количество не считается и равно None.
+        """
+        orders = await self.uow.orders.find(query)
+        if not with_total:
+            return orders, None
+        # Неполная (и непустая) страница — последняя: COUNT(*) можно не выполнять.
+        if orders or not query.offset:
+            if not query.limit or len(orders) < query.limit:
+                return orders, query.offset + len(orders)
+        total = await self.uow.orders.count(query)
+        return orders, total
+
+    async def create_order(self, telegram_id: int) -> Order:
+        """Создает заказ на основе содержимого корзины пользователя."""
+        user = await self._get_user(telegram_id)
 
         if not self.cart_repo:
             raise ValueError("Cart repository is not configured")
@@ -61,56 +96,55 @@ class OrderService:
         Создание заказа из REST API.
         items: [{ "product_id": int, "quantity": int }, ...]
         """
-        user = await self.uow.users.get_by_telegram_id(telegram_id)
-        if not user:
-            raise ValueError(f"Пользователь с telegram_id {telegram_id} не найден.")
+        user = await self._get_user(telegram_id)
 
         if not items:
             raise ValueError("Список товаров пуст.")
 
-        total = Decimal("0.00")
+        lines = [(int(raw["product_id"]), int(raw["quantity"])) for raw in items]
+        # Все товары корзины — одним запросом WHERE id IN (...)
+        products = await self.uow.products.get_by_ids({pid for pid, _ in lines})
 
-        # Создаём заказ сразу, без позиций
-        order = Order(
-            id=0,
-            user_id=user.id,
-            status=OrderStatus.PENDING,
-            total_amount=total,
-        )
-        order = await self.uow.orders.create(order)
-
-        domain_items: list[OrderItem] = []
-
-        for raw in items:
-            product_id = int(raw["product_id"])
-            qty = int(raw["quantity"])
+        # Проверяем строки в исходном порядке (те же ошибки, что и раньше),
+        # одинаковые product_id объединяем в одну позицию.
+        quantities: dict[int, int] = {}
+        for product_id, qty in lines:
             if qty <= 0:
                 raise ValueError(f"Некорректное количество для product_id={product_id}")
-
-            product = await self.uow.products.get_by_id(product_id)
-            if not product:
+            if product_id not in products:
                 raise ValueError(f"Товар {product_id} не найден.")
+            quantities[product_id] = quantities.get(product_id, 0) + qty
 
-            price = product.price
-            total += price * qty
-
-            domain_items.append(
-                OrderItem(
-                    id=0,
-                    order=order,  # передаём сразу, чтобы __post_init__ не падал
-                    product_id=product_id,
-                    quantity=qty,
-                    price_at_purchase=price,
-                )
+        # Итог считаем до вставки: заказ пишется в БД сразу с верной суммой
+        total = sum(
+            (products[pid].price * qty for pid, qty in quantities.items()),
+            start=Decimal("0.00"),
+        )
+        order = await self.uow.orders.create(
+            Order(
+                id=0,
+                user_id=user.id,
+                status=OrderStatus.PENDING,
+                total_amount=total,
             )
+        )
 
-        # Обновляем итоговую сумму заказа
-        order.total_amount = total
-
+        domain_items = [
+            OrderItem(
+                id=0,
+                order=order,  # передаём сразу, чтобы __post_init__ не падал
+                product_id=product_id,
+                quantity=qty,
+                price_at_purchase=products[product_id].price,
+            )
+            for product_id, qty in quantities.items()
+        ]
+        # Все позиции — одним многострочным INSERT
         await self.uow.order_items.create_items(domain_items)
         order.items = domain_items
 
-        # Отправляем уведомление (если настроен notifier)
+        # Уведомление (если настроен notifier). В проде это OutboxNotifier:
+        # запись в outbox в этой же транзакции, без похода в Telegram.
         if self.notifier:
             await self.notifier.notify_order_created(
                 telegram_id=telegram_id,
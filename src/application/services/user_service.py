@@ -1,11 +1,48 @@
 # src/application/services/user_service.py - ФИНАЛЬНАЯ ИСПРАВЛЕННАЯ ВЕРСИЯ
 
+from typing import Optional
+
 from src.application.contracts.persistence.uow import IUnitOfWork
+from src.application.contracts.user.registration import IRegistrationBuffer
+from src.application.contracts.user.known_users import IKnownUserCache
 from src.domain.entities.user import User as DomainUser
 
 class UserService:
-    def __init__(self, uow: IUnitOfWork):
+    def __init__(
+        self,
+        uow: IUnitOfWork,
+        known_users: Optional[IKnownUserCache] = None,
+        registrations: Optional[IRegistrationBuffer] = None,
+    ):
         self.uow = uow
+        self.known_users = known_users
+        self.registrations = registrations
+
+    def _is_known(self, telegram_id: int, full_name: str, username: str | None) -> Optional[DomainUser]:
+        if self.known_users is None:
+            return None
+        cached = self.known_users.get(telegram_id)
+        if cached and cached.full_name == full_name and cached.username == username:
+            return cached
+        return None
+
+    async def register_user(
+        self,
+        telegram_id: int,
+        full_name: str,
+        username: str | None,
+    ) -> None:
+        """
+        Регистрация для /start: при настроенном буфере запись откладывается
+        и уходит в БД пачкой, иначе (или если буфер переполнен) выполняется сразу.
+        """
+        if self._is_known(telegram_id, full_name, username):
+            return
+        if self.registrations is not None and self.registrations.enqueue(
+            telegram_id, full_name, username
+        ):
+            return
+        await self.register_user_if_not_exists(telegram_id, full_name, username)
 
     async def register_user_if_not_exists(
         self,
@@ -13,27 +50,22 @@ class UserService:
         full_name: str,
         username: str | None,
     ) -> DomainUser:
-        # Объявляем переменную для результата заранее
-        user_to_return: DomainUser
+        # Пользователь уже встречался с теми же данными — в БД идти незачем
+        cached = self._is_known(telegram_id, full_name, username)
+        if cached is not None:
+            return cached
 
-        # --- КЛЮЧЕВОЕ ИСПРАВЛЕНИЕ: Логика `return` вынесена из блока `with` ---
+        # Один INSERT ... ON CONFLICT DO UPDATE: без гонки двух одновременных /start
         async with self.uow.atomic():
-            existing_user = await self.uow.users.get_by_telegram_id(telegram_id)
-            if existing_user:
-                # Мы не выходим из функции, а просто сохраняем результат
-                user_to_return = existing_user
-            else:
-                new_user_data = DomainUser(
+            user = await self.uow.users.upsert(
+                DomainUser(
                     id=0,
                     telegram_id=telegram_id,
                     full_name=full_name,
                     username=username,
                 )
-                # Репозиторий вернет нам сущность с ID, мы сохраняем ее
-                persisted_user = await self.uow.users.add(new_user_data)
-                user_to_return = persisted_user
-        
-        # Блок `with self.uow.atomic()` завершился штатно.
-        # SQLAlchemy выполнил COMMIT.
-        # Теперь мы можем безопасно вернуть результат.
-        return user_to_return
\ No newline at end of file
+            )
+
+        if self.known_users is not None:
+            self.known_users.put(user)
+        return user
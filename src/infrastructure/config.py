@@ -1,5 +1,7 @@
 # src/infrastructure/config.py - ИСПРАВЛЕННАЯ ВЕРСИЯ
 
+from typing import Literal
+
 from pydantic import SecretStr, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -7,6 +9,8 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class BotSettings(BaseSettings):
     """Настройки для Telegram бота."""
     token: SecretStr
+    # Доля обновлений, которые логируются полным дампом (0.01 — 1%, 0 — выкл.)
+    update_dump_sample_rate: float = 0.0
 
 
 class DBSettings(BaseSettings):
@@ -33,6 +37,61 @@ class AppSettings(BaseSettings):
     secret_token: SecretStr
     # CSV-список Telegram ID админов: "123,456"
     admin_ids: str = ""
+    # Rate limit по префиксам путей: {"префикс": "запросов/секунд"}.
+    # Из env задаётся JSON: APP__RATE_LIMITS='{"/api/v1/admin": "120/60"}'
+    rate_limits: dict[str, str] = {"/api/v1/admin": "120/60"}
+    # Жёсткий предел числа ключей в памяти (backend "memory")
+    rate_limit_max_keys: int = 10_000
+    # "memory" — лимит на процесс; "postgres" — общий для всех воркеров
+    rate_limit_backend: Literal["memory", "postgres"] = "memory"
+    # Сколько секунд ждать backend "postgres", прежде чем пропустить запрос
+    rate_limit_timeout: float = 0.2
+    # Конкурентность по префиксам путей: {"префикс": "в_работе/очередь"}
+    concurrency_limits: dict[str, str] = {
+        "/api/create_order": "20/100",
+        "/api/products": "50/200",
+        "/api/categories": "50/200",
+        "/webhook": "20/200",
+    }
+    # Сколько секунд запрос может ждать в очереди, прежде чем получить 503
+    concurrency_queue_timeout: float = 5.0
+    # Одновременных запросов одного пользователя на маршрут (0 — без лимита)
+    concurrency_per_user: int = 4
+    # Пул обработки webhook-обновлений (одновременно обрабатываемых чатов)
+    # и общий размер его очереди
+    webhook_workers: int = 64
+    webhook_queue_size: int = 1000
+    # Сколько секунд помнить принятые update_id, чтобы отбрасывать повторные доставки
+    webhook_dedup_ttl: float = 600.0
+    # Фоновая доставка уведомлений из outbox
+    outbox_batch_size: int = 50
+    outbox_poll_interval: float = 1.0
+    outbox_max_attempts: int = 10
+    # Сколько последних Idempotency-Key держать в памяти процесса
+    idempotency_cache_size: int = 10_000
+    # Сколько недавно виденных пользователей держать в памяти (повторный /start без БД)
+    known_users_cache_size: int = 50_000
+    # Буфер регистраций /start: пачка пишется раз в интервал или при наборе batch_size
+    registration_batch_size: int = 500
+    registration_flush_interval: float = 0.2
+    # Предел буфера регистраций (если БД долго недоступна); сверх него — прямая запись
+    registration_max_pending: int = 50_000
+    # Предельный возраст записи кэша публичного каталога, секунды (0 — без TTL)
+    catalog_cache_ttl: float = 600.0
+    # AI-консультант: сколько товаров-кандидатов из локального индекса попадает
+    # в промпт (0 — весь каталог одним заранее собранным блоком)
+    ai_max_candidates: int = 20
+    # Полная перестройка индекса не реже раза в столько секунд (0 — только при старте)
+    ai_index_ttl: float = 600.0
+    # Кэш ответов AI: время жизни, число записей и порог косинусной близости
+    # TF-IDF для «похожих» запросов (None — только точное совпадение)
+    ai_cache_ttl: float = 3600.0
+    ai_cache_size: int = 1000
+    ai_cache_similarity: float | None = None
+    # Подтверждать попадание в кэш ответов запросом товара в БД. Нужно, если
+    # воркеров несколько: удаление в другом процессе индекс увидит только
+    # через ai_index_ttl. С одним процессом можно выключить
+    ai_cache_confirm_in_db: bool = True
 
 # --- НАЧАЛО ИЗМЕНЕНИЯ ---
 class GeminiSettings(BaseSettings):
@@ -3,9 +3,12 @@
 
 from .base import Base
 from .category import Category
+from .idempotency_key import IdempotencyKey
 from .order import Order
 from .order_item import OrderItem
+from .outbox import OutboxMessage
 from .product import Product
+from .rate_limit import RateLimitBucket
 from .user import User
 
-__all__ = ["Base", "User", "Category", "Product", "Order", "OrderItem"]
\ No newline at end of file
+__all__ = ["Base", "User", "Category", "Product", "Order", "OrderItem", "OutboxMessage", "IdempotencyKey", "RateLimitBucket"]
\ No newline at end of file
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, BigInteger, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class IdempotencyKey(Base):
+    """Ответ /api/create_order, сохранённый под клиентским Idempotency-Key."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Ключ уникален в пределах пользователя: повтор не создаст второй заказ
+        UniqueConstraint("telegram_id", "key", name="uq_idempotency_keys_telegram_id_key"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    telegram_id: Mapped[int] = mapped_column(BigInteger)
+    key: Mapped[str] = mapped_column(String(255))
+    request_hash: Mapped[str] = mapped_column(String(64))
+    status_code: Mapped[int]
+    response: Mapped[dict[str, Any]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
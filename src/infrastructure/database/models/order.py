@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 # --- НАЧАЛО ИЗМЕНЕНИЙ ---
-from sqlalchemy import BigInteger, Enum as SAEnum, ForeignKey, Numeric, func
+from sqlalchemy import BigInteger, Enum as SAEnum, ForeignKey, Index, Numeric, func
 # --- КОНЕЦ ИЗМЕНЕНИЙ ---
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
@@ -16,13 +16,17 @@ if TYPE_CHECKING:
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Фильтр по датам и keyset-пагинация в админке (created_at, id)
+        Index("ix_orders_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     # --- НАЧАЛО ИЗМЕНЕНИЙ ---
     # Меняем тип на BigInteger, чтобы вместить большие Telegram User ID
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"))
     # --- КОНЕЦ ИЗМЕНЕНИЙ ---
-    status: Mapped[OrderStatus] = mapped_column(SAEnum(OrderStatus), default=OrderStatus.PENDING)
+    status: Mapped[OrderStatus] = mapped_column(SAEnum(OrderStatus), default=OrderStatus.PENDING, index=True)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     total_amount: Mapped[Decimal] = mapped_column(Numeric(10, 2))
 
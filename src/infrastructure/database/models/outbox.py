@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import JSON, BigInteger, Index, String, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class OutboxMessage(Base):
+    """Исходящее сообщение (transactional outbox), пишется в транзакции заказа."""
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # Диспетчер выбирает только неотправленные сообщения по порядку id
+        Index(
+            "ix_outbox_messages_unsent",
+            "id",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64))
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    # NULL — попытки исчерпаны, сообщение больше не берётся в работу
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(
+        server_default=func.now()
+    )
+    sent_at: Mapped[Optional[datetime]]
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
@@ -0,0 +1,17 @@
+from sqlalchemy import Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class RateLimitBucket(Base):
+    """Состояние GCRA для общего между воркерами rate limit."""
+
+    __tablename__ = "rate_limit_buckets"
+    # Данные одноразовые: UNLOGGED не пишет WAL и заметно дешевле на апдейтах
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    # "<префикс>|<sha256 клиента>" — длина не зависит от присланных заголовков
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # theoretical arrival time, unix-время в секундах
+    tat: Mapped[float] = mapped_column(Float(precision=53))
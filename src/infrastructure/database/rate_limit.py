@@ -0,0 +1,116 @@
+# src/infrastructure/database/rate_limit.py
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.application.contracts.rate_limit.backend import IRateLimitBackend
+from src.infrastructure.database.models import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+# Только недоступность БД пропускает запрос; ошибки в данных — это баг, а не повод
+# снимать лимит. PoolTimeoutError — пул соединений исчерпан
+_UNAVAILABLE_ERRORS = (
+    OperationalError,
+    InterfaceError,
+    PoolTimeoutError,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+
+def storage_key(key: str) -> str:
+    """
+    Ключ строки в rate_limit_buckets фиксированной длины: клиентская часть
+    (произвольный заголовок или IP) заменяется на sha256, префикс остаётся читаемым.
+    """
+    prefix, _, client = key.rpartition("|")
+    digest = hashlib.sha256(client.encode()).hexdigest()
+    return f"{prefix}|{digest}" if prefix else digest
+
+
+class PostgresRateLimitBackend(IRateLimitBackend):
+    """
+    GCRA в общей таблице rate_limit_buckets: один атомарный upsert на запрос,
+    поэтому лимит действует на все воркеры вместе, а не на каждый отдельно.
+
+    Истёкшие ключи удаляются раз в sweep_interval секунд фоновой задачей,
+    вне транзакции запроса. Если БД недоступна или не ответила за timeout
+    секунд (например, пул занят), запрос пропускается (fail open): rate
+    limit не должен ронять API и не должен ждать полный таймаут пула.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        sweep_interval: float = 60.0,
+        timeout: float = 0.2,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._engine = engine
+        self._sweep_interval = sweep_interval
+        self._timeout = timeout
+        self._clock = clock
+        self._next_sweep = 0.0
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    async def hit(self, key: str, requests: int, period: float) -> float:
+        now = self._clock()
+        try:
+            retry_after = await asyncio.wait_for(
+                self._hit(storage_key(key), now, requests, period), self._timeout
+            )
+        except _UNAVAILABLE_ERRORS:
+            logger.warning("Rate limit backend недоступен, запрос пропущен", exc_info=True)
+            return 0.0
+        self._schedule_sweep(now)
+        return retry_after
+
+    async def _hit(self, key: str, now: float, requests: int, period: float) -> float:
+        interval = period / requests
+        tolerance = period - interval + 1e-9
+        bucket = RateLimitBucket.__table__
+        # TAT сдвигается только если запрос укладывается в допуск;
+        # иначе UPDATE не срабатывает и RETURNING пуст
+        tat = func.greatest(bucket.c.tat, now)
+        upsert = (
+            insert(bucket)
+            .values(key=key, tat=now + interval)
+            .on_conflict_do_update(
+                index_elements=[bucket.c.key],
+                set_={"tat": tat + interval},
+                where=tat - now <= tolerance,
+            )
+            .returning(bucket.c.tat)
+        )
+        async with self._engine.begin() as conn:
+            if (await conn.execute(upsert)).first() is not None:
+                return 0.0
+            current = (
+                await conn.execute(select(bucket.c.tat).where(bucket.c.key == key))
+            ).scalar_one()
+        return max(current - now - tolerance, 0.0) or interval
+
+    def _schedule_sweep(self, now: float) -> None:
+        if now < self._next_sweep or (self._sweep_task and not self._sweep_task.done()):
+            return
+        self._next_sweep = now + self._sweep_interval
+        self._sweep_task = asyncio.create_task(self._sweep(now))
+
+    async def _sweep(self, now: float) -> None:
+        bucket = RateLimitBucket.__table__
+        try:
+            async with self._engine.begin() as conn:
+                await conn.execute(delete(bucket).where(bucket.c.tat < now))
+        except Exception:
+            logger.exception("Не удалось удалить истёкшие ключи rate limit")
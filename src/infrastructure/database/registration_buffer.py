@@ -0,0 +1,155 @@
+# src/infrastructure/database/registration_buffer.py
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.application.contracts.user.known_users import IKnownUserCache
+from src.application.interfaces.repositories.user_repository import IUserRepository
+from src.domain.entities.user import User
+from src.infrastructure.database.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class RegistrationBuffer:
+    """
+    Write-behind буфер регистраций для всплесков /start после рассылки.
+    Хендлеры только кладут (telegram_id, full_name, username) в память,
+    фоновый цикл пишет их многострочным upsert раз в flush_interval секунд
+    или сразу, как только набралось batch_size пользователей.
+    Повторы одного telegram_id в буфере схлопываются (побеждают последние данные).
+
+    Буфер ограничен max_pending пользователями: если БД долго недоступна,
+    новые регистрации сверх лимита не принимаются (enqueue возвращает False,
+    вызывающий пишет их напрямую), а неудачная пачка возвращается в буфер
+    только в пределах лимита.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        max_pending: int = 50_000,
+        known_users: Optional[IKnownUserCache] = None,
+        repo_factory: Callable[[AsyncSession], IUserRepository] = UserRepository,
+    ):
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._known_users = known_users
+        self._repo_factory = repo_factory
+        self._pending: dict[int, User] = {}
+        # telegram_id -> future пачки, которая пишется прямо сейчас
+        self._inflight: dict[int, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, telegram_id: int, full_name: str, username: Optional[str]) -> bool:
+        if telegram_id not in self._pending and len(self._pending) >= self._max_pending:
+            return False
+        self._pending[telegram_id] = User(
+            id=0, telegram_id=telegram_id, full_name=full_name, username=username
+        )
+        if len(self._pending) >= self._batch_size:
+            self._full.set()
+        return True
+
+    async def ensure_flushed(self, telegram_id: int) -> None:
+        # Пользователя нет ни в буфере, ни в записываемой пачке — сразу выходим,
+        # без общего lock: обычный checkout не ждёт фоновую запись
+        batch = self._inflight.get(telegram_id)
+        if batch is not None:
+            await asyncio.shield(batch)
+        user = self._pending.pop(telegram_id, None)
+        if user is None:
+            return
+        # Пишем только строку этого пользователя, не весь буфер
+        await self._write({telegram_id: user})
+
+    async def flush(self) -> int:
+        """Записывает всё, что накопилось; возвращает число пользователей."""
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            self._full.clear()
+            if not batch:
+                return 0
+            await self._write(batch)
+            return len(batch)
+
+    async def _write(self, batch: dict[int, User]) -> None:
+        done = asyncio.get_running_loop().create_future()
+        for telegram_id in batch:
+            self._inflight[telegram_id] = done
+        try:
+            async with self._session_factory() as session:
+                async with session.begin():
+                    saved = await self._repo_factory(session).upsert_many(list(batch.values()))
+        except Exception:
+            self._requeue(batch)
+            raise
+        finally:
+            for telegram_id in batch:
+                if self._inflight.get(telegram_id) is done:
+                    del self._inflight[telegram_id]
+            done.set_result(None)
+        if self._known_users is not None:
+            for user in saved:
+                self._known_users.put(user)
+
+    def _requeue(self, batch: dict[int, User]) -> None:
+        """
+        Возвращает неудачную пачку в буфер, не затирая более свежие данные и
+        не превышая лимит: остальные зарегистрируются при следующем /start.
+        """
+        dropped = 0
+        for telegram_id, user in batch.items():
+            if telegram_id in self._pending:
+                continue
+            if len(self._pending) >= self._max_pending:
+                dropped += 1
+                continue
+            self._pending[telegram_id] = user
+        if dropped:
+            logger.warning("Буфер регистраций переполнен, отброшено %d записей", dropped)
+
+    async def run(self) -> None:
+        """Бесконечный цикл; останавливается отменой задачи."""
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка записи пачки регистраций")
+                await asyncio.sleep(self._flush_interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Останавливает цикл и дописывает остаток буфера."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Не удалось записать остаток буфера регистраций")
+
+    def __len__(self) -> int:
+        return len(self._pending)
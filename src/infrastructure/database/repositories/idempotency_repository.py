@@ -0,0 +1,52 @@
+# src/infrastructure/database/repositories/idempotency_repository.py
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.application.contracts.order.idempotency import (
+    IIdempotencyRepository,
+    StoredResponse,
+)
+from src.infrastructure.database.models import IdempotencyKey as DbIdempotencyKey
+
+
+class IdempotencyRepository(IIdempotencyRepository):
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get(self, telegram_id: int, key: str) -> Optional[StoredResponse]:
+        stmt = select(
+            DbIdempotencyKey.request_hash,
+            DbIdempotencyKey.status_code,
+            DbIdempotencyKey.response,
+        ).where(
+            DbIdempotencyKey.telegram_id == telegram_id,
+            DbIdempotencyKey.key == key,
+        )
+        row = (await self._session.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+        return StoredResponse(
+            request_hash=row.request_hash, status=row.status_code, body=row.response
+        )
+
+    async def save(self, telegram_id: int, key: str, response: StoredResponse) -> bool:
+        # Уникальный индекс (telegram_id, key) сериализует параллельные вставки:
+        # второй INSERT дождётся коммита первого и ничего не вставит
+        stmt = (
+            insert(DbIdempotencyKey)
+            .values(
+                telegram_id=telegram_id,
+                key=key,
+                request_hash=response.request_hash,
+                status_code=response.status,
+                response=response.body,
+            )
+            .on_conflict_do_nothing(index_elements=["telegram_id", "key"])
+            .returning(DbIdempotencyKey.id)
+        )
+        res = await self._session.execute(stmt)
+        return res.scalar_one_or_none() is not None
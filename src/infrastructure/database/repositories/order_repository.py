@@ -1,12 +1,14 @@
 # src/infrastructure/database/repositories/order_repository.py
 
 from typing import Iterable
-from sqlalchemy import select
+from sqlalchemy import Select, false, func, insert, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from src.application.contracts.order.order_repository import (
     IOrderItemRepository,
     IOrderRepository,
+    OrderQuery,
 )
 from src.domain.entities.order import Order as DomainOrder, OrderStatus
 from src.domain.entities.order_item import OrderItem as DomainOrderItem
@@ -20,21 +22,77 @@ def _to_domain_order(db: DbOrder) -> DomainOrder:
         user_id=db.user_id,
         status=OrderStatus(db.status) if not isinstance(db.status, OrderStatus) else db.status,
         total_amount=db.total_amount,
+        created_at=db.created_at,
     )
 
+def _to_domain_order_with_items(db: DbOrder) -> DomainOrder:
+    """Маппер заказа вместе с позициями: все позиции ссылаются на один объект Order."""
+    order = _to_domain_order(db)
+    order.items = [
+        DomainOrderItem(
+            id=i.id,
+            order=order,
+            product_id=i.product_id,
+            quantity=i.quantity,
+            price_at_purchase=i.price_at_purchase,
+        )
+        for i in db.items
+    ]
+    return order
+
+async def _load_order_with_items(
+    session: AsyncSession, order_id: int
+) -> DomainOrder | None:
+    """Заказ и его позиции одним запросом (LEFT OUTER JOIN order_items)."""
+    stmt = (
+        select(DbOrder)
+        .options(joinedload(DbOrder.items))
+        .where(DbOrder.id == order_id)
+    )
+    res = await session.execute(stmt)
+    db_order = res.unique().scalar_one_or_none()
+    return _to_domain_order_with_items(db_order) if db_order else None
+
+_INT4_MAX = 2**31 - 1
+
+def _apply_filters(stmt: Select, query: OrderQuery) -> Select:
+    """Добавляет к запросу WHERE-условия из OrderQuery."""
+    if query.status is not None:
+        stmt = stmt.where(DbOrder.status == query.status)
+    if query.created_from is not None:
+        stmt = stmt.where(DbOrder.created_at >= query.created_from)
+    if query.created_to is not None:
+        stmt = stmt.where(DbOrder.created_at <= query.created_to)
+    if query.search:
+        term = query.search.strip().lower()
+        conditions = []
+        if term.isdigit() and int(term) <= _INT4_MAX:
+            conditions += [DbOrder.id == int(term), DbOrder.user_id == int(term)]
+        statuses = [s for s in OrderStatus if term in s.value]
+        if statuses:
+            conditions.append(DbOrder.status.in_(statuses))
+        # Ничего не подходит — пустая выборка, а не весь список
+        stmt = stmt.where(or_(*conditions) if conditions else false())
+    return stmt
+
 class OrderRepository(IOrderRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create(self, order: DomainOrder) -> DomainOrder:
-        db_order = DbOrder(
-            user_id=order.user_id,
-            status=order.status,
-            total_amount=order.total_amount,
+        # INSERT ... RETURNING: id и created_at приходят в ответе на сам INSERT
+        stmt = (
+            insert(DbOrder)
+            .values(
+                user_id=order.user_id,
+                status=order.status,
+                total_amount=order.total_amount,
+            )
+            .returning(DbOrder.id, DbOrder.created_at)
         )
-        self.session.add(db_order)
-        await self.session.flush([db_order])
-        order.id = db_order.id
+        row = (await self.session.execute(stmt)).one()
+        order.id = row.id
+        order.created_at = row.created_at
         return order
 
     async def get_by_id(self, order_id: int) -> DomainOrder | None:
@@ -42,11 +100,32 @@ class OrderRepository(IOrderRepository):
         db_order = await self.session.scalar(stmt)
         return _to_domain_order(db_order) if db_order else None
 
+    async def get_with_items(self, order_id: int) -> DomainOrder | None:
+        return await _load_order_with_items(self.session, order_id)
+
     async def get_all(self) -> list[DomainOrder]:
         stmt = select(DbOrder).order_by(DbOrder.id.desc())
         res = await self.session.execute(stmt)
         return [_to_domain_order(row) for row in res.scalars().all()]
 
+    async def find(self, query: OrderQuery) -> list[DomainOrder]:
+        stmt = _apply_filters(select(DbOrder), query).order_by(
+            DbOrder.created_at.desc(), DbOrder.id.desc()
+        )
+        if query.after is not None:
+            # keyset по (created_at, id): строки «старше» последней на прошлой странице
+            stmt = stmt.where(tuple_(DbOrder.created_at, DbOrder.id) < query.after)
+        elif query.offset:
+            stmt = stmt.offset(query.offset)
+        if query.limit:
+            stmt = stmt.limit(query.limit)
+        res = await self.session.scalars(stmt)
+        return [_to_domain_order(row) for row in res.all()]
+
+    async def count(self, query: OrderQuery) -> int:
+        stmt = _apply_filters(select(func.count()).select_from(DbOrder), query)
+        return int(await self.session.scalar(stmt) or 0)
+
     async def update_status(self, order_id: int, status: str) -> DomainOrder | None:
         stmt = select(DbOrder).where(DbOrder.id == order_id)
         db_order = await self.session.scalar(stmt)
@@ -61,34 +140,20 @@ class OrderItemRepository(IOrderItemRepository):
         self.session = session
 
     async def create_items(self, items: Iterable[DomainOrderItem]) -> None:
-        db_items = [
-            DbOrderItem(
-                order_id=i.order_id,
-                product_id=i.product_id,
-                quantity=i.quantity,
-                price_at_purchase=i.price_at_purchase,
-            )
+        rows = [
+            {
+                "order_id": i.order_id,
+                "product_id": i.product_id,
+                "quantity": i.quantity,
+                "price_at_purchase": i.price_at_purchase,
+            }
             for i in items
         ]
-        self.session.add_all(db_items)
-        # flush не обязателен здесь, транзакция закроется в UoW.atomic()
+        if not rows:
+            return
+        # Один многострочный INSERT ... VALUES (...), (...) на весь заказ
+        await self.session.execute(insert(DbOrderItem).values(rows))
 
     async def get_by_order_id(self, order_id: int) -> list[DomainOrderItem]:
-        stmt = select(DbOrderItem).where(DbOrderItem.order_id == order_id)
-        res = await self.session.execute(stmt)
-        rows = res.scalars().all()
-        items: list[DomainOrderItem] = []
-        for i in rows:
-            db_parent = await self.session.get(DbOrder, i.order_id)
-            if not db_parent:
-                continue
-            items.append(
-                DomainOrderItem(
-                    id=i.id,
-                    order=_to_domain_order(db_parent),
-                    product_id=i.product_id,
-                    quantity=i.quantity,
-                    price_at_purchase=i.price_at_purchase,
-                )
-            )
-        return items
+        order = await _load_order_with_items(self.session, order_id)
+        return order.items if order else []
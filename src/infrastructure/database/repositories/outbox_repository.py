@@ -0,0 +1,90 @@
+# src/infrastructure/database/repositories/outbox_repository.py
+
+from datetime import timedelta
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.application.contracts.notifications.outbox import (
+    IOutboxRepository,
+    OutboxMessage,
+)
+from src.infrastructure.database.models import OutboxMessage as DbOutboxMessage
+
+
+class OutboxRepository(IOutboxRepository):
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def add(self, kind: str, payload: dict[str, Any]) -> None:
+        await self._session.execute(
+            insert(DbOutboxMessage).values(kind=kind, payload=payload)
+        )
+
+    async def claim_batch(self, limit: int, *, lease: float = 300.0) -> list[OutboxMessage]:
+        claimable = (
+            select(DbOutboxMessage.id)
+            .where(
+                DbOutboxMessage.sent_at.is_(None),
+                DbOutboxMessage.next_attempt_at <= func.now(),
+            )
+            .order_by(DbOutboxMessage.id)
+            .limit(limit)
+            # Несколько экземпляров приложения не заберут одно и то же сообщение
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(DbOutboxMessage)
+            .where(DbOutboxMessage.id.in_(claimable))
+            .values(next_attempt_at=func.now() + timedelta(seconds=lease))
+            .returning(
+                DbOutboxMessage.id,
+                DbOutboxMessage.kind,
+                DbOutboxMessage.payload,
+                DbOutboxMessage.attempts,
+            )
+        )
+        res = await self._session.execute(stmt)
+        messages = [
+            OutboxMessage(id=row.id, kind=row.kind, payload=row.payload, attempts=row.attempts)
+            for row in res
+        ]
+        # RETURNING не гарантирует порядок — отправляем по возрастанию id
+        return sorted(messages, key=lambda m: m.id)
+
+    async def mark_sent(self, message_ids: Iterable[int]) -> None:
+        ids = list(message_ids)
+        if not ids:
+            return
+        await self._session.execute(
+            update(DbOutboxMessage)
+            .where(DbOutboxMessage.id.in_(ids))
+            .values(sent_at=func.now(), last_error=None)
+        )
+
+    async def mark_failed(
+        self, message_id: int, error: str, retry_in: Optional[float]
+    ) -> None:
+        next_attempt_at = (
+            func.now() + timedelta(seconds=retry_in) if retry_in is not None else None
+        )
+        await self._session.execute(
+            update(DbOutboxMessage)
+            .where(DbOutboxMessage.id == message_id)
+            .values(
+                attempts=DbOutboxMessage.attempts + 1,
+                last_error=error,
+                next_attempt_at=next_attempt_at,
+            )
+        )
+
+    async def release(self, message_ids: Iterable[int], retry_in: float) -> None:
+        ids = list(message_ids)
+        if not ids:
+            return
+        await self._session.execute(
+            update(DbOutboxMessage)
+            .where(DbOutboxMessage.id.in_(ids))
+            .values(next_attempt_at=func.now() + timedelta(seconds=retry_in))
+        )
@@ -1,14 +1,26 @@
 # src/infrastructure/database/repositories/product_repository.py - ПОЛНАЯ ИСПРАВЛЕННАЯ ВЕРСИЯ
 
-from sqlalchemy import select, update, delete
+from typing import Iterable
+
+from sqlalchemy import Select, case, func, or_, select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.application.interfaces.repositories.product_repository import (
     IProductRepository,
+    ProductQuery,
 )
 from src.domain.entities.product import Product as DomainProduct
 from src.infrastructure.database.models.product import Product as DbProduct
 
+# Поля, по которым разрешена сортировка в ProductQuery.order_by
+_ORDER_COLUMNS = {
+    "id": DbProduct.id,
+    "name": DbProduct.name,
+    "price": DbProduct.price,
+    "created_at": DbProduct.created_at,
+}
+_INT4_MAX = 2**31 - 1
+
 
 def _to_domain_product(db_product: DbProduct) -> DomainProduct:
     """Маппер для преобразования модели БД в доменную сущность."""
@@ -22,6 +34,46 @@ def _to_domain_product(db_product: DbProduct) -> DomainProduct:
     )
 
 
+def _escape_like(value: str) -> str:
+    """Экранирует спецсимволы LIKE, чтобы поисковая строка искалась буквально."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _apply_filters(stmt: Select, query: ProductQuery) -> Select:
+    """Добавляет к запросу WHERE-условия из ProductQuery."""
+    if query.category_id is not None:
+        stmt = stmt.where(DbProduct.category_id == query.category_id)
+    if query.search:
+        pattern = f"%{_escape_like(query.search)}%"
+        conditions = [
+            DbProduct.name.ilike(pattern, escape="\\"),
+            DbProduct.description.ilike(pattern, escape="\\"),
+        ]
+        # Числовой запрос дополнительно ищем по id товара и категории
+        if query.search.isdigit() and int(query.search) <= _INT4_MAX:
+            value = int(query.search)
+            conditions += [DbProduct.id == value, DbProduct.category_id == value]
+        stmt = stmt.where(or_(*conditions))
+    return stmt
+
+
+def _relevance(term: str, dialect: str):
+    """
+    Выражение релевантности для ORDER BY.
+
+    PostgreSQL: word_similarity из pg_trgm (совпадение в названии весит больше,
+    чем в описании). Для остальных СУБД (SQLite в тестах) — упрощённый ранг:
+    сначала совпадения в названии.
+    """
+    if dialect == "postgresql":
+        return func.greatest(
+            func.word_similarity(term, DbProduct.name),
+            func.word_similarity(term, DbProduct.description) * 0.5,
+        )
+    pattern = f"%{_escape_like(term)}%"
+    return case((DbProduct.name.ilike(pattern, escape="\\"), 1), else_=0)
+
+
 class ProductRepository(IProductRepository):
     """
 
@@ -36,6 +88,14 @@ class ProductRepository(IProductRepository):
         db_product = await self.session.scalar(stmt)
         return _to_domain_product(db_product) if db_product else None
 
+    async def get_by_ids(self, product_ids: Iterable[int]) -> dict[int, DomainProduct]:
+        ids = set(product_ids)
+        if not ids:
+            return {}
+        stmt = select(DbProduct).where(DbProduct.id.in_(ids))
+        result = await self.session.scalars(stmt)
+        return {p.id: _to_domain_product(p) for p in result.all()}
+
     async def get_by_category_id(self, category_id: int) -> list[DomainProduct]:
         stmt = select(DbProduct).where(DbProduct.category_id == category_id)
         result = await self.session.scalars(stmt)
@@ -48,6 +108,37 @@ class ProductRepository(IProductRepository):
         result = await self.session.scalars(stmt)
         return [_to_domain_product(p) for p in result.all()]
 
+    async def find(self, query: ProductQuery) -> list[DomainProduct]:
+        if query.order_by == "relevance" and query.search:
+            # Фильтр ILIKE обслуживается GIN-индексами pg_trgm, ранжирование —
+            # word_similarity по уже отобранным строкам.
+            dialect = self.session.get_bind().dialect.name
+            column = _relevance(query.search, dialect)
+            order = column.desc()
+        else:
+            column = _ORDER_COLUMNS.get(query.order_by, DbProduct.id)
+            order = column.desc() if query.descending else column.asc()
+        stmt = _apply_filters(select(DbProduct), query).order_by(order)
+        # id — стабильный «тай-брейкер», чтобы страницы не перекрывались
+        if column is not DbProduct.id:
+            stmt = stmt.order_by(DbProduct.id)
+        if query.after_id is not None:
+            # keyset: продолжаем с места, где закончилась прошлая страница
+            if query.descending:
+                stmt = stmt.where(DbProduct.id < query.after_id)
+            else:
+                stmt = stmt.where(DbProduct.id > query.after_id)
+        elif query.offset:
+            stmt = stmt.offset(query.offset)
+        if query.limit:
+            stmt = stmt.limit(query.limit)
+        result = await self.session.scalars(stmt)
+        return [_to_domain_product(p) for p in result.all()]
+
+    async def count(self, query: ProductQuery) -> int:
+        stmt = _apply_filters(select(func.count()).select_from(DbProduct), query)
+        return int(await self.session.scalar(stmt) or 0)
+
     async def add(self, product: DomainProduct) -> DomainProduct:
         db = DbProduct(
             name=product.name,
@@ -1,6 +1,7 @@
 # src/infrastructure/database/repositories/user_repository.py
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.application.interfaces.repositories.user_repository import IUserRepository
@@ -53,4 +54,52 @@ class UserRepository(IUserRepository):
         # Обновляем объект из БД, чтобы получить все поля (например, created_at)
         await self.session.refresh(db_user)
         # Возвращаем доменную сущность с реальными данными из БД
-        return _to_domain_user(db_user)
\ No newline at end of file
+        return _to_domain_user(db_user)
+
+    async def upsert(self, user: DomainUser) -> DomainUser:
+        """
+        INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING —
+        один round trip и без unique violation при одновременных /start.
+        """
+        return (await self.upsert_many([user]))[0]
+
+    async def upsert_many(self, users: list[DomainUser]) -> list[DomainUser]:
+        # Один telegram_id дважды в одном INSERT ... ON CONFLICT DO UPDATE
+        # Postgres не принимает — оставляем последнюю запись
+        unique = {user.telegram_id: user for user in users}
+        if not unique:
+            return []
+        stmt = insert(DbUser).values(
+            [
+                {
+                    "telegram_id": user.telegram_id,
+                    "full_name": user.full_name,
+                    "username": user.username,
+                }
+                for user in unique.values()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DbUser.telegram_id],
+            set_={
+                "full_name": stmt.excluded.full_name,
+                "username": stmt.excluded.username,
+            },
+        ).returning(
+            DbUser.id,
+            DbUser.telegram_id,
+            DbUser.full_name,
+            DbUser.username,
+            DbUser.created_at,
+        )
+        result = await self.session.execute(stmt)
+        return [
+            DomainUser(
+                id=row.id,
+                telegram_id=row.telegram_id,
+                full_name=row.full_name,
+                username=row.username,
+                created_at=row.created_at,
+            )
+            for row in result
+        ]
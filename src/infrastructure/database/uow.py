@@ -3,11 +3,13 @@
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.application.contracts.order.idempotency import IIdempotencyRepository
 from src.application.contracts.order.order_repository import IOrderRepository, IOrderItemRepository
 from src.application.interfaces.repositories.user_repository import IUserRepository
 from src.application.interfaces.repositories.product_repository import IProductRepository
 from src.application.contracts.persistence.uow import IUnitOfWork
 
+from src.infrastructure.database.repositories.idempotency_repository import IdempotencyRepository
 from src.infrastructure.database.repositories.order_repository import OrderRepository, OrderItemRepository
 from src.infrastructure.database.repositories.user_repository import UserRepository
 from src.infrastructure.database.repositories.product_repository import ProductRepository
@@ -21,6 +23,7 @@ class UnitOfWork(IUnitOfWork):
         self.order_items: IOrderItemRepository = OrderItemRepository(self._session)  # NEW
         self.users: IUserRepository = UserRepository(self._session)
         self.products: IProductRepository = ProductRepository(self._session)        # NEW
+        self.idempotency: IIdempotencyRepository = IdempotencyRepository(self._session)
 
     def atomic(self):
         return self._atomic()
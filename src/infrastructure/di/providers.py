@@ -16,6 +16,8 @@ from sqlalchemy.ext.asyncio import (
 from src.application.contracts.cart.cart_repository import ICartRepository
 from src.application.contracts.notifications.notifier import INotifier
 from src.application.contracts.persistence.uow import IUnitOfWork
+from src.application.contracts.rate_limit.backend import IRateLimitBackend
+from src.application.contracts.user.known_users import IKnownUserCache
 from src.application.interfaces.repositories.category_repository import (
     ICategoryRepository,
 )
@@ -33,15 +35,27 @@ from src.infrastructure.ai.gemini_client import GeminiClient
 
 # --- Импорты Реализаций ---
 from src.infrastructure.config import Settings, settings
+from src.infrastructure.database.rate_limit import PostgresRateLimitBackend
 from src.infrastructure.database.repositories.category_repository import (
     CategoryRepository,
 )
+from src.infrastructure.database.repositories.outbox_repository import (
+    OutboxRepository,
+)
 from src.infrastructure.database.repositories.product_repository import (
     ProductRepository,
 )
 from src.infrastructure.database.repositories.user_repository import UserRepository
 from src.infrastructure.database.uow import UnitOfWork
 from src.infrastructure.memory.cart_repository import InMemoryCartRepository
+from src.infrastructure.database.registration_buffer import RegistrationBuffer
+from src.infrastructure.memory.catalog_cache import CatalogCache
+from src.infrastructure.memory.known_user_cache import KnownUserCache
+from src.infrastructure.memory.recommendation_cache import RecommendationCache
+from src.infrastructure.search.product_index import ProductIndex
+from src.infrastructure.memory.rate_limit import InMemoryRateLimitBackend
+from src.infrastructure.outbox.dispatcher import OutboxDispatcher
+from src.infrastructure.outbox.notifier import OutboxNotifier
 from src.infrastructure.telegram.notifier import TelegramNotifier
 
 
@@ -66,6 +80,29 @@ class DbProvider(Provider):
     ) -> async_sessionmaker[AsyncSession]:
         return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+    @provide
+    def get_rate_limit_backend(
+        self, config: Settings, engine: AsyncEngine
+    ) -> IRateLimitBackend:
+        if config.app.rate_limit_backend == "postgres":
+            return PostgresRateLimitBackend(engine, timeout=config.app.rate_limit_timeout)
+        return InMemoryRateLimitBackend(max_keys=config.app.rate_limit_max_keys)
+
+    @provide
+    def get_registration_buffer(
+        self,
+        config: Settings,
+        session_factory: async_sessionmaker[AsyncSession],
+        known_users: IKnownUserCache,
+    ) -> RegistrationBuffer:
+        return RegistrationBuffer(
+            session_factory,
+            batch_size=config.app.registration_batch_size,
+            flush_interval=config.app.registration_flush_interval,
+            max_pending=config.app.registration_max_pending,
+            known_users=known_users,
+        )
+
     @provide(scope=Scope.REQUEST)
     async def get_session(
         self, session_factory: async_sessionmaker[AsyncSession]
@@ -81,6 +118,29 @@ class MemoryProvider(Provider):
     def get_cart_repo(self) -> ICartRepository:
         return InMemoryCartRepository()
 
+    @provide
+    def get_catalog_cache(self, config: Settings) -> CatalogCache:
+        return CatalogCache(ttl=config.app.catalog_cache_ttl)
+
+    @provide
+    def get_product_index(self, config: Settings) -> ProductIndex:
+        return ProductIndex(ttl=config.app.ai_index_ttl)
+
+    @provide
+    def get_recommendation_cache(
+        self, config: Settings, product_index: ProductIndex
+    ) -> RecommendationCache:
+        return RecommendationCache(
+            ttl=config.app.ai_cache_ttl,
+            max_entries=config.app.ai_cache_size,
+            similarity_threshold=config.app.ai_cache_similarity,
+            idf=product_index.idf,
+        )
+
+    @provide
+    def get_known_user_cache(self, config: Settings) -> IKnownUserCache:
+        return KnownUserCache(config.app.known_users_cache_size)
+
 
 class RepoProvider(Provider):
     scope = Scope.REQUEST
@@ -121,19 +181,42 @@ class TelegramProvider(Provider):
             default=DefaultBotProperties(parse_mode="HTML"),
         )
 
+    @provide
+    def get_outbox_dispatcher(
+        self,
+        config: Settings,
+        session_factory: async_sessionmaker[AsyncSession],
+        bot: Bot,
+    ) -> OutboxDispatcher:
+        return OutboxDispatcher(
+            session_factory,
+            TelegramNotifier(bot),
+            batch_size=config.app.outbox_batch_size,
+            poll_interval=config.app.outbox_poll_interval,
+            max_attempts=config.app.outbox_max_attempts,
+        )
+
 
 class ServiceProvider(Provider):
     scope = Scope.REQUEST
 
     @provide
-    def get_notifier(self, bot: Bot) -> INotifier:
-        return TelegramNotifier(bot)
+    def get_notifier(self, session: AsyncSession) -> INotifier:
+        # Уведомление пишется в outbox в транзакции заказа,
+        # в Telegram его отправляет OutboxDispatcher
+        return OutboxNotifier(OutboxRepository(session))
 
     @provide
     def get_order_service(
-        self, uow: IUnitOfWork, cart_repo: ICartRepository, notifier: INotifier
+        self,
+        uow: IUnitOfWork,
+        cart_repo: ICartRepository,
+        notifier: INotifier,
+        registrations: RegistrationBuffer,
     ) -> OrderService:
-        return OrderService(uow=uow, cart_repo=cart_repo, notifier=notifier)
+        return OrderService(
+            uow=uow, cart_repo=cart_repo, notifier=notifier, registrations=registrations
+        )
 
     @provide
     def get_category_service(
@@ -150,13 +233,28 @@ class ServiceProvider(Provider):
         return ProductService(product_repo, category_repo)
 
     @provide
-    def get_user_service(self, uow: IUnitOfWork) -> UserService:
-        return UserService(uow)
+    def get_user_service(
+        self,
+        uow: IUnitOfWork,
+        known_users: IKnownUserCache,
+        registrations: RegistrationBuffer,
+    ) -> UserService:
+        return UserService(uow, known_users, registrations)
 
     @provide
     def get_ai_consultant_service(
         self,
+        config: Settings,
         gemini_client: GeminiClient,
         product_repo: IProductRepository,
+        product_index: ProductIndex,
+        response_cache: RecommendationCache,
     ) -> AIConsultantService:
-        return AIConsultantService(gemini_client, product_repo)
+        return AIConsultantService(
+            gemini_client,
+            product_repo,
+            product_index,
+            max_candidates=config.app.ai_max_candidates,
+            response_cache=response_cache,
+            confirm_cached_in_db=config.app.ai_cache_confirm_in_db,
+        )
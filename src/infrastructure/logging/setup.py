@@ -1,11 +1,18 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logging():
+def setup_logging() -> QueueListener:
     """
     Настраивает корневой логгер для вывода в stdout.
     Этот способ более надежен, чем basicConfig, и устойчив
     к переопределению сторонними библиотеками.
+
+    Запись в stdout выполняет отдельный поток QueueListener: в event loop
+    остаётся только постановка записи в очередь, поэтому медленный вывод
+    не блокирует обработку запросов.
     """
     # Получаем корневой логгер
     root_logger = logging.getLogger()
@@ -22,11 +29,20 @@ def setup_logging():
     )
     handler.setFormatter(formatter)
 
+    # Корневой логгер только кладёт записи в очередь, пишет их listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
     # Добавляем обработчик к корневому логгеру.
     # Важно: сначала очищаем старые обработчики, если они есть.
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
-    root_logger.addHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+
+    listener.start()
+    # При выходе дописываем всё, что осталось в очереди
+    atexit.register(listener.stop)
 
     # "Канарейка": тестовое сообщение, чтобы убедиться, что наша настройка применилась
-    logging.info("--- UNYIELDING LOGGING CONFIGURED ---")
\ No newline at end of file
+    logging.info("--- UNYIELDING LOGGING CONFIGURED ---")
+    return listener
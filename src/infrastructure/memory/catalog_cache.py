@@ -0,0 +1,180 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+try:  # brotli — необязательная зависимость (ставится с aiohttp[speedups])
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+CATEGORIES_KEY = ("categories",)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def products_key(category_id: int) -> tuple[str, int]:
+    return ("products", category_id)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Готовый к отправке ответ каталога: JSON-байты, их сжатые варианты и ETag.
+    Строится один раз при загрузке в кэш, запросы только выбирают вариант.
+    Уровни сжатия — «на лету» (gzip 6, brotli 5): снимок пересобирается
+    после каждой админской записи, максимальные уровни в разы медленнее.
+    """
+    body: bytes
+    etag: str
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> "CatalogSnapshot":
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+        # Слабый ETag: сжатые варианты несут то же содержимое
+        etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        br = brotli.compress(body, quality=BROTLI_QUALITY) if brotli is not None else None
+        # Сжатие, которое не уменьшило тело (крошечные списки), не отдаём
+        return cls(
+            body=body,
+            etag=etag,
+            gzip=gzipped if len(gzipped) < len(body) else None,
+            br=br if br is not None and len(br) < len(body) else None,
+        )
+
+    @classmethod
+    async def build(cls, payload: Any) -> "CatalogSnapshot":
+        """from_payload в потоке: JSON и сжатие мегабайтного тела не блокируют цикл событий."""
+        return await asyncio.to_thread(cls.from_payload, payload)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    loaded_at: float
+
+
+class CatalogCache:
+    """
+    In-process кэш публичного каталога: список категорий и списки товаров
+    по категориям в виде CatalogSnapshot.
+
+    Сбрасывается админскими ручками записи; ttl ограничивает устаревание,
+    если каталог поменяли в обход этого процесса (другой воркер, прямой SQL).
+
+    Одновременные промахи по одному ключу (холодный кэш, всплеск открытий
+    после рассылки) ждут одну общую загрузку вместо отдельного запроса к БД.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        # Растёт при каждой инвалидации: загрузка, начавшаяся до сброса,
+        # не должна положить в кэш уже устаревшие данные
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._coalesced = 0
+        self._invalidations = 0
+        self._last_invalidated_at: float | None = None
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is not None and (not self._ttl or now - entry.loaded_at < self._ttl):
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry.value
+
+        self._misses += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self._coalesced += 1
+        else:
+            # Загрузка — отдельная задача: отмена одного ожидающего запроса
+            # не прерывает её для остальных
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        self._loads += 1
+        generation = self._generation
+        value = await loader()
+        if generation == self._generation:
+            self._entries[key] = _Entry(value=value, loaded_at=self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # ошибку уже получили ожидающие; не логировать повторно
+
+    def invalidate_categories(self) -> None:
+        self._drop(lambda key: key == CATEGORIES_KEY)
+
+    def invalidate_products(self, category_id: int | None = None) -> None:
+        """Сбрасывает товары одной категории или (None) всех категорий."""
+        if category_id is None:
+            self._drop(lambda key: key[0] == "products")
+        else:
+            self._drop(lambda key: key == products_key(category_id))
+
+    def invalidate_all(self) -> None:
+        self._drop(lambda key: True)
+
+    def _drop(self, predicate: Callable[[Any], bool]) -> None:
+        for key in [k for k in self._entries if predicate(k)]:
+            del self._entries[key]
+        # Запросы после сброса не должны присоединяться к загрузке старых данных
+        for key in [k for k in self._inflight if predicate(k)]:
+            del self._inflight[key]
+        self._generation += 1
+        self._invalidations += 1
+        self._last_invalidated_at = self._clock()
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        lookups = self._hits + self._misses
+        ages = [now - e.loaded_at for e in self._entries.values()]
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+            # Промахи, обслуженные чужой загрузкой (защита от stampede)
+            "loads": self._loads,
+            "coalesced_waiters": self._coalesced,
+            "inflight": len(self._inflight),
+            "invalidations": self._invalidations,
+            "oldest_entry_age_seconds": round(max(ages), 3) if ages else None,
+            "seconds_since_invalidation": (
+                round(now - self._last_invalidated_at, 3)
+                if self._last_invalidated_at is not None
+                else None
+            ),
+            "ttl_seconds": self._ttl,
+        }
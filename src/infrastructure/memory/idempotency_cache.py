@@ -0,0 +1,30 @@
+from collections import OrderedDict
+from typing import Optional
+
+from src.application.contracts.order.idempotency import StoredResponse
+
+
+class IdempotencyCache:
+    """
+    In-process LRU перед таблицей idempotency_keys: повтор, пришедший в тот же
+    процесс, отвечается без обращения к БД.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self._max_size = max_size
+        self._items: OrderedDict[tuple[int, str], StoredResponse] = OrderedDict()
+
+    def get(self, telegram_id: int, key: str) -> Optional[StoredResponse]:
+        response = self._items.get((telegram_id, key))
+        if response is not None:
+            self._items.move_to_end((telegram_id, key))
+        return response
+
+    def put(self, telegram_id: int, key: str, response: StoredResponse) -> None:
+        self._items[(telegram_id, key)] = response
+        self._items.move_to_end((telegram_id, key))
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
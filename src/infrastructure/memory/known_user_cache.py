@@ -0,0 +1,30 @@
+from collections import OrderedDict
+from typing import Optional
+
+from src.domain.entities.user import User
+
+
+class KnownUserCache:
+    """
+    Ограниченный LRU недавно виденных пользователей (telegram_id -> User).
+    Повторный /start того же пользователя обслуживается без обращения к БД.
+    """
+
+    def __init__(self, max_size: int = 50_000):
+        self._max_size = max_size
+        self._items: OrderedDict[int, User] = OrderedDict()
+
+    def get(self, telegram_id: int) -> Optional[User]:
+        user = self._items.get(telegram_id)
+        if user is not None:
+            self._items.move_to_end(telegram_id)
+        return user
+
+    def put(self, user: User) -> None:
+        self._items[user.telegram_id] = user
+        self._items.move_to_end(user.telegram_id)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
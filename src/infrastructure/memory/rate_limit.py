@@ -0,0 +1,93 @@
+# src/infrastructure/memory/rate_limit.py
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from src.application.contracts.rate_limit.backend import IRateLimitBackend
+
+
+def parse_limit(spec: str) -> tuple[int, float]:
+    """'120/60' -> (120 запросов, за 60 секунд)."""
+    count, _, period = spec.partition("/")
+    requests, seconds = int(count), float(period)
+    if requests <= 0 or seconds <= 0:
+        raise ValueError(f"Некорректный лимит: {spec!r}")
+    return requests, seconds
+
+
+class GcraRateLimiter:
+    """
+    Rate limiter по алгоритму GCRA: на ключ хранится одно число — TAT
+    (theoretical arrival time). Допускает всплеск до `requests` запросов,
+    дальше — не чаще одного запроса в period / requests секунд.
+
+    Ключи хранятся в LRU: простаивающие (TAT в прошлом — их состояние не
+    отличается от нового ключа) вычищаются с головы при каждом обращении,
+    а число ключей жёстко ограничено max_keys.
+    """
+
+    def __init__(
+        self,
+        requests: int,
+        period: float,
+        *,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._interval = period / requests
+        # Насколько TAT может опережать текущее время: всплеск из requests запросов
+        # (с запасом на накопленную ошибку округления float)
+        self._tolerance = period - self._interval + 1e-9
+        self._max_keys = max_keys
+        self._clock = clock
+        self._tat: OrderedDict[Hashable, float] = OrderedDict()
+
+    def hit(self, key: Hashable) -> float:
+        """Учитывает запрос. 0 — пропустить, иначе через сколько секунд повторить."""
+        now = self._clock()
+        self._sweep(now)
+
+        tat = max(self._tat.get(key, now), now)
+        if tat - now > self._tolerance:
+            self._tat.move_to_end(key)
+            return tat - now - self._tolerance
+
+        self._tat[key] = tat + self._interval
+        self._tat.move_to_end(key)
+        while len(self._tat) > self._max_keys:
+            self._tat.popitem(last=False)
+        return 0.0
+
+    def _sweep(self, now: float) -> None:
+        # Голова LRU — давно не обращавшиеся ключи; удаляем, пока они простаивают
+        while self._tat:
+            key, tat = next(iter(self._tat.items()))
+            if tat > now:
+                break
+            del self._tat[key]
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class InMemoryRateLimitBackend(IRateLimitBackend):
+    """Лимиты в памяти процесса: при нескольких воркерах каждый считает сам."""
+
+    def __init__(
+        self, *, max_keys: int = 10_000, clock: Callable[[], float] = time.monotonic
+    ):
+        self._max_keys = max_keys
+        self._clock = clock
+        self._limiters: dict[tuple[int, float], GcraRateLimiter] = {}
+
+    async def hit(self, key: str, requests: int, period: float) -> float:
+        limiter = self._limiters.get((requests, period))
+        if limiter is None:
+            limiter = GcraRateLimiter(
+                requests, period, max_keys=self._max_keys, clock=self._clock
+            )
+            self._limiters[(requests, period)] = limiter
+        return limiter.hit(key)
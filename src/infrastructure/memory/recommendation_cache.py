@@ -0,0 +1,118 @@
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from src.infrastructure.search.stemmer import tokenize
+
+
+def normalize_query(query: str) -> tuple[str, ...]:
+    """Нижний регистр, без стоп-слов, основы слов, отсортированные и без повторов."""
+    return tuple(sorted(set(tokenize(query))))
+
+
+@dataclass
+class _Entry:
+    terms: tuple[str, ...]
+    catalog_version: int
+    vector: dict[str, float]
+    response: dict[str, Any]
+    expires_at: float
+
+
+class RecommendationCache:
+    """
+    Кэш ответов AI-консультанта: одинаковые по смыслу вопросы («Ноутбук для
+    работы?» и «ноутбук, для работы») не идут в Gemini повторно.
+
+    Ключ — нормализованный запрос и версия каталога (ProductIndex.version).
+    Записи живут ttl секунд, сверх max_entries вытесняется самая давняя по
+    использованию. При заданном similarity_threshold промах по точному ключу
+    дополнительно ищет запрос той же версии каталога с косинусной близостью
+    TF-IDF векторов не ниже порога; веса термов даёт idf (по каталогу).
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_entries: int = 1000,
+        *,
+        similarity_threshold: Optional[float] = None,
+        idf: Optional[Callable[[str], float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._threshold = similarity_threshold
+        self._idf = idf
+        self._clock = clock
+        self._entries: OrderedDict[tuple[tuple[str, ...], int], _Entry] = OrderedDict()
+        self._hits = 0
+        self._similar_hits = 0
+        self._misses = 0
+
+    def _vector(self, terms: tuple[str, ...]) -> dict[str, float]:
+        weights = {term: self._idf(term) if self._idf else 1.0 for term in terms}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+
+    def get(self, query: str, catalog_version: int) -> Optional[dict[str, Any]]:
+        terms = normalize_query(query)
+        if not terms:
+            return None
+        now = self._clock()
+        key = (terms, catalog_version)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[key]
+            entry = None
+        if entry is None and self._threshold is not None:
+            entry = self._most_similar(terms, catalog_version, now)
+            if entry is not None:
+                self._similar_hits += 1
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end((entry.terms, entry.catalog_version))
+        return dict(entry.response)
+
+    def _most_similar(self, terms: tuple[str, ...], catalog_version: int, now: float) -> Optional[_Entry]:
+        vector = self._vector(terms)
+        best, best_score = None, self._threshold
+        for entry in self._entries.values():
+            if entry.catalog_version != catalog_version or entry.expires_at <= now:
+                continue
+            score = sum(w * entry.vector.get(term, 0.0) for term, w in vector.items())
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def put(self, query: str, catalog_version: int, response: dict[str, Any]) -> None:
+        terms = normalize_query(query)
+        if not terms:
+            return
+        key = (terms, catalog_version)
+        self._entries[key] = _Entry(
+            terms=terms,
+            catalog_version=catalog_version,
+            vector=self._vector(terms),
+            response=dict(response),
+            expires_at=self._clock() + self._ttl,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "similar_hits": self._similar_hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+            "ttl_seconds": self._ttl,
+            "similarity_threshold": self._threshold,
+        }
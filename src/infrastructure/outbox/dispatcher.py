@@ -0,0 +1,159 @@
+# src/infrastructure/outbox/dispatcher.py
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.application.contracts.notifications.notifier import INotifier
+from src.application.contracts.notifications.outbox import (
+    IOutboxRepository,
+    OutboxMessage,
+)
+from src.infrastructure.database.repositories.outbox_repository import OutboxRepository
+from src.infrastructure.outbox.notifier import ORDER_CREATED, order_from_payload
+
+logger = logging.getLogger(__name__)
+
+# Ошибки, которые повтор не исправит: бот заблокирован, чат не найден,
+# неизвестный тип или битый payload сообщения.
+_PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest, KeyError, ValueError)
+
+
+class OutboxDispatcher:
+    """
+    Фоновая доставка сообщений из outbox.
+    Забирает пачку неотправленных сообщений, отправляет их через notifier
+    и помечает отправленными; при ошибке откладывает сообщение с
+    экспоненциальной задержкой, после max_attempts попыток сдаётся.
+
+    Пачка берётся в аренду на lease секунд короткой транзакцией, отправка
+    идёт вне транзакции. Если процесс упадёт посреди пачки, неотмеченные
+    сообщения снова станут доступны по истечении аренды.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        notifier: INotifier,
+        *,
+        batch_size: int = 50,
+        poll_interval: float = 1.0,
+        max_attempts: int = 10,
+        max_backoff: float = 300.0,
+        lease: float = 300.0,
+        repo_factory: Callable[[AsyncSession], IOutboxRepository] = OutboxRepository,
+    ):
+        self._session_factory = session_factory
+        self._notifier = notifier
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._max_backoff = max_backoff
+        self._lease = lease
+        self._repo_factory = repo_factory
+        self._handlers: dict[str, Callable[[OutboxMessage], Awaitable[None]]] = {
+            ORDER_CREATED: self._deliver_order_created,
+        }
+
+    async def run(self) -> None:
+        """Бесконечный цикл; останавливается отменой задачи."""
+        logger.info("Outbox dispatcher запущен.")
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ошибка при обработке outbox")
+                processed = 0
+            # Полная пачка — вероятно, есть ещё сообщения, забираем сразу
+            if processed < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
+
+    async def dispatch_once(self) -> int:
+        """Обрабатывает одну пачку, возвращает число взятых сообщений."""
+        # 1. Короткая транзакция: арендуем пачку (next_attempt_at сдвигается на
+        # lease), строки не остаются заблокированными на время отправки
+        async with self._session_factory() as session:
+            async with session.begin():
+                messages = await self._repo_factory(session).claim_batch(
+                    self._batch_size, lease=self._lease
+                )
+        if not messages:
+            return 0
+
+        # 2. Отправка без открытой транзакции и без соединения из пула
+        sent: list[int] = []
+        failed: list[tuple[int, str, float | None]] = []
+        postponed: list[int] = []
+        flood_wait: float | None = None
+        for message in messages:
+            if flood_wait is not None:
+                # Telegram уже попросил подождать — остальные не шлём в тот же flood wait
+                postponed.append(message.id)
+                continue
+            try:
+                await self._deliver(message)
+            except Exception as e:
+                retry_in = self._retry_in(message, e)
+                self._log_failure(message, e, retry_in)
+                failed.append((message.id, repr(e), retry_in))
+                if isinstance(e, TelegramRetryAfter):
+                    flood_wait = float(e.retry_after)
+            else:
+                sent.append(message.id)
+
+        # 3. Вторая короткая транзакция: фиксируем результаты
+        async with self._session_factory() as session:
+            async with session.begin():
+                outbox = self._repo_factory(session)
+                await outbox.mark_sent(sent)
+                for message_id, error, retry_in in failed:
+                    await outbox.mark_failed(message_id, error, retry_in)
+                if postponed:
+                    await outbox.release(postponed, flood_wait)
+        return len(messages)
+
+    @staticmethod
+    def _log_failure(message: OutboxMessage, error: Exception, retry_in: float | None) -> None:
+        if retry_in is None:
+            logger.error(
+                "Outbox: сообщение %s (%s) не доставлено, попытки прекращены: %r",
+                message.id, message.kind, error,
+            )
+        else:
+            logger.warning(
+                "Outbox: сообщение %s (%s) не доставлено, повтор через %.0f с: %r",
+                message.id, message.kind, retry_in, error,
+            )
+
+    def _retry_in(self, message: OutboxMessage, error: Exception) -> float | None:
+        attempts = message.attempts + 1
+        if isinstance(error, _PERMANENT_ERRORS) or attempts >= self._max_attempts:
+            return None
+        if isinstance(error, TelegramRetryAfter):
+            return float(error.retry_after)
+        return min(2.0 ** attempts, self._max_backoff)
+
+    async def _deliver(self, message: OutboxMessage) -> None:
+        handler = self._handlers.get(message.kind)
+        if handler is None:
+            raise ValueError(f"Неизвестный тип сообщения outbox: {message.kind}")
+        await handler(message)
+
+    async def _deliver_order_created(self, message: OutboxMessage) -> None:
+        payload = message.payload
+        await self._notifier.notify_order_created(
+            telegram_id=payload["telegram_id"],
+            order=order_from_payload(payload),
+            full_name=payload.get("full_name"),
+            phone=payload.get("phone"),
+            address=payload.get("address"),
+        )
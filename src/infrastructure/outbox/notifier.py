@@ -0,0 +1,69 @@
+# src/infrastructure/outbox/notifier.py
+from __future__ import annotations
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from src.application.contracts.notifications.notifier import INotifier
+from src.application.contracts.notifications.outbox import IOutboxRepository
+from src.domain.entities.order import Order, OrderStatus
+
+ORDER_CREATED = "order_created"
+
+
+def order_created_payload(
+    telegram_id: int,
+    order: Order,
+    full_name: Optional[str] = None,
+    phone: Optional[str] = None,
+    address: Optional[str] = None,
+) -> dict[str, Any]:
+    """JSON-совместимый снимок заказа для outbox."""
+    return {
+        "telegram_id": telegram_id,
+        "order": {
+            "id": order.id,
+            "user_id": order.user_id,
+            "status": order.status.value,
+            "total_amount": str(order.total_amount),
+            "created_at": order.created_at.isoformat(),
+        },
+        "full_name": full_name,
+        "phone": phone,
+        "address": address,
+    }
+
+
+def order_from_payload(payload: dict[str, Any]) -> Order:
+    data = payload["order"]
+    return Order(
+        id=data["id"],
+        user_id=data["user_id"],
+        status=OrderStatus(data["status"]),
+        total_amount=Decimal(data["total_amount"]),
+        created_at=datetime.fromisoformat(data["created_at"]),
+    )
+
+
+class OutboxNotifier(INotifier):
+    """
+    Вместо отправки в Telegram записывает уведомление в outbox.
+    Запись идёт в той же сессии, что и заказ, поэтому попадает в его транзакцию;
+    доставкой занимается OutboxDispatcher.
+    """
+
+    def __init__(self, outbox: IOutboxRepository):
+        self._outbox = outbox
+
+    async def notify_order_created(
+        self,
+        telegram_id: int,
+        order: Order,
+        full_name: Optional[str] = None,
+        phone: Optional[str] = None,
+        address: Optional[str] = None,
+    ) -> None:
+        await self._outbox.add(
+            ORDER_CREATED,
+            order_created_payload(telegram_id, order, full_name, phone, address),
+        )
@@ -0,0 +1,199 @@
+# src/infrastructure/search/product_index.py
+from __future__ import annotations
+import asyncio
+import hashlib
+import heapq
+import math
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Iterable, Optional
+
+from src.application.services.ai_prompt import format_product_line
+from src.domain.entities.product import Product
+from src.infrastructure.search.stemmer import tokenize
+
+# Название весомее описания: его термы учитываются NAME_WEIGHT раз
+NAME_WEIGHT = 2
+
+
+class ProductIndex:
+    """
+    In-process индекс BM25 по названию и описанию товаров.
+
+    AI-консультант берёт из него top-K кандидатов под запрос вместо всего
+    каталога. Админские записи товаров обновляют индекс точечно (upsert/remove).
+    Изменения, сделанные другим процессом, подтягиваются полной перестройкой
+    не реже раза в ttl секунд (0 — только явная перестройка). refresh()
+    выполняет её один раз на всех ждущих: новые структуры строятся в потоке,
+    вне цикла событий, и подменяются целиком.
+
+    Заодно индекс хранит готовые строки товаров для промпта и собранный блок
+    всего каталога; version растёт при каждом изменении и сбрасывает блок.
+    Перестройка с тем же содержимым (сверка по дайджесту строк) version не
+    меняет: кэш ответов AI, привязанный к версии, переживает плановый TTL.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl = ttl
+        self._k1 = k1
+        self._b = b
+        self._clock = clock
+        self._built_at: Optional[float] = None
+        self._products: dict[int, Product] = {}
+        self._lengths: dict[int, int] = {}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._total_length = 0
+        self._lines: dict[int, str] = {}
+        self.version = 0
+        self._digest: Optional[bytes] = None
+        self._catalog_block: Optional[tuple[int, str]] = None
+        self._refresh_lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        if self._built_at is None:
+            return True
+        return bool(self._ttl) and self._clock() - self._built_at >= self._ttl
+
+    def invalidate(self) -> None:
+        """Следующий поиск перестроит индекс (например, после каскадного удаления)."""
+        self._built_at = None
+
+    def rebuild(self, products: Iterable[Product]) -> None:
+        self._swap(self._build(products))
+
+    async def refresh(self, load: Callable[[], Awaitable[Iterable[Product]]]) -> None:
+        """
+        Перестраивает устаревший индекс. Параллельные вызовы ждут одну
+        загрузку и одну сборку, а не делают каждый свою.
+        """
+        async with self._refresh_lock:
+            if not self.is_stale():
+                return
+            products = list(await load())
+            version = self.version
+            fresh = await asyncio.to_thread(self._build, products)
+            # Пока шла сборка, админ мог изменить товар — в снимке этого нет
+            touched = self.version != version
+            self._swap(fresh)
+            if touched:
+                self.invalidate()
+
+    def _build(self, products: Iterable[Product]) -> ProductIndex:
+        fresh = ProductIndex(self._ttl, k1=self._k1, b=self._b, clock=self._clock)
+        for product in products:
+            fresh._add(product)
+        fresh._digest = fresh._content_digest()
+        return fresh
+
+    def _swap(self, fresh: ProductIndex) -> None:
+        self._products = fresh._products
+        self._lengths = fresh._lengths
+        self._postings = fresh._postings
+        self._lines = fresh._lines
+        self._total_length = fresh._total_length
+        self._built_at = self._clock()
+        if fresh._digest != self._digest:
+            self._digest = fresh._digest
+            self.version += 1
+
+    def _content_digest(self) -> bytes:
+        # Строка товара включает id, название, описание и цену — всё, от чего
+        # зависят поиск и промпт
+        h = hashlib.blake2b(digest_size=16)
+        for product_id in sorted(self._lines):
+            h.update(self._lines[product_id].encode())
+            h.update(b"\n")
+        return h.digest()
+
+    def _changed(self) -> None:
+        # Дайджест последней перестройки больше не описывает содержимое
+        self._digest = None
+        self.version += 1
+
+    def upsert(self, product: Product) -> None:
+        self.remove(product.id)
+        self._add(product)
+        self._changed()
+
+    def remove(self, product_id: int) -> None:
+        product = self._products.pop(product_id, None)
+        if product is None:
+            return
+        for term in self._terms(product):
+            postings = self._postings.get(term)
+            if postings is not None and postings.pop(product_id, None) is not None and not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(product_id)
+        del self._lines[product_id]
+        self._changed()
+
+    def _terms(self, product: Product) -> Counter[str]:
+        terms = Counter(tokenize(product.description or ""))
+        for term in tokenize(product.name):
+            terms[term] += NAME_WEIGHT
+        return terms
+
+    def _add(self, product: Product) -> None:
+        terms = self._terms(product)
+        self._products[product.id] = product
+        self._lines[product.id] = format_product_line(product)
+        length = sum(terms.values())
+        self._lengths[product.id] = length
+        self._total_length += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[product.id] = tf
+
+    def idf(self, term: str) -> float:
+        """IDF терма (как в BM25): редкие в каталоге слова весомее."""
+        n_docs = len(self._products)
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def context_block(self, products: Iterable[Product]) -> str:
+        """Блок каталога для промпта из уже отформатированных строк."""
+        lines = self._lines
+        return "\n".join(lines.get(p.id) or format_product_line(p) for p in products)
+
+    def catalog_block(self) -> str:
+        """Блок всего каталога; собирается один раз на версию индекса."""
+        if self._catalog_block is None or self._catalog_block[0] != self.version:
+            block = "\n".join(self._lines[product_id] for product_id in sorted(self._lines))
+            self._catalog_block = (self.version, block)
+        return self._catalog_block[1]
+
+    def search(self, query: str, limit: int) -> list[Product]:
+        n_docs = len(self._products)
+        if not n_docs or limit <= 0:
+            return []
+        avg_length = self._total_length / n_docs or 1.0
+        k1, b = self._k1, self._b
+
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for product_id, tf in postings.items():
+                norm = k1 * (1 - b + b * self._lengths[product_id] / avg_length)
+                scores[product_id] = scores.get(product_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        if not scores:
+            # Ни один терм не встретился (запрос «на подарок маме») — отдаём
+            # часть каталога, чтобы модель всё же могла что-то предложить
+            return [self._products[product_id] for product_id in sorted(self._products)[:limit]]
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [self._products[product_id] for product_id, _ in best]
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._products
+
+    def __len__(self) -> int:
+        return len(self._products)
@@ -0,0 +1,145 @@
+# src/infrastructure/search/stemmer.py
+"""
+Токенизация и стемминг для поиска по каталогу.
+
+Русские слова приводятся к основе упрощённым алгоритмом Snowball (Портера)
+для русского языка: «ноутбуки», «ноутбука» и «ноутбуком» дают одну основу.
+Латиница и числа («rtx», «4090», «16gb») остаются как есть.
+"""
+
+import re
+from functools import lru_cache
+
+_TOKEN_RE = re.compile(r"[a-zа-я0-9]+")
+_VOWELS = "аеиоуыэюя"
+
+# Служебные слова и типичные слова запроса, не несущие смысла для подбора
+STOP_WORDS = frozenset(
+    """
+    и в во на с со для по от до из к ко у о об а но или не ни что чтобы как
+    это этот эта эти то так же бы ли я мне меня мой моя мы вы ты он она они
+    нужен нужна нужно нужны хочу ищу подберите подбери посоветуй какой какая
+    какие который которая очень самый более менее
+    """.split()
+)
+
+def _by_length(*endings: str) -> tuple[str, ...]:
+    """Окончания от длинных к коротким: отрезается самое длинное совпадение."""
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+_PERFECTIVE_GERUND_1 = _by_length("вшись", "вши", "в")
+_PERFECTIVE_GERUND_2 = _by_length("ывшись", "ившись", "ывши", "ивши", "ыв", "ив")
+_ADJECTIVE = _by_length(
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей", "ий",
+    "ый", "ой", "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)
+_PARTICIPLE_1 = _by_length("ем", "нн", "вш", "ющ", "щ")
+_PARTICIPLE_2 = _by_length("ивш", "ывш", "ующ")
+_REFLEXIVE = _by_length("ся", "сь")
+_VERB_1 = _by_length(
+    "ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но", "ет", "ют",
+    "ны", "ть", "й", "л", "н",
+)
+_VERB_2 = _by_length(
+    "ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено",
+    "ует", "уют", "ены", "ить", "ыть", "ишь", "ей", "уй", "ил", "ыл", "им", "ым",
+    "ен", "ят", "ит", "ыт", "ую", "ю",
+)
+_NOUN = _by_length(
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие", "ье", "еи",
+    "ии", "ей", "ой", "ий", "ям", "ем", "ам", "ом", "ах", "ях", "ию", "ью", "ия",
+    "ья", "а", "е", "и", "й", "о", "у", "ы", "ь", "ю", "я",
+)
+_SUPERLATIVE = _by_length("ейше", "ейш")
+_DERIVATIONAL = _by_length("ость", "ост")
+
+
+def _strip(word: str, endings: tuple[str, ...], after_a: bool = False) -> str | None:
+    """
+    Отрезает самое длинное подходящее окончание. after_a — окончания «группы 1»,
+    которые отрезаются, только если им предшествует «а» или «я».
+    Возвращает None, если ничего не отрезано.
+    """
+    for ending in endings:
+        if word.endswith(ending):
+            rest = word[: -len(ending)]
+            if after_a and not rest.endswith(("а", "я")):
+                continue
+            return rest
+    return None
+
+
+def _region_after_consonant(word: str, start: int) -> int:
+    """Начало области после первого сочетания «гласная + согласная» начиная со start."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _step1(rv: str) -> str:
+    """Шаг 1: деепричастие, иначе (возвратность) + прилагательное/глагол/существительное."""
+    rest = _strip(rv, _PERFECTIVE_GERUND_1, after_a=True)
+    if rest is None:
+        rest = _strip(rv, _PERFECTIVE_GERUND_2)
+    if rest is not None:
+        return rest
+
+    rv = _strip(rv, _REFLEXIVE) or rv
+    rest = _strip(rv, _ADJECTIVE)
+    if rest is not None:
+        return _strip(rest, _PARTICIPLE_1, after_a=True) or _strip(rest, _PARTICIPLE_2) or rest
+    rest = _strip(rv, _VERB_1, after_a=True)
+    if rest is None:
+        rest = _strip(rv, _VERB_2)
+    if rest is None:
+        rest = _strip(rv, _NOUN)
+    return rv if rest is None else rest
+
+
+def _step3(prefix: str, rv: str) -> str:
+    """Шаг 3: словообразовательное окончание в R2 (R2 считается по всему слову)."""
+    word = prefix + rv
+    r2 = _region_after_consonant(word, _region_after_consonant(word, 0))
+    for ending in _DERIVATIONAL:
+        if word.endswith(ending) and len(word) - len(ending) >= r2:
+            return rv[: -len(ending)]
+    return rv
+
+
+def _step4(rv: str) -> str:
+    """Шаг 4: «нн» -> «н», превосходная степень, мягкий знак."""
+    rv = _strip(rv, _SUPERLATIVE) or rv
+    if rv.endswith(("нн", "ь")):
+        rv = rv[:-1]
+    return rv
+
+
+# Словарь каталога невелик: основа каждого слова вычисляется один раз
+@lru_cache(maxsize=65536)
+def stem_ru(word: str) -> str:
+    """Основа русского слова (упрощённый Snowball)."""
+    rv_start = next((i + 1 for i, ch in enumerate(word) if ch in _VOWELS), len(word))
+    prefix, rv = word[:rv_start], word[rv_start:]
+    if not rv:
+        return word
+
+    rv = _step1(rv)
+    # Шаг 2
+    if rv.endswith("и"):
+        rv = rv[:-1]
+    rv = _step3(prefix, rv)
+    return prefix + _step4(rv)
+
+
+def tokenize(text: str) -> list[str]:
+    """Нормализованные термы текста: нижний регистр, без стоп-слов, русские — в основе."""
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower().replace("ё", "е")):
+        if token in STOP_WORDS:
+            continue
+        if token[0] in "абвгдежзийклмнопрстуфхцчшщъыьэюя":
+            token = stem_ru(token)
+        terms.append(token)
+    return terms
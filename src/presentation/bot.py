@@ -20,7 +20,7 @@ from src.infrastructure.di.providers import (
 from src.infrastructure.logging.setup import setup_logging
 from src.presentation.handlers.ai_consultant import ai_router
 from src.presentation.handlers.common import common_router
-from src.presentation.middlewares import LoggingMiddleware
+from src.presentation.middlewares import setup_update_logging
 from src.presentation.web.app import setup_app
 
 
@@ -41,7 +41,7 @@ def main():
     )
     dp = Dispatcher(dishka_container=container)
 
-    dp.update.outer_middleware(LoggingMiddleware())
+    setup_update_logging(dp, dump_sample_rate=settings.bot.update_dump_sample_rate)
     dp.include_router(common_router)
     dp.include_router(ai_router)
 
@@ -25,7 +25,8 @@ async def start_handler(message: Message, dishka_container: AsyncContainer):
 
     async with dishka_container(scope=Scope.REQUEST) as request_container:
         user_service = await request_container.get(UserService)
-        await user_service.register_user_if_not_exists(
+        # При всплеске /start регистрация уходит в БД пачкой (RegistrationBuffer)
+        await user_service.register_user(
             telegram_id=message.from_user.id,
             full_name=message.from_user.full_name,
             username=message.from_user.username,
@@ -1,25 +1,88 @@
 # src/presentation/middlewares.py
 
 import logging
+import random
+import time
 from typing import Any, Awaitable, Callable, Dict
 
-from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+logger = logging.getLogger("bot.updates")
+
+# Ключ в data, через который внутренний middleware сообщает имя хендлера
+LOG_CONTEXT_KEY = "update_log_context"
 
 
 class LoggingMiddleware(BaseMiddleware):
     """
-    Промежуточный слой для логирования всех входящих обновлений.
+    Однострочный структурированный лог каждого обновления: тип, чат,
+    хендлер и время обработки. Полный дамп обновления пишется только
+    для доли обновлений dump_sample_rate (0 — никогда).
     """
+
+    def __init__(
+        self,
+        dump_sample_rate: float = 0.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        self._dump_sample_rate = dump_sample_rate
+        self._rng = rng
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        # Просто выводим в лог все содержимое объекта Update
-        # Используем to_python() для более чистого вывода
-        logging.info(f"--- CAPTURED UPDATE ---\n{event.model_dump_json(indent=2)}")
+        if self._dump_sample_rate > 0 and self._rng() < self._dump_sample_rate:
+            logger.info("update dump: %s", event.model_dump_json(exclude_none=True))
+
+        context: Dict[str, Any] = {}
+        data[LOG_CONTEXT_KEY] = context
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return await handler(event, data)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            if logger.isEnabledFor(logging.INFO):
+                chat = data.get("event_chat")
+                update_type = event.event_type if isinstance(event, Update) else type(event).__name__
+                latency_ms = (time.perf_counter() - started) * 1000
+                logger.info(
+                    "update id=%s type=%s chat=%s handler=%s status=%s latency_ms=%.1f",
+                    getattr(event, "update_id", None),
+                    update_type,
+                    chat.id if chat else None,
+                    context.get("handler", "-"),
+                    status,
+                    latency_ms,
+                )
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """Внутренний middleware: запоминает имя сработавшего хендлера для LoggingMiddleware."""
 
-        # Передаем управление дальше по цепочке middleware и хендлеров
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        context = data.get(LOG_CONTEXT_KEY)
+        handler_object = data.get("handler")
+        if context is not None and handler_object is not None:
+            context["handler"] = handler_object.callback.__qualname__
         return await handler(event, data)
+
+
+def setup_update_logging(dispatcher: Dispatcher, dump_sample_rate: float = 0.0) -> None:
+    """Подключает логирование обновлений к диспетчеру и всем типам событий."""
+    dispatcher.update.outer_middleware(LoggingMiddleware(dump_sample_rate))
+    handler_name = HandlerNameMiddleware()
+    for name, observer in dispatcher.observers.items():
+        if name not in ("update", "error"):
+            observer.middleware(handler_name)
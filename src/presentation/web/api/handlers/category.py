@@ -4,8 +4,14 @@ from aiohttp import web
 from dishka import AsyncContainer, Scope
 
 from src.application.services.catalog import CategoryService
+from src.infrastructure.memory.catalog_cache import (
+    CATEGORIES_KEY,
+    CatalogCache,
+    CatalogSnapshot,
+)
 from src.presentation.web.api.schemas.category import CategorySchema
 from src.presentation.web.app_keys import APP_DISHKA_CONTAINER
+from src.presentation.web.http_cache import snapshot_response
 
 async def get_categories(request: web.Request) -> web.Response:
     """
@@ -13,12 +19,17 @@ async def get_categories(request: web.Request) -> web.Response:
     GET /api/categories
     """
     dishka_container: AsyncContainer = request.app[APP_DISHKA_CONTAINER]
-    
-    async with dishka_container(scope=Scope.REQUEST) as request_container:
-        category_service = await request_container.get(CategoryService)
-        categories = await category_service.get_all()
+    cache = await dishka_container.get(CatalogCache)
 
+    async def load() -> CatalogSnapshot:
+        async with dishka_container(scope=Scope.REQUEST) as request_container:
+            category_service = await request_container.get(CategoryService)
+            categories = await category_service.get_all()
         # Сериализуем SQLAlchemy-объекты в JSON с помощью Pydantic-схемы
-        response_data = [CategorySchema.model_validate(cat).model_dump() for cat in categories]
-        
-        return web.json_response(response_data)
\ No newline at end of file
+        return await CatalogSnapshot.build(
+            [CategorySchema.model_validate(cat).model_dump() for cat in categories]
+        )
+
+    # В кэше лежат готовые байты: БД, Pydantic и сжатие — только на промахе
+    snapshot = await cache.get_or_load(CATEGORIES_KEY, load)
+    return snapshot_response(request, snapshot)
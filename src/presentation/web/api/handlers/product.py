@@ -4,8 +4,14 @@ from aiohttp import web
 from dishka import AsyncContainer, Scope
 
 from src.application.services.catalog import ProductService
+from src.infrastructure.memory.catalog_cache import (
+    CatalogCache,
+    CatalogSnapshot,
+    products_key,
+)
 from src.presentation.web.api.schemas.product import ProductSchema
 from src.presentation.web.app_keys import APP_DISHKA_CONTAINER
+from src.presentation.web.http_cache import snapshot_response
 
 async def get_products_by_category(request: web.Request) -> web.Response:
     """
@@ -18,9 +24,15 @@ async def get_products_by_category(request: web.Request) -> web.Response:
         return web.json_response({'error': 'Invalid or missing category_id'}, status=400)
 
     dishka_container: AsyncContainer = request.app[APP_DISHKA_CONTAINER]
-    async with dishka_container(scope=Scope.REQUEST) as request_container:
-        product_service = await request_container.get(ProductService)
-        products = await product_service.get_by_category(category_id)
+    cache = await dishka_container.get(CatalogCache)
 
-        response_data = [ProductSchema.model_validate(p).model_dump() for p in products]
-        return web.json_response(response_data)
+    async def load() -> CatalogSnapshot:
+        async with dishka_container(scope=Scope.REQUEST) as request_container:
+            product_service = await request_container.get(ProductService)
+            products = await product_service.get_by_category(category_id)
+        return await CatalogSnapshot.build(
+            [ProductSchema.model_validate(p).model_dump() for p in products]
+        )
+
+    snapshot = await cache.get_or_load(products_key(category_id), load)
+    return snapshot_response(request, snapshot)
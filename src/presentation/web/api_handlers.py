@@ -1,23 +1,29 @@
 # src/presentation/web/api_handlers.py
 
+import base64
 import dataclasses
+import json
 import logging
+from datetime import datetime, timezone
 from http import HTTPStatus
 
 from aiohttp import web
 from decimal import Decimal
 from dishka import Scope
 
+from src.application.interfaces.repositories.product_repository import ProductQuery
 from src.application.services.catalog import CategoryService, ProductService
+from src.application.contracts.order.order_repository import OrderQuery
 from src.application.services.order_service import OrderService
+from src.domain.entities.order import OrderStatus
 from src.presentation.web.api.schemas.product import (
     ProductSchema,
     ProductCreateSchema,
     ProductUpdateSchema,
 )
-from src.infrastructure.config import settings
-import hashlib
-import hmac
+from src.infrastructure.memory.catalog_cache import CatalogCache
+from src.infrastructure.memory.recommendation_cache import RecommendationCache
+from src.infrastructure.search.product_index import ProductIndex
 from src.presentation.web.api.schemas.order import OrderItemSchema
 from src.presentation.web.api.schemas.category import (
     CategorySchema,
@@ -27,28 +33,25 @@ from src.presentation.web.api.schemas.category import (
 from src.presentation.web.errors import json_error
 from pydantic import ValidationError
 from src.presentation.web.auth.telegram import validate_telegram_data
-from src.presentation.web.app_keys import APP_DISHKA_CONTAINER
-def _is_admin(request: web.Request) -> bool:
-    token = request.headers.get("X-Admin-Token")
-    user_id = request.headers.get("X-Admin-User")
-    if not token or not user_id:
-        return False
-    # Verify token HMAC( secret_token, user_id )
-    secret = settings.app.secret_token.get_secret_value()
-    expected = hmac.new(secret.encode(), user_id.encode(), hashlib.sha256).hexdigest()
-    if not hmac.compare_digest(token, expected):
-        return False
-    allowed_csv = getattr(settings.app, 'admin_ids', '')
-    if not allowed_csv:
-        return True
-    allowed = set(x.strip() for x in allowed_csv.split(',') if x.strip())
-    return user_id in allowed
-from src.presentation.web.auth.telegram import validate_telegram_data
-from src.presentation.web.app_keys import APP_DISHKA_CONTAINER
+from src.presentation.web.app_keys import (
+    APP_CONCURRENCY_LIMITERS,
+    APP_DISHKA_CONTAINER,
+    APP_UPDATE_QUEUE,
+)
 
 routes = web.RouteTableDef()
 
 
+async def _catalog_cache(request: web.Request) -> CatalogCache:
+    """Кэш публичного каталога: админские записи должны его сбрасывать."""
+    return await request.app[APP_DISHKA_CONTAINER].get(CatalogCache)
+
+
+async def _product_index(request: web.Request) -> ProductIndex:
+    """Индекс товаров AI-консультанта: обновляется точечно при записи товара."""
+    return await request.app[APP_DISHKA_CONTAINER].get(ProductIndex)
+
+
 def _parse_pagination(request: web.Request) -> tuple[int, int, str | None]:
     q = request.rel_url.query.get("q")
     try:
@@ -62,29 +65,97 @@ def _parse_pagination(request: web.Request) -> tuple[int, int, str | None]:
         offset = 0
     return limit, offset, (q or None)
 
+def _parse_datetime(value: str | None) -> datetime | None:
+    """ISO-дата из query-параметра; aware-значения приводятся к naive UTC (как в БД)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 def _apply_pagination_and_headers(
     request: web.Request,
     data_list: list,
     *,
     limit: int,
     offset: int,
+    total: int | None = None,
+    next_cursor: str | None = None,
 ) -> web.Response:
-    total = len(data_list)
-    if limit:
+    """
+    Формирует ответ со списком и заголовками пагинации.
+
+    Если передан total, data_list уже является страницей (пагинация выполнена в БД).
+    """
+    if total is not None:
+        sliced = data_list
+    elif limit:
+        total = len(data_list)
         sliced = data_list[offset : offset + limit]
     else:
+        total = len(data_list)
         sliced = data_list
     resp = web.json_response(data=sliced, status=HTTPStatus.OK)
     resp.headers["X-Total-Count"] = str(total)
     resp.headers["X-Limit"] = str(limit)
     resp.headers["X-Offset"] = str(offset)
+    if next_cursor:
+        resp.headers["X-Next-Cursor"] = next_cursor
     return resp
 
 
+def _encode_cursor(*parts) -> str:
+    """Непрозрачный курсор keyset-пагинации: base64url от JSON-списка ключей."""
+    raw = json.dumps(list(parts), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _parse_cursor(request: web.Request) -> list | None:
+    """
+    Возвращает ключи из ?after=<cursor> или None, если курсор не передан.
+    Повреждённый курсор — ValueError.
+    """
+    cursor = request.rel_url.query.get("after")
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        parts = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(parts, list) or not parts:
+        raise ValueError("invalid cursor")
+    return parts
+
+
+def _next_cursor(page: list, limit: int, key) -> str | None:
+    """Курсор на следующую страницу, если текущая заполнена целиком."""
+    if not limit or len(page) < limit:
+        return None
+    return _encode_cursor(*key(page[-1]))
+
+
+def _cursor_page_response(
+    data_list: list, *, limit: int, next_cursor: str | None
+) -> web.Response:
+    """Ответ в режиме ?after=<cursor>: без COUNT(*), только X-Limit и X-Next-Cursor."""
+    resp = web.json_response(data=data_list, status=HTTPStatus.OK)
+    resp.headers["X-Limit"] = str(limit)
+    if next_cursor:
+        resp.headers["X-Next-Cursor"] = next_cursor
+    return resp
+
+
+def _bad_cursor() -> web.Response:
+    return json_error("Bad cursor", code="bad_request", status=HTTPStatus.BAD_REQUEST)
+
+
 @routes.get("/api/v1/admin/categories")
 async def get_categories(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     """Возвращает список всех категорий."""
     try:
         container = request.app[APP_DISHKA_CONTAINER]
@@ -92,6 +163,10 @@ async def get_categories(request: web.Request) -> web.Response:
             service = await req.get(CategoryService)
             categories = await service.get_all()
         limit, offset, q = _parse_pagination(request)
+        try:
+            after = _parse_cursor(request)
+        except ValueError:
+            return _bad_cursor()
         items = categories
         if q:
             ql = q.lower()
@@ -101,8 +176,30 @@ async def get_categories(request: web.Request) -> web.Response:
                 if ql in str(getattr(c, "id", "")).lower()
                 or ql in str(getattr(c, "name", getattr(c, "title", ""))).lower()
             ]
-        data = [dataclasses.asdict(c) for c in items]
-        return _apply_pagination_and_headers(request, data, limit=limit, offset=offset)
+        # Категорий немного и они уже в памяти: курсор (name, id) применяем здесь же
+        items = sorted(items, key=lambda c: (c.name, c.id))
+        if after is not None:
+            try:
+                seek = (str(after[0]), int(after[1]))
+            except (IndexError, TypeError, ValueError):
+                return _bad_cursor()
+            items = [c for c in items if (c.name, c.id) > seek]
+            page = items[:limit] if limit else items
+            return _cursor_page_response(
+                [dataclasses.asdict(c) for c in page],
+                limit=limit,
+                next_cursor=_next_cursor(page, limit, lambda c: (c.name, c.id)),
+            )
+        page = items[offset : offset + limit] if limit else items
+        data = [dataclasses.asdict(c) for c in page]
+        return _apply_pagination_and_headers(
+            request,
+            data,
+            limit=limit,
+            offset=offset,
+            total=len(items),
+            next_cursor=_next_cursor(page, limit, lambda c: (c.name, c.id)),
+        )
     except Exception as e:
         logging.exception("Ошибка при получении категорий: %s", e)
         return json_error("Internal server error", code="internal_error", status=HTTPStatus.INTERNAL_SERVER_ERROR)
@@ -110,8 +207,6 @@ async def get_categories(request: web.Request) -> web.Response:
 
 @routes.post("/api/v1/admin/categories")
 async def create_category(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
         payload = await request.json()
         try:
@@ -122,6 +217,7 @@ async def create_category(request: web.Request) -> web.Response:
         async with container(scope=Scope.REQUEST) as req:
             service = await req.get(CategoryService)
             created = await service.create(name=data.name)
+        (await _catalog_cache(request)).invalidate_categories()
         return web.json_response(CategorySchema.model_validate(created).model_dump(), status=HTTPStatus.CREATED)
     except Exception as e:
         logging.exception("Ошибка при создании категории: %s", e)
@@ -130,8 +226,6 @@ async def create_category(request: web.Request) -> web.Response:
 
 @routes.put("/api/v1/admin/categories/{category_id}")
 async def update_category(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
         category_id = int(request.match_info["category_id"])
         payload = await request.json()
@@ -145,6 +239,7 @@ async def update_category(request: web.Request) -> web.Response:
             updated = await service.update(category_id, name=data.name)
         if not updated:
             return json_error("Not found", code="not_found", status=HTTPStatus.NOT_FOUND)
+        (await _catalog_cache(request)).invalidate_categories()
         return web.json_response(CategorySchema.model_validate(updated).model_dump(), status=HTTPStatus.OK)
     except ValueError:
         return json_error("Bad id", code="bad_request", status=HTTPStatus.BAD_REQUEST)
@@ -155,8 +250,6 @@ async def update_category(request: web.Request) -> web.Response:
 
 @routes.delete("/api/v1/admin/categories/{category_id}")
 async def delete_category(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
         category_id = int(request.match_info["category_id"])
         container = request.app[APP_DISHKA_CONTAINER]
@@ -165,6 +258,11 @@ async def delete_category(request: web.Request) -> web.Response:
             ok = await service.delete(category_id)
         if not ok:
             return json_error("Not found", code="not_found", status=HTTPStatus.NOT_FOUND)
+        cache = await _catalog_cache(request)
+        cache.invalidate_categories()
+        cache.invalidate_products(category_id)
+        # Товары категории могли удалиться каскадно — индекс перестроится целиком
+        (await _product_index(request)).invalidate()
         return web.json_response({"status": "ok"}, status=HTTPStatus.OK)
     except ValueError:
         return json_error("Bad id", code="bad_request", status=HTTPStatus.BAD_REQUEST)
@@ -175,36 +273,50 @@ async def delete_category(request: web.Request) -> web.Response:
 
 @routes.get("/api/v1/admin/products")
 async def get_products(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     """Возвращает список всех товаров."""
     try:
-        container = request.app[APP_DISHKA_CONTAINER]
-        async with container(scope=Scope.REQUEST) as req:
-            service = await req.get(ProductService)
-            products = await service.get_all_products()
         limit, offset, q = _parse_pagination(request)
-        items = products
         # category filter
+        cat_id: int | None = None
         cat_q = request.rel_url.query.get("category_id")
         if cat_q is not None:
             try:
                 cat_id = int(cat_q)
-                items = [p for p in items if getattr(p, "category_id", None) == cat_id]
             except ValueError:
                 pass
-        if q:
-            ql = q.lower()
-            def _p(p):
-                return (
-                    ql in str(getattr(p, "id", "")).lower()
-                    or ql in str(getattr(p, "name", "")).lower()
-                    or ql in str(getattr(p, "description", "")).lower()
-                    or ql in str(getattr(p, "category_id", "")).lower()
-                )
-            items = [p for p in items if _p(p)]
-        data = [ProductSchema.model_validate(p).model_dump() for p in items]
-        return _apply_pagination_and_headers(request, data, limit=limit, offset=offset)
+        try:
+            after = _parse_cursor(request)
+            after_id = int(after[0]) if after is not None else None
+        except (TypeError, ValueError):
+            return _bad_cursor()
+        # Поиск без курсора выдаём по релевантности; курсор работает только по id
+        ranked = bool(q) and after_id is None
+        query = ProductQuery(
+            category_id=cat_id,
+            search=q,
+            order_by="relevance" if ranked else "id",
+            limit=limit,
+            offset=0 if after_id is not None else offset,
+            after_id=after_id,
+        )
+        container = request.app[APP_DISHKA_CONTAINER]
+        async with container(scope=Scope.REQUEST) as req:
+            service = await req.get(ProductService)
+            products, total = await service.search_products(
+                query, with_total=after_id is None
+            )
+        data = [ProductSchema.model_validate(p).model_dump() for p in products]
+        next_cursor = None if ranked else _next_cursor(products, limit, lambda p: (p.id,))
+        if total is None:
+            return _cursor_page_response(data, limit=limit, next_cursor=next_cursor)
+        return _apply_pagination_and_headers(
+            request,
+            data,
+            limit=limit,
+            offset=offset,
+            total=total,
+            next_cursor=next_cursor,
+        )
     except Exception as e:
         logging.exception("Ошибка при получении товаров: %s", e)
         return json_error("Internal server error", code="internal_error", status=HTTPStatus.INTERNAL_SERVER_ERROR)
@@ -212,8 +324,6 @@ async def get_products(request: web.Request) -> web.Response:
 
 @routes.post("/api/v1/admin/products")
 async def create_product(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
         payload = await request.json()
         try:
@@ -229,6 +339,8 @@ async def create_product(request: web.Request) -> web.Response:
                 price=Decimal(str(data.price)),
                 category_id=data.category_id,
             )
+        (await _catalog_cache(request)).invalidate_products(data.category_id)
+        (await _product_index(request)).upsert(created)
         return web.json_response(ProductSchema.model_validate(created).model_dump(), status=HTTPStatus.CREATED)
     except Exception as e:
         logging.exception("Ошибка при создании товара: %s", e)
@@ -237,8 +349,6 @@ async def create_product(request: web.Request) -> web.Response:
 
 @routes.put("/api/v1/admin/products/{product_id}")
 async def update_product(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
         product_id = int(request.match_info["product_id"])
         payload = await request.json()
@@ -258,6 +368,9 @@ async def update_product(request: web.Request) -> web.Response:
             )
         if not updated:
             return json_error("Not found", code="not_found", status=HTTPStatus.NOT_FOUND)
+        # Товар мог переехать в другую категорию — сбрасываем все списки товаров
+        (await _catalog_cache(request)).invalidate_products()
+        (await _product_index(request)).upsert(updated)
         return web.json_response(ProductSchema.model_validate(updated).model_dump(), status=HTTPStatus.OK)
     except ValueError:
         return json_error("Bad id", code="bad_request", status=HTTPStatus.BAD_REQUEST)
@@ -268,8 +381,6 @@ async def update_product(request: web.Request) -> web.Response:
 
 @routes.delete("/api/v1/admin/products/{product_id}")
 async def delete_product(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
         product_id = int(request.match_info["product_id"])
         container = request.app[APP_DISHKA_CONTAINER]
@@ -278,6 +389,8 @@ async def delete_product(request: web.Request) -> web.Response:
             ok = await service.delete_product(product_id)
         if not ok:
             return json_error("Not found", code="not_found", status=HTTPStatus.NOT_FOUND)
+        (await _catalog_cache(request)).invalidate_products()
+        (await _product_index(request)).remove(product_id)
         return web.json_response({"status": "ok"}, status=HTTPStatus.OK)
     except ValueError:
         return json_error("Bad id", code="bad_request", status=HTTPStatus.BAD_REQUEST)
@@ -288,8 +401,6 @@ async def delete_product(request: web.Request) -> web.Response:
 
 @routes.get("/api/v1/admin/products/{product_id}")
 async def get_product_by_id(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     """Возвращает один товар по ID."""
     try:
         product_id = int(request.match_info["product_id"])
@@ -304,60 +415,72 @@ async def get_product_by_id(request: web.Request) -> web.Response:
         return json_error("Bad id", code="bad_request", status=HTTPStatus.BAD_REQUEST)
 
 
+@routes.get("/api/v1/admin/catalog/cache")
+async def admin_catalog_cache_stats(request: web.Request) -> web.Response:
+    """Статистика кэша публичного каталога: hit ratio и возраст записей."""
+    return web.json_response((await _catalog_cache(request)).stats())
+
+
+@routes.get("/api/v1/admin/ai/cache")
+async def admin_ai_cache_stats(request: web.Request) -> web.Response:
+    """Статистика кэша ответов AI-консультанта: точные и «похожие» попадания."""
+    cache = await request.app[APP_DISHKA_CONTAINER].get(RecommendationCache)
+    return web.json_response(cache.stats())
+
+
+@routes.get("/api/v1/admin/load")
+async def admin_load_stats(request: web.Request) -> web.Response:
+    """
+    Состояние admission control: запросы в работе, очереди и отказы по
+    маршрутам, плюс очередь webhook-обновлений.
+    """
+    limiters = request.app.get(APP_CONCURRENCY_LIMITERS, {})
+    stats = {prefix: lim.stats() for prefix, lim in limiters.items()}
+    update_queue = request.app.get(APP_UPDATE_QUEUE)
+    if update_queue is not None:
+        stats["webhook_queue"] = update_queue.stats()
+    return web.json_response(stats)
+
+
 @routes.get("/api/v1/admin/orders")
 async def admin_get_orders(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
-        container = request.app[APP_DISHKA_CONTAINER]
-        async with container(scope=Scope.REQUEST) as req:
-            service = await req.get(OrderService)
-            uow = service.uow
-            orders = await uow.orders.get_all()
         limit, offset, q = _parse_pagination(request)
-        items = orders
-        # status filter
+        # status filter: неизвестный статус не совпадает ни с одним заказом
+        status: OrderStatus | None = None
         status_q = request.rel_url.query.get("status")
         if status_q:
-            items = [
-                o for o in items
-                if str(getattr(o, "status", "")) == status_q or getattr(o, "status", None) and getattr(o.status, "value", str(o.status)) == status_q
-            ]
-        # date range filters
-        from datetime import datetime
-        cf = request.rel_url.query.get("created_from")
-        ct = request.rel_url.query.get("created_to")
-        created_from = None
-        created_to = None
-        try:
-            if cf:
-                created_from = datetime.fromisoformat(cf)
-        except Exception:
-            created_from = None
+            try:
+                status = OrderStatus(status_q)
+            except ValueError:
+                return _apply_pagination_and_headers(
+                    request, [], limit=limit, offset=offset, total=0
+                )
         try:
-            if ct:
-                created_to = datetime.fromisoformat(ct)
-        except Exception:
-            created_to = None
-        if created_from or created_to:
-            def _in_range(o):
-                ts = getattr(o, "created_at", None)
-                if not ts or not hasattr(ts, "__class__"):
-                    return False
-                if created_from and ts < created_from:
-                    return False
-                if created_to and ts > created_to:
-                    return False
-                return True
-            items = [o for o in items if _in_range(o)]
-        if q:
-            ql = q.lower()
-            items = [
-                o for o in items
-                if ql in str(getattr(o, "id", "")).lower()
-                or ql in str(getattr(o, "user_id", "")).lower()
-                or ql in str(getattr(o, "status", "")).lower()
-            ]
+            cursor = _parse_cursor(request)
+            after = (
+                (datetime.fromisoformat(cursor[0]), int(cursor[1]))
+                if cursor is not None
+                else None
+            )
+        except (IndexError, TypeError, ValueError):
+            return _bad_cursor()
+        # date range filters
+        query = OrderQuery(
+            status=status,
+            created_from=_parse_datetime(request.rel_url.query.get("created_from")),
+            created_to=_parse_datetime(request.rel_url.query.get("created_to")),
+            search=q,
+            limit=limit,
+            offset=0 if after is not None else offset,
+            after=after,
+        )
+        container = request.app[APP_DISHKA_CONTAINER]
+        async with container(scope=Scope.REQUEST) as req:
+            service = await req.get(OrderService)
+            orders, total = await service.search_orders(
+                query, with_total=after is None
+            )
         data = [
             {
                 "id": o.id,
@@ -366,26 +489,37 @@ async def admin_get_orders(request: web.Request) -> web.Response:
                 "total_amount": float(o.total_amount),
                 "created_at": o.created_at.isoformat() if hasattr(o.created_at, "isoformat") else None,
             }
-            for o in items
+            for o in orders
         ]
-        return _apply_pagination_and_headers(request, data, limit=limit, offset=offset)
+        next_cursor = _next_cursor(
+            orders, limit, lambda o: (o.created_at.isoformat(), o.id)
+        )
+        if total is None:
+            return _cursor_page_response(data, limit=limit, next_cursor=next_cursor)
+        return _apply_pagination_and_headers(
+            request,
+            data,
+            limit=limit,
+            offset=offset,
+            total=total,
+            next_cursor=next_cursor,
+        )
     except Exception as e:
         logging.exception("Ошибка при получении заказов: %s", e)
         return json_error("Internal server error", code="internal_error", status=HTTPStatus.INTERNAL_SERVER_ERROR)
 @routes.get("/api/v1/admin/orders/{order_id}")
 async def admin_get_order_details(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
         order_id = int(request.match_info["order_id"])
         container = request.app[APP_DISHKA_CONTAINER]
         async with container(scope=Scope.REQUEST) as req:
             service = await req.get(OrderService)
             uow = service.uow
-            order = await uow.orders.get_by_id(order_id)
+            # заказ и позиции — одним запросом
+            order = await uow.orders.get_with_items(order_id)
             if not order:
                 return json_error("Not found", code="not_found", status=HTTPStatus.NOT_FOUND)
-            items = await uow.order_items.get_by_order_id(order_id)
+            items = order.items
         payload = {
             "id": order.id,
             "user_id": order.user_id,
@@ -410,8 +544,6 @@ async def admin_get_order_details(request: web.Request) -> web.Response:
 
 @routes.patch("/api/v1/admin/orders/{order_id}")
 async def admin_update_order_status(request: web.Request) -> web.Response:
-    if not _is_admin(request):
-        return json_error("Unauthorized", code="unauthorized", status=HTTPStatus.UNAUTHORIZED)
     try:
         order_id = int(request.match_info["order_id"])
         payload = await request.json()
@@ -3,21 +3,45 @@
 from aiohttp import web
 import aiohttp_cors
 from aiogram import Bot, Dispatcher
-from aiogram.types import Update
 from dishka import AsyncContainer, Scope
+from dishka.exceptions import NoFactoryError
+import asyncio
+import hashlib
 import logging
+from typing import Awaitable, Callable
 
 from src.infrastructure.config import settings
+from src.application.contracts.order.idempotency import StoredResponse
 from src.application.contracts.persistence.uow import IUnitOfWork
+from src.application.contracts.rate_limit.backend import IRateLimitBackend
 from src.application.services.order_service import OrderService
+from src.infrastructure.memory.idempotency_cache import IdempotencyCache
+from src.infrastructure.database.registration_buffer import RegistrationBuffer
+from src.infrastructure.outbox.dispatcher import OutboxDispatcher
 from .api.handlers.category import get_categories
 from .api.handlers.product import get_products_by_category
 from .api_handlers import routes as api_routes
 from .api.schemas.order import CreateOrderSchema
 from pydantic import ValidationError
-from .middlewares import admin_rate_limit_middleware
+from .concurrency import ConcurrencyLimiter, parse_concurrency
+from .update_queue import UpdateQueue
+from .middlewares import (
+    admin_auth_middleware,
+    concurrency_limit_middleware,
+    rate_limit_middleware,
+)
 from .errors import json_error
-from .app_keys import APP_DISHKA_CONTAINER, APP_BOT, APP_DISPATCHER
+from .app_keys import (
+    APP_BOT,
+    APP_CONCURRENCY_LIMITERS,
+    APP_DISHKA_CONTAINER,
+    APP_DISPATCHER,
+    APP_IDEMPOTENCY_CACHE,
+    APP_OUTBOX_TASK,
+    APP_RATE_LIMIT_BACKEND,
+    APP_REGISTRATION_BUFFER,
+    APP_UPDATE_QUEUE,
+)
 
 WEBHOOK_PATH = "/webhook"
 WEBHOOK_URL = f"{settings.app.base_url}{WEBHOOK_PATH}"
@@ -36,18 +60,142 @@ async def on_shutdown(app: web.Application):
     await bot.delete_webhook()
     logging.info("Webhook удален.")
 
+async def resolve_rate_limit_backend(app: web.Application):
+    container: AsyncContainer = app[APP_DISHKA_CONTAINER]
+    try:
+        app[APP_RATE_LIMIT_BACKEND] = await container.get(IRateLimitBackend)
+    except NoFactoryError:
+        # Без backend в контейнере middleware считает лимиты в памяти процесса
+        logging.info("IRateLimitBackend не зарегистрирован, rate limit в памяти процесса.")
+
+async def start_outbox_dispatcher(app: web.Application):
+    container: AsyncContainer = app[APP_DISHKA_CONTAINER]
+    try:
+        outbox_dispatcher = await container.get(OutboxDispatcher)
+    except NoFactoryError:
+        # Контейнер без БД/бота (например, в тестах) — уведомления уходят напрямую
+        logging.info("OutboxDispatcher не зарегистрирован, фоновая доставка отключена.")
+        return
+    app[APP_OUTBOX_TASK] = asyncio.create_task(outbox_dispatcher.run())
+
+async def stop_outbox_dispatcher(app: web.Application):
+    task = app.get(APP_OUTBOX_TASK)
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    logging.info("Outbox dispatcher остановлен.")
+
+async def start_registration_buffer(app: web.Application):
+    container: AsyncContainer = app[APP_DISHKA_CONTAINER]
+    try:
+        buffer = await container.get(RegistrationBuffer)
+    except NoFactoryError:
+        # Без буфера в контейнере /start регистрирует пользователя сразу
+        logging.info("RegistrationBuffer не зарегистрирован, регистрация без буфера.")
+        return
+    buffer.start()
+    app[APP_REGISTRATION_BUFFER] = buffer
+
+async def stop_registration_buffer(app: web.Application):
+    buffer = app.get(APP_REGISTRATION_BUFFER)
+    if buffer is None:
+        return
+    await buffer.stop()
+    logging.info("Буфер регистраций записан и остановлен.")
+
+async def start_update_queue(app: web.Application):
+    app[APP_UPDATE_QUEUE].start()
+
+async def stop_update_queue(app: web.Application):
+    await app[APP_UPDATE_QUEUE].stop()
+    logging.info("Очередь webhook-обновлений остановлена.")
+
 async def webhook_handler(request: web.Request) -> web.Response:
     secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
     if secret != settings.app.secret_token.get_secret_value():
         logging.warning("Received an update with invalid secret token!")
         return web.Response(status=403)
 
-    bot: Bot = request.app[APP_BOT]
-    dispatcher: Dispatcher = request.app[APP_DISPATCHER]
-    update = Update.model_validate(await request.json(), context={"bot": bot})
-    await dispatcher.feed_update(bot=bot, update=update)
+    try:
+        raw = await request.json()
+    except ValueError:
+        return web.Response(status=400)
+    if not isinstance(raw, dict):
+        return web.Response(status=400)
+
+    # Обработка — в пуле воркеров: Telegram получает 200 сразу, не дожидаясь
+    # Gemini или БД, и не присылает обновление повторно
+    if not request.app[APP_UPDATE_QUEUE].submit(raw):
+        return web.Response(status=503, headers={"Retry-After": "1"})
     return web.Response()
 
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+_IDEMPOTENCY_KEY_MAX_LEN = 255
+
+
+class _IdempotencyConflict(Exception):
+    """Параллельный запрос с тем же ключом закоммитил заказ раньше нас."""
+
+
+def _replay(stored: StoredResponse, request_hash: str) -> web.Response:
+    if stored.request_hash != request_hash:
+        return json_error(
+            "Idempotency-Key was already used with a different request",
+            code="idempotency_key_reused",
+            status=422,
+        )
+    return web.json_response(
+        stored.body, status=stored.status, headers={"Idempotent-Replayed": "true"}
+    )
+
+
+async def _idempotent_checkout(
+    uow: IUnitOfWork,
+    cache: IdempotencyCache,
+    telegram_id: int,
+    key: str | None,
+    request_hash: str,
+    create: Callable[[], Awaitable[dict]],
+) -> web.Response:
+    """
+    Выполняет create() в транзакции с учётом Idempotency-Key: повтор с тем же
+    ключом получает сохранённый ответ и не создаёт второй заказ.
+    """
+    if key is not None:
+        stored = cache.get(telegram_id, key)
+        if stored is not None:
+            return _replay(stored, request_hash)
+
+    try:
+        async with uow.atomic():
+            if key is not None:
+                stored = await uow.idempotency.get(telegram_id, key)
+                if stored is not None:
+                    cache.put(telegram_id, key, stored)
+                    return _replay(stored, request_hash)
+
+            body = await create()
+
+            if key is not None:
+                stored = StoredResponse(request_hash=request_hash, status=200, body=body)
+                if not await uow.idempotency.save(telegram_id, key, stored):
+                    # Откатываем свой заказ вместе с уведомлением в outbox
+                    raise _IdempotencyConflict
+    except _IdempotencyConflict:
+        async with uow.atomic():
+            stored = await uow.idempotency.get(telegram_id, key)
+        cache.put(telegram_id, key, stored)
+        return _replay(stored, request_hash)
+
+    if key is not None:
+        cache.put(telegram_id, key, stored)
+    return web.json_response(body)
+
+
 async def create_order_api_handler(request: web.Request) -> web.Response:
     try:
         data = await request.json()
@@ -67,11 +215,24 @@ async def create_order_api_handler(request: web.Request) -> web.Response:
         telegram_id = order_data.user.id
         dishka_container: AsyncContainer = request.app[APP_DISHKA_CONTAINER]
 
+        # Повторная отправка (двойной тап MainButton, ретрай сети) с тем же
+        # ключом получает сохранённый ответ и не создаёт второй заказ.
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is not None and not (
+            0 < len(idempotency_key) <= _IDEMPOTENCY_KEY_MAX_LEN
+        ):
+            return json_error(
+                f"Invalid {IDEMPOTENCY_HEADER}", code="bad_request", status=400
+            )
+        request_hash = hashlib.sha256(order_data.model_dump_json().encode()).hexdigest()
+
         async with dishka_container(scope=Scope.REQUEST) as request_container:
             uow = await request_container.get(IUnitOfWork)
             order_service = await request_container.get(OrderService)
+            # До транзакции заказа: не держим два соединения на один checkout
+            await order_service.ensure_user_registered(telegram_id)
 
-            async with uow.atomic():
+            async def create() -> dict:
                 order = await order_service.create_order_from_api(
                     telegram_id=telegram_id,
                     items=[item.model_dump() for item in order_data.items],
@@ -79,11 +240,19 @@ async def create_order_api_handler(request: web.Request) -> web.Response:
                     phone=order_data.phone,
                     address=order_data.address,
                 )
+                # раньше здесь было bot.send_message(...).
+                # Теперь сервис пишет уведомление в outbox в той же транзакции,
+                # а в Telegram его доставляет фоновый OutboxDispatcher.
+                return {"status": "ok", "order_id": order.id}
 
-        # раньше здесь было bot.send_message(...).
-        # Теперь уведомление отправляет сам сервис через INotifier.
-
-        return web.json_response({"status": "ok", "order_id": order.id})
+            return await _idempotent_checkout(
+                uow,
+                request.app[APP_IDEMPOTENCY_CACHE],
+                telegram_id,
+                idempotency_key,
+                request_hash,
+                create,
+            )
 
     except ValueError as e:
         logging.error(f"Order creation bad request: {e}")
@@ -95,13 +264,55 @@ async def create_order_api_handler(request: web.Request) -> web.Response:
 def setup_app(
     dishka_container: AsyncContainer, bot: Bot, dispatcher: Dispatcher
 ) -> web.Application:
-    app = web.Application(middlewares=[admin_rate_limit_middleware()])
+    concurrency_limiters = {
+        prefix: ConcurrencyLimiter(
+            *parse_concurrency(spec),
+            queue_timeout=settings.app.concurrency_queue_timeout,
+            per_key=settings.app.concurrency_per_user,
+        )
+        for prefix, spec in settings.app.concurrency_limits.items()
+    }
+    app = web.Application(
+        middlewares=[
+            rate_limit_middleware(
+                limits=settings.app.rate_limits,
+                max_keys=settings.app.rate_limit_max_keys,
+            ),
+            admin_auth_middleware(
+                secret_token=settings.app.secret_token.get_secret_value(),
+                admin_ids=settings.app.admin_ids,
+            ),
+            # После авторизации: ключ админа берётся из проверенного запроса
+            concurrency_limit_middleware(
+                concurrency_limiters,
+                webhook_secret=settings.app.secret_token.get_secret_value(),
+            ),
+        ]
+    )
     app[APP_DISHKA_CONTAINER] = dishka_container
     app[APP_BOT] = bot
     app[APP_DISPATCHER] = dispatcher
+    app[APP_CONCURRENCY_LIMITERS] = concurrency_limiters
+    app[APP_UPDATE_QUEUE] = UpdateQueue(
+        dispatcher,
+        bot,
+        workers=settings.app.webhook_workers,
+        max_size=settings.app.webhook_queue_size,
+        dedup_ttl=settings.app.webhook_dedup_ttl,
+    )
+    app[APP_IDEMPOTENCY_CACHE] = IdempotencyCache(settings.app.idempotency_cache_size)
 
+    app.on_startup.append(start_update_queue)
     app.on_startup.append(on_startup)
+    app.on_startup.append(resolve_rate_limit_backend)
+    app.on_startup.append(start_outbox_dispatcher)
+    app.on_startup.append(start_registration_buffer)
+    app.on_shutdown.append(stop_outbox_dispatcher)
     app.on_shutdown.append(on_shutdown)
+    # После снятия webhook новых обновлений нет — дорабатываем принятые
+    app.on_shutdown.append(stop_update_queue)
+    # Последние обновления могли оставить регистрации в буфере
+    app.on_shutdown.append(stop_registration_buffer)
 
     cors = aiohttp_cors.setup(app, defaults={
         "*": aiohttp_cors.ResourceOptions(
@@ -2,13 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
+
 from aiohttp.web_app import AppKey
 from aiogram import Bot, Dispatcher
 from dishka import AsyncContainer
 
+from src.application.contracts.rate_limit.backend import IRateLimitBackend
+from src.infrastructure.database.registration_buffer import RegistrationBuffer
+from src.infrastructure.memory.idempotency_cache import IdempotencyCache
+from src.presentation.web.concurrency import ConcurrencyLimiter
+from src.presentation.web.update_queue import UpdateQueue
+
 
 APP_DISHKA_CONTAINER: AppKey[AsyncContainer] = AppKey("dishka_container")
 APP_BOT: AppKey[Bot] = AppKey("bot")
 APP_DISPATCHER: AppKey[Dispatcher] = AppKey("dispatcher")
+APP_OUTBOX_TASK: AppKey[asyncio.Task] = AppKey("outbox_task")
+APP_IDEMPOTENCY_CACHE: AppKey[IdempotencyCache] = AppKey("idempotency_cache")
+APP_RATE_LIMIT_BACKEND: AppKey[IRateLimitBackend] = AppKey("rate_limit_backend")
+APP_CONCURRENCY_LIMITERS: AppKey[dict[str, ConcurrencyLimiter]] = AppKey("concurrency_limiters")
+APP_UPDATE_QUEUE: AppKey[UpdateQueue] = AppKey("update_queue")
+APP_REGISTRATION_BUFFER: AppKey[RegistrationBuffer] = AppKey("registration_buffer")
 
-
+# Ключ запроса: ID админа, проверенный admin_auth_middleware
+REQUEST_ADMIN_USER = "admin_user"
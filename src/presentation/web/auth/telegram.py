@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import hashlib
 import hmac
-import json
+import time
+from collections import OrderedDict
 from typing import Any, Dict
 
 from pydantic import BaseModel
@@ -19,22 +20,65 @@ class TelegramInitData(BaseModel):
     can_send_after: int | None = None
 
 
-def _check_signature(data: Dict[str, Any]) -> bool:
-    received_hash = data.pop("hash", "")
-    token = settings.bot.token.get_secret_value()
-    secret_key = hashlib.sha256(token.encode()).digest()
-    check_string = "\n".join(
-        f"{k}={data[k]}" for k in sorted(data.keys()) if data[k] is not None
+# Ключи выводятся один раз при импорте, а не на каждую проверку
+_SECRET_KEY = hashlib.sha256(settings.bot.token.get_secret_value().encode()).digest()
+_APP_SECRET = settings.app.secret_token.get_secret_value().encode()
+
+# Повторные проверки одного и того же initData (WebApp шлёт его при каждом
+# открытии) отвечаются из кэша: hash -> (строка проверки, результат, истекает)
+_VERIFIED_TTL = 300.0
+_VERIFIED_MAX = 4096
+_verified: OrderedDict[str, tuple[str, Dict[str, Any], float]] = OrderedDict()
+_clock = time.monotonic
+
+
+def _check_string(data: Dict[str, Any]) -> str:
+    return "\n".join(
+        f"{k}={data[k]}" for k in sorted(data.keys()) if k != "hash" and data[k] is not None
     )
-    calculated_hash = hmac.new(secret_key, check_string.encode(), hashlib.sha256).hexdigest()
+
+
+def _check_signature(data: Dict[str, Any]) -> bool:
+    received_hash = data.get("hash", "")
+    calculated_hash = hmac.new(
+        _SECRET_KEY, _check_string(data).encode(), hashlib.sha256
+    ).hexdigest()
     return hmac.compare_digest(received_hash, calculated_hash)
 
 
+def _remember(received_hash: str, check_string: str, result: Dict[str, Any]) -> None:
+    _verified[received_hash] = (check_string, result, _clock() + _VERIFIED_TTL)
+    _verified.move_to_end(received_hash)
+    while len(_verified) > _VERIFIED_MAX:
+        _verified.popitem(last=False)
+
+
+def _cached_result(payload: Dict[str, Any]) -> Dict[str, Any] | None:
+    received_hash = payload.get("hash")
+    if not isinstance(received_hash, str):
+        return None
+    cached = _verified.get(received_hash)
+    if cached is None:
+        return None
+    check_string, result, expires_at = cached
+    if _clock() >= expires_at:
+        del _verified[received_hash]
+        return None
+    # Тот же hash с другими полями — не наш initData, проверяем полностью
+    if check_string != _check_string(payload):
+        return None
+    return dict(result)
+
+
 async def validate_telegram_data(payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
+        cached = _cached_result(payload)
+        if cached is not None:
+            return cached
+
         parsed = TelegramInitData(**payload)
-        data = json.loads(json.dumps(payload))
-        if not _check_signature(data):
+        # Подпись проверяется по исходному payload: он не изменяется
+        if not _check_signature(payload):
             return {"status": "error", "message": "invalid_signature"}
 
         user = parsed.user or {}
@@ -44,10 +88,9 @@ async def validate_telegram_data(payload: Dict[str, Any]) -> Dict[str, Any]:
             return {"status": "error", "message": "missing_user"}
 
         # Produce an HMAC-based opaque token that the server can verify later
-        secret = settings.app.secret_token.get_secret_value()
-        token = hmac.new(secret.encode(), str(telegram_id).encode(), hashlib.sha256).hexdigest()
-        return {"status": "ok", "user_id": telegram_id, "token": token}
+        token = hmac.new(_APP_SECRET, str(telegram_id).encode(), hashlib.sha256).hexdigest()
+        result = {"status": "ok", "user_id": telegram_id, "token": token}
+        _remember(parsed.hash, _check_string(payload), result)
+        return dict(result)
     except Exception:
         return {"status": "error", "message": "invalid_payload"}
-
-
@@ -0,0 +1,129 @@
+# src/presentation/web/concurrency.py
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Hashable
+
+
+class Shed(Exception):
+    """Запрос отклонён без обработки (load shedding)."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def parse_concurrency(spec: str) -> tuple[int, int]:
+    """'20/100' -> (20 одновременных запросов, очередь до 100)."""
+    in_flight, _, queue = spec.partition("/")
+    max_in_flight, max_queue = int(in_flight), int(queue or 0)
+    if max_in_flight <= 0 or max_queue < 0:
+        raise ValueError(f"Некорректный лимит конкурентности: {spec!r}")
+    return max_in_flight, max_queue
+
+
+class ConcurrencyLimiter:
+    """
+    Ограничение числа одновременно обрабатываемых запросов маршрута.
+
+    Сверх max_in_flight запросы ждут в очереди FIFO длиной не больше max_queue
+    и не дольше queue_timeout; при полной очереди, таймауте или превышении
+    лимита на один ключ (Telegram-пользователь / IP) — сразу Shed.
+    Освободившийся слот передаётся первому ожидающему напрямую.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        *,
+        queue_timeout: float = 5.0,
+        per_key: int = 0,
+    ):
+        self._max_in_flight = max_in_flight
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._per_key = per_key
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        # Запросы ключа в работе и в очереди
+        self._by_key: dict[Hashable, int] = {}
+        self._admitted = 0
+        self._queued = 0
+        self._max_queue_depth = 0
+        self._shed = {"queue_full": 0, "timeout": 0, "per_key": 0}
+
+    async def acquire(self, key: Hashable) -> None:
+        if self._per_key and self._by_key.get(key, 0) >= self._per_key:
+            self._shed["per_key"] += 1
+            raise Shed("per_key")
+
+        if self._in_flight < self._max_in_flight and not self._waiters:
+            self._in_flight += 1
+        else:
+            if len(self._waiters) >= self._max_queue:
+                self._shed["queue_full"] += 1
+                raise Shed("queue_full")
+            await self._wait_for_slot(key)
+
+        self._by_key[key] = self._by_key.get(key, 0) + 1
+        self._admitted += 1
+
+    async def _wait_for_slot(self, key: Hashable) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued += 1
+        self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+        # Ожидающий тоже занимает место в лимите ключа
+        self._by_key[key] = self._by_key.get(key, 0) + 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self._queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Слот уже передан нам — вернуть его следующему
+                self._release_slot()
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._shed["timeout"] += 1
+            raise Shed("timeout") from None
+        finally:
+            self._decrement(key)
+
+    def release(self, key: Hashable) -> None:
+        self._decrement(key)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # слот переходит ожидающему
+                return
+        self._in_flight -= 1
+
+    def _decrement(self, key: Hashable) -> None:
+        left = self._by_key.get(key, 0) - 1
+        if left > 0:
+            self._by_key[key] = left
+        else:
+            self._by_key.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self._max_in_flight,
+            "max_queue": self._max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth_seen": self._max_queue_depth,
+            "admitted": self._admitted,
+            "queued": self._queued,
+            "shed": dict(self._shed),
+        }
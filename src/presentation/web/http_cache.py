@@ -0,0 +1,58 @@
+# src/presentation/web/http_cache.py
+
+from aiohttp import web
+
+from src.infrastructure.memory.catalog_cache import CatalogSnapshot
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Слабое сравнение ETag из If-None-Match (RFC 9110, 13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        if name.strip().lower() != coding:
+            continue
+        q = params.strip().removeprefix("q=")
+        try:
+            return not params or float(q) > 0
+        except ValueError:
+            return True
+    return False
+
+
+def snapshot_response(request: web.Request, snapshot: CatalogSnapshot) -> web.Response:
+    """
+    Ответ из готового снимка без повторного кодирования: 304 на совпавший
+    If-None-Match, иначе br/gzip/identity по Accept-Encoding.
+    """
+    headers = {
+        "ETag": snapshot.etag,
+        "Vary": "Accept-Encoding",
+        # Клиент кэширует, но каждый раз ревалидирует: после правок в админке
+        # он сразу получит новый каталог
+        "Cache-Control": "no-cache",
+    }
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and _etag_matches(if_none_match, snapshot.etag):
+        return web.Response(status=304, headers=headers)
+
+    body = snapshot.body
+    accept_encoding = request.headers.get("Accept-Encoding", "")
+    if snapshot.br is not None and _accepts(accept_encoding, "br"):
+        body = snapshot.br
+        headers["Content-Encoding"] = "br"
+    elif snapshot.gzip is not None and _accepts(accept_encoding, "gzip"):
+        body = snapshot.gzip
+        headers["Content-Encoding"] = "gzip"
+    return web.Response(
+        body=body, headers=headers, content_type="application/json", charset="utf-8"
+    )
@@ -2,58 +2,223 @@
 
 from __future__ import annotations
 
+import hashlib
+import hmac
+import math
 import time
-from collections import deque
-from typing import Deque, Dict, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Mapping, Tuple
 
 from aiohttp import web
 
+from src.infrastructure.memory.rate_limit import InMemoryRateLimitBackend, parse_limit
 
-def admin_rate_limit_middleware(
-    *, window_seconds: int = 60, max_requests: int = 120
+from .app_keys import APP_RATE_LIMIT_BACKEND, REQUEST_ADMIN_USER
+from .auth.telegram import validate_telegram_data
+from .concurrency import ConcurrencyLimiter, Shed
+from .errors import json_error
+
+ADMIN_PREFIX = "/api/v1/admin"
+
+
+def rate_limit_middleware(
+    *,
+    limits: Mapping[str, str],
+    max_keys: int = 10_000,
+    clock: Callable[[], float] = time.monotonic,
 ):
     """
-    Простой in-memory rate limit для админских эндпоинтов `/api/v1/admin/*`.
-
-    Ключ rate limit: (X-Admin-User || IP, path-prefix).
-    Ограничение по умолчанию: 120 запросов за 60 секунд на ключ.
+    Rate limit по префиксам путей, например {"/api/v1/admin": "120/60"} —
+    120 запросов за 60 секунд на ключ.
+
+    Ключ rate limit — IP клиента: middleware стоит до авторизации, и
+    непроверенный X-Admin-User позволил бы уйти от лимита, подменяя заголовок,
+    и вытеснить чужие ключи из ограниченного хранилища. Для пути берётся самый длинный
+    подходящий префикс. Состояние хранит backend из app[APP_RATE_LIMIT_BACKEND]
+    (общий для воркеров); если он не задан — in-memory backend этого процесса.
     """
 
-    buckets: Dict[Tuple[str, str], Deque[float]] = {}
+    rules = sorted(
+        ((prefix, *parse_limit(spec)) for prefix, spec in limits.items()),
+        key=lambda rule: len(rule[0]),
+        reverse=True,
+    )
+    local_backend = InMemoryRateLimitBackend(max_keys=max_keys, clock=clock)
 
     @web.middleware
     async def _middleware(request: web.Request, handler):
         path: str = request.path
-        if not path.startswith("/api/v1/admin"):
+        rule = next((r for r in rules if path.startswith(r[0])), None)
+        if rule is None:
             return await handler(request)
 
-        now = time.time()
-        admin_user = request.headers.get("X-Admin-User") or request.remote or "unknown"
-        key = (str(admin_user), "/api/v1/admin")
-
-        dq = buckets.get(key)
-        if dq is None:
-            dq = deque()
-            buckets[key] = dq
-
-        # очистка окна
-        threshold = now - window_seconds
-        while dq and dq[0] < threshold:
-            dq.popleft()
-
-        if len(dq) >= max_requests:
+        prefix, max_requests, period = rule
+        backend = request.app.get(APP_RATE_LIMIT_BACKEND, local_backend)
+        client = request.remote or "unknown"
+        retry_after = await backend.hit(f"{prefix}|{client}", max_requests, period)
+        if retry_after:
             return web.json_response(
                 {
                     "error": "rate_limited",
                     "message": "Too many requests. Please try again later.",
                 },
                 status=429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
             )
+        return await handler(request)
+
+    return _middleware
+
+
+def admin_auth_middleware(
+    *, secret_token: str, admin_ids: str = "", cache_size: int = 1024
+):
+    """
+    Авторизация админских эндпоинтов `/api/v1/admin/*`.
+
+    X-Admin-Token должен быть HMAC-SHA256(secret_token, X-Admin-User); если
+    admin_ids (CSV) не пуст, пользователь должен входить в этот список.
+    Всё, что не зависит от запроса, вычисляется один раз при создании
+    middleware; вердикты по паре (user, token) кэшируются в LRU.
+    ID админа кладётся в request[REQUEST_ADMIN_USER].
+    """
+
+    secret = secret_token.encode()
+    allowed = frozenset(x.strip() for x in admin_ids.split(",") if x.strip())
+    verdicts: OrderedDict[Tuple[str, str], bool] = OrderedDict()
+
+    def _verify(user_id: str, token: str) -> bool:
+        key = (user_id, token)
+        verdict = verdicts.get(key)
+        if verdict is not None:
+            verdicts.move_to_end(key)
+            return verdict
+        expected = hmac.new(secret, user_id.encode(), hashlib.sha256).hexdigest()
+        verdict = hmac.compare_digest(token, expected) and (
+            not allowed or user_id in allowed
+        )
+        verdicts[key] = verdict
+        if len(verdicts) > cache_size:
+            verdicts.popitem(last=False)
+        return verdict
+
+    @web.middleware
+    async def _middleware(request: web.Request, handler):
+        # CORS preflight приходит без заголовков авторизации
+        if not request.path.startswith(ADMIN_PREFIX) or request.method == "OPTIONS":
+            return await handler(request)
 
-        dq.append(now)
+        token = request.headers.get("X-Admin-Token")
+        user_id = request.headers.get("X-Admin-User")
+        if not token or not user_id or not _verify(user_id, token):
+            return json_error("Unauthorized", code="unauthorized", status=401)
+
+        request[REQUEST_ADMIN_USER] = user_id
         return await handler(request)
 
     return _middleware
 
 
+# Тело запроса больше этого размера не разбираем ради ключа пользователя
+_MAX_KEY_BODY = 64 * 1024
+
+
+def _update_sender_id(data: Any) -> Any:
+    """ID отправителя webhook-обновления: <update>.from.id."""
+    if not isinstance(data, dict):
+        return None
+    for value in data.values():
+        if isinstance(value, dict):
+            sender = value.get("from")
+            if isinstance(sender, dict) and sender.get("id") is not None:
+                return sender["id"]
+    return None
+
+
+async def _verified_user_id(request: web.Request, webhook_secret: str | None) -> Any:
+    """
+    ID пользователя из тела, только если тело подтверждено: подписанный
+    initData (validate_telegram_data) или webhook с верным секретом.
+    """
+    if not (
+        request.method == "POST"
+        and request.content_type == "application/json"
+        and request.content_length is not None
+        and request.content_length <= _MAX_KEY_BODY
+    ):
+        return None
+    try:
+        # aiohttp кэширует тело: обработчик прочитает его повторно без сети
+        data = await request.json()
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    if "hash" in data:
+        verdict = await validate_telegram_data(data)
+        return verdict.get("user_id") if verdict.get("status") == "ok" else None
+    secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
+    if webhook_secret and secret and hmac.compare_digest(secret, webhook_secret):
+        return _update_sender_id(data)
+    return None
+
+
+async def _client_key(request: web.Request, webhook_secret: str | None = None) -> str:
+    """
+    Проверенный Telegram-пользователь, иначе IP. X-Admin-User учитывается
+    только под ADMIN_PREFIX и только после admin_auth_middleware.
+    """
+    if request.path.startswith(ADMIN_PREFIX):
+        admin_user = request.get(REQUEST_ADMIN_USER)
+        if admin_user:
+            return f"tg:{admin_user}"
+    user_id = await _verified_user_id(request, webhook_secret)
+    if user_id is not None:
+        return f"tg:{user_id}"
+    return f"ip:{request.remote or 'unknown'}"
+
+
+def concurrency_limit_middleware(
+    limiters: Mapping[str, ConcurrencyLimiter],
+    *,
+    retry_after: int = 1,
+    webhook_secret: str | None = None,
+):
+    """
+    Admission control по префиксам путей: у каждого префикса свой
+    ConcurrencyLimiter (самый длинный подходящий префикс). Запрос, который
+    не помещается даже в очередь, сразу получает 503 с Retry-After; слишком
+    много одновременных запросов одного пользователя — 429.
 
+    Ставится после admin_auth_middleware, чтобы админ уже был проверен;
+    webhook_secret — секрет X-Telegram-Bot-Api-Secret-Token для /webhook.
+    """
+
+    ordered = sorted(limiters.items(), key=lambda item: len(item[0]), reverse=True)
+
+    @web.middleware
+    async def _middleware(request: web.Request, handler):
+        limiter = next((lim for prefix, lim in ordered if request.path.startswith(prefix)), None)
+        if limiter is None or request.method == "OPTIONS":
+            return await handler(request)
+
+        key = await _client_key(request, webhook_secret)
+        try:
+            await limiter.acquire(key)
+        except Shed as e:
+            if e.reason == "per_key":
+                resp = json_error(
+                    "Too many concurrent requests",
+                    code="too_many_concurrent_requests",
+                    status=429,
+                )
+            else:
+                resp = json_error("Server is busy, retry later", code="overloaded", status=503)
+            resp.headers["Retry-After"] = str(retry_after)
+            return resp
+        try:
+            return await handler(request)
+        finally:
+            limiter.release(key)
+
+    return _middleware
@@ -0,0 +1,159 @@
+# src/presentation/web/update_queue.py
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+
+def _chat_key(raw: dict[str, Any]) -> Any:
+    """Ключ упорядочивания: chat.id, иначе from.id, иначе сам update_id."""
+    for value in raw.values():
+        if not isinstance(value, dict):
+            continue
+        chat = value.get("chat") or (value.get("message") or {}).get("chat")
+        if isinstance(chat, dict) and chat.get("id") is not None:
+            return chat["id"]
+        sender = value.get("from")
+        if isinstance(sender, dict) and sender.get("id") is not None:
+            return sender["id"]
+    return raw.get("update_id")
+
+
+class UpdateQueue:
+    """
+    Асинхронная обработка webhook-обновлений.
+
+    Webhook кладёт сырое обновление в очередь своего чата и сразу отвечает
+    Telegram 200. Общий пул воркеров берёт из очереди готовых чатов очередной
+    чат и обрабатывает одно его обновление через aiogram Dispatcher; чат
+    возвращается в конец очереди готовых, только когда это обновление
+    обработано. Так порядок внутри чата сохраняется, а долгая консультация
+    в одном чате занимает одного воркера и не задерживает другие чаты.
+    Повторные доставки с уже принятым update_id отбрасываются (TTL-набор).
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        *,
+        workers: int = 64,
+        max_size: int = 1000,
+        dedup_ttl: float = 600.0,
+        dedup_max: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._dispatcher = dispatcher
+        self._bot = bot
+        self._workers = workers
+        self._max_size = max_size
+        # Непустые очереди чатов; ключ чата стоит в _ready или обрабатывается
+        # воркером, но не то и другое сразу — отсюда порядок внутри чата
+        self._chats: dict[Any, deque[dict[str, Any]]] = {}
+        self._ready: asyncio.Queue[Any] = asyncio.Queue()
+        self._pending = 0
+        self._tasks: list[asyncio.Task] = []
+        self._dedup_ttl = dedup_ttl
+        self._dedup_max = dedup_max
+        self._clock = clock
+        # update_id -> момент, после которого повтор уже не считается дублем
+        self._seen: OrderedDict[int, float] = OrderedDict()
+        self._stats = {"accepted": 0, "duplicates": 0, "rejected_full": 0, "processed": 0, "failed": 0}
+
+    def submit(self, raw: dict[str, Any]) -> bool:
+        """
+        Ставит обновление в очередь его чата. False — общий лимит
+        max_size принятых, но не обработанных обновлений исчерпан (Telegram
+        должен доставить обновление повторно). Дубль считается принятым:
+        повторно он не обрабатывается.
+        """
+        update_id = raw.get("update_id")
+        now = self._clock()
+        self._forget_expired(now)
+        if update_id is not None and update_id in self._seen:
+            self._stats["duplicates"] += 1
+            return True
+
+        if self._pending >= self._max_size:
+            self._stats["rejected_full"] += 1
+            return False
+        key = _chat_key(raw)
+        chat = self._chats.get(key)
+        if chat is None:
+            self._chats[key] = deque([raw])
+            self._ready.put_nowait(key)
+        else:
+            chat.append(raw)
+        self._pending += 1
+
+        # Запоминаем только принятые: отвергнутое обновление должно пройти при повторе
+        if update_id is not None:
+            self._seen[update_id] = now + self._dedup_ttl
+            while len(self._seen) > self._dedup_max:
+                self._seen.popitem(last=False)
+        self._stats["accepted"] += 1
+        return True
+
+    def _forget_expired(self, now: float) -> None:
+        while self._seen:
+            update_id, expires_at = next(iter(self._seen.items()))
+            if expires_at > now:
+                break
+            del self._seen[update_id]
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"update-worker-{i}")
+            for i in range(self._workers)
+        ]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Дожидается уже принятых обновлений (не дольше timeout) и останавливает воркеров."""
+        try:
+            await asyncio.wait_for(self._ready.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Не все webhook-обновления обработаны до остановки.")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            chat = self._chats[key]
+            raw = chat.popleft()
+            try:
+                update = Update.model_validate(raw, context={"bot": self._bot})
+                await self._dispatcher.feed_update(bot=self._bot, update=update)
+                self._stats["processed"] += 1
+            except Exception:
+                self._stats["failed"] += 1
+                logger.exception("Ошибка обработки обновления %s", raw.get("update_id"))
+            finally:
+                self._pending -= 1
+                # Следующее обновление чата — в конец очереди готовых, чтобы
+                # болтливый чат не занимал воркера подряд
+                if chat:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._chats[key]
+                self._ready.task_done()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "queue_depth": self._pending,
+            "active_chats": len(self._chats),
+            "workers": self._workers,
+            "tracked_update_ids": len(self._seen),
+        }
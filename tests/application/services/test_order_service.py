@@ -6,6 +6,7 @@ from decimal import Decimal
 
 from src.application.services.order_service import OrderService
 from src.domain.entities.order import Order
+from src.domain.entities.product import Product
 from src.domain.entities.user import User
 from src.domain.entities.cart_item import CartItem # Импортируем для использования в spec
 
@@ -82,4 +83,59 @@ async def test_create_order_successfully(order_service, mock_uow, mock_cart_repo
     assert added_order_entity.total_amount == Decimal("250.50")
     
     # Проверяем, что сервис вернул созданную сущность
-    assert created_order is added_order_entity
\ No newline at end of file
+    assert created_order is added_order_entity
+
+def _product(product_id: int, price: str) -> Product:
+    return Product(
+        id=product_id,
+        name=f"P{product_id}",
+        description="",
+        price=Decimal(price),
+        category_id=1,
+        created_at=None,  # type: ignore[arg-type]
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_order_from_api_loads_products_in_one_query(order_service, mock_uow):
+    """Тест: товары корзины загружаются одним get_by_ids, дубликаты объединяются."""
+    mock_uow.users.get_by_telegram_id.return_value = User(
+        id=1, telegram_id=123, full_name="Test", username=None
+    )
+    mock_uow.orders.create.side_effect = lambda order: order
+    mock_uow.products.get_by_ids.return_value = {
+        1: _product(1, "100.00"),
+        2: _product(2, "50.50"),
+    }
+
+    order = await order_service.create_order_from_api(
+        telegram_id=123,
+        items=[
+            {"product_id": 1, "quantity": 1},
+            {"product_id": 2, "quantity": 1},
+            {"product_id": 1, "quantity": 2},
+        ],
+    )
+
+    mock_uow.products.get_by_ids.assert_awaited_once_with({1, 2})
+    mock_uow.products.get_by_id.assert_not_called()
+    assert [(i.product_id, i.quantity) for i in order.items] == [(1, 3), (2, 1)]
+    assert order.total_amount == Decimal("350.50")
+    # заказ вставляется уже с итоговой суммой
+    assert mock_uow.orders.create.call_args.args[0].total_amount == Decimal("350.50")
+    mock_uow.order_items.create_items.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_order_from_api_reports_missing_product(order_service, mock_uow):
+    """Тест: сообщение об отсутствующем товаре не изменилось."""
+    mock_uow.users.get_by_telegram_id.return_value = User(
+        id=1, telegram_id=123, full_name="Test", username=None
+    )
+    mock_uow.products.get_by_ids.return_value = {1: _product(1, "100.00")}
+
+    with pytest.raises(ValueError, match="Товар 5 не найден."):
+        await order_service.create_order_from_api(
+            telegram_id=123,
+            items=[{"product_id": 1, "quantity": 1}, {"product_id": 5, "quantity": 1}],
+        )
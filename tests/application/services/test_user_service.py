@@ -0,0 +1,89 @@
+# tests/application/services/test_user_service.py
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.application.services.user_service import UserService
+from src.domain.entities.user import User
+from src.infrastructure.memory.known_user_cache import KnownUserCache
+
+
+@pytest.fixture
+def uow():
+    uow = AsyncMock()
+
+    @asynccontextmanager
+    async def atomic():
+        yield
+
+    uow.atomic = atomic
+    uow.users.upsert.side_effect = lambda user: User(
+        id=5, telegram_id=user.telegram_id, full_name=user.full_name, username=user.username
+    )
+    return uow
+
+
+@pytest.mark.asyncio
+async def test_registration_is_a_single_upsert(uow):
+    user = await UserService(uow).register_user_if_not_exists(42, "Ann", "ann")
+
+    assert user.id == 5
+    uow.users.upsert.assert_awaited_once()
+    uow.users.get_by_telegram_id.assert_not_called()
+    uow.users.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_repeat_start_is_served_from_known_users(uow):
+    service = UserService(uow, KnownUserCache())
+
+    first = await service.register_user_if_not_exists(42, "Ann", "ann")
+    again = await service.register_user_if_not_exists(42, "Ann", "ann")
+
+    assert again is first
+    assert uow.users.upsert.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_profile_goes_to_database(uow):
+    service = UserService(uow, KnownUserCache())
+
+    await service.register_user_if_not_exists(42, "Ann", "ann")
+    user = await service.register_user_if_not_exists(42, "Ann B", "ann")
+
+    assert user.full_name == "Ann B"
+    assert uow.users.upsert.await_count == 2
+
+
+def test_known_user_cache_is_bounded():
+    cache = KnownUserCache(max_size=2)
+    for telegram_id in (1, 2, 3):
+        cache.put(User(id=telegram_id, telegram_id=telegram_id, full_name="U", username=None))
+
+    assert len(cache) == 2
+    assert cache.get(1) is None
+    assert cache.get(3) is not None
+
+
+@pytest.mark.asyncio
+async def test_register_user_defers_to_registration_buffer(uow):
+    registrations = MagicMock()
+    service = UserService(uow, KnownUserCache(), registrations)
+
+    await service.register_user(42, "Ann", "ann")
+
+    registrations.enqueue.assert_called_once_with(42, "Ann", "ann")
+    uow.users.upsert.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_register_user_writes_directly_when_buffer_is_full(uow):
+    registrations = MagicMock()
+    registrations.enqueue.return_value = False
+    service = UserService(uow, KnownUserCache(), registrations)
+
+    await service.register_user(42, "Ann", "ann")
+
+    uow.users.upsert.assert_awaited_once()
@@ -38,10 +38,16 @@ async def test_admin_products_filter_by_category():
             class DummyProdRepo(IProductRepository):
                 async def get_by_id(self, product_id: int):
                     return DomainProduct(id=product_id, name="P", description="D", price=1, category_id=1, created_at=None)  # type: ignore[arg-type]
+                async def get_by_ids(self, product_ids):
+                    return {pid: await self.get_by_id(pid) for pid in product_ids}
                 async def get_by_category_id(self, category_id: int):
                     return []
                 async def get_all(self):
                     return []
+                async def find(self, query):
+                    return []
+                async def count(self, query):
+                    return 0
                 async def add(self, product: DomainProduct):
                     return product
                 async def update(self, product: DomainProduct):
@@ -107,6 +113,8 @@ async def test_admin_orders_filters_status_and_dates():
         async def notify_order_created(self, telegram_id: int, order, *, full_name=None, phone=None, address=None):
             return None
 
+    seen_queries = []
+
     class TestServiceProvider(Provider):
         scope = Scope.REQUEST
         @provide
@@ -119,6 +127,11 @@ async def test_admin_orders_filters_status_and_dates():
                     class O:
                         async def get_all(self):
                             return []
+                        async def find(self, query):
+                            seen_queries.append(query)
+                            return []
+                        async def count(self, query):
+                            return 0
                     class OI:
                         async def get_by_order_id(self, oid:int):
                             return []
@@ -158,6 +171,13 @@ async def test_admin_orders_filters_status_and_dates():
     async with aiohttp.ClientSession() as session:
         r = await session.get(base + "/api/v1/admin/orders?status=paid&created_from=2025-01-01T00:00:00&created_to=2025-12-31T23:59:59&limit=10&offset=0", headers=headers)
         assert r.status in (200, 204)
+        assert r.headers["X-Total-Count"] == "0"
+
+    # filters are pushed down to the repository instead of being applied in Python
+    query = seen_queries[-1]
+    assert query.status == OrderStatus.PAID
+    assert query.created_from.year == 2025 and query.created_to.month == 12
+    assert (query.limit, query.offset) == (10, 0)
 
     await runner.cleanup()
 
@@ -76,6 +76,17 @@ async def test_full_flow_start_twa_order_notification():
             self._users_by_tg[user.telegram_id] = user
             return user
 
+        async def upsert(self, user: DomainUser) -> DomainUser:
+            existing = self._users_by_tg.get(user.telegram_id)
+            if existing is None:
+                return await self.add(user)
+            existing.full_name = user.full_name
+            existing.username = user.username
+            return existing
+
+        async def upsert_many(self, users):
+            return [await self.upsert(user) for user in users]
+
     class FakeProductRepo(IProductRepository):
         async def get_by_id(self, product_id: int) -> Optional[DomainProduct]:
             if product_id == 10:
@@ -89,12 +100,22 @@ async def test_full_flow_start_twa_order_notification():
                 )
             return None
 
+        async def get_by_ids(self, product_ids):
+            found = {pid: await self.get_by_id(pid) for pid in product_ids}
+            return {pid: p for pid, p in found.items() if p}
+
         async def get_by_category_id(self, category_id: int):
             return []
 
         async def get_all(self):
             return []
 
+        async def find(self, query):
+            return []
+
+        async def count(self, query):
+            return 0
+
         async def add(self, product: DomainProduct) -> DomainProduct:
             return product
 
@@ -0,0 +1,194 @@
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+from aiogram import Dispatcher
+from aiohttp import web
+from dishka import Provider, Scope, make_async_container, provide
+
+from src.application.contracts.notifications.notifier import INotifier
+from src.application.contracts.order.order_repository import IOrderItemRepository, IOrderRepository
+from src.application.contracts.persistence.uow import IUnitOfWork
+from src.application.interfaces.repositories.user_repository import IUserRepository
+from src.application.services.order_service import OrderService
+from src.domain.entities.order import Order as DomainOrder
+from src.domain.entities.product import Product as DomainProduct
+from src.domain.entities.user import User as DomainUser
+
+
+class BotStub:
+    async def set_webhook(self, *a, **k):
+        return None
+    async def delete_webhook(self, *a, **k):
+        return None
+
+
+class FakeUserRepo(IUserRepository):
+    async def get_by_id(self, user_id: int) -> Optional[DomainUser]:
+        return None
+    async def get_by_telegram_id(self, telegram_id: int) -> Optional[DomainUser]:
+        return DomainUser(id=1, telegram_id=telegram_id, full_name="Test", username="test", created_at=None)  # type: ignore[arg-type]
+    async def add(self, user: DomainUser) -> DomainUser:
+        return user
+    async def upsert(self, user: DomainUser) -> DomainUser:
+        return user
+    async def upsert_many(self, users):
+        return users
+
+
+class FakeProductRepo:
+    def __init__(self, calls: dict):
+        self.calls = calls
+    async def get_by_ids(self, product_ids):
+        self.calls["products"] += 1
+        return {10: DomainProduct(id=10, name="P", description="D", price=Decimal("100.00"), category_id=1, created_at=None)}  # type: ignore[arg-type]
+
+
+class FakeOrderRepo(IOrderRepository):
+    def __init__(self, calls: dict):
+        self.calls = calls
+    async def create(self, order: DomainOrder) -> DomainOrder:
+        self.calls["orders"] += 1
+        order.id = self.calls["orders"]
+        return order
+
+
+class FakeOrderItemRepo(IOrderItemRepository):
+    async def create_items(self, items):
+        return None
+
+
+class FakeUoW(IUnitOfWork):
+    def __init__(self, calls: dict, idempotency):
+        self.users = FakeUserRepo()
+        self.products = FakeProductRepo(calls)  # type: ignore[assignment]
+        self.orders = FakeOrderRepo(calls)
+        self.order_items = FakeOrderItemRepo()
+        self.idempotency = idempotency
+    @asynccontextmanager
+    async def atomic(self):
+        yield
+
+
+class CountingNotifier(INotifier):
+    def __init__(self, calls: dict):
+        self.calls = calls
+    async def notify_order_created(self, telegram_id, order, full_name=None, phone=None, address=None) -> None:
+        self.calls["notifications"] += 1
+
+
+class FakeServiceProvider(Provider):
+    scope = Scope.REQUEST
+
+    def __init__(self, calls: dict, idempotency):
+        super().__init__()
+        self.calls = calls
+        self.idempotency = idempotency
+
+    @provide
+    def get_uow(self) -> IUnitOfWork:
+        return FakeUoW(self.calls, self.idempotency)
+
+    @provide
+    def get_order_service(self, uow: IUnitOfWork) -> OrderService:
+        return OrderService(uow=uow, notifier=CountingNotifier(self.calls))
+
+
+async def _start_app(fake_idempotency_repo):
+    """Поднимает приложение с фейковым UoW; возвращает (runner, base_url, calls)."""
+    from src.infrastructure.di.providers import ConfigProvider, MemoryProvider
+    from src.presentation.web.app import setup_app
+
+    calls = {"orders": 0, "products": 0, "notifications": 0}
+    container = make_async_container(
+        ConfigProvider(), MemoryProvider(), FakeServiceProvider(calls, fake_idempotency_repo)
+    )
+    app = setup_app(dishka_container=container, bot=BotStub(), dispatcher=Dispatcher(dishka_container=container))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host="127.0.0.1", port=0)
+    await site.start()
+    host, port = next(iter(site._server.sockets)).getsockname()[:2]
+    return runner, f"http://{host}:{port}", calls
+
+
+PAYLOAD = {
+    "items": [{"product_id": 10, "quantity": 1}],
+    "user": {"id": 123},
+    "full_name": "Tester",
+    "phone": "+79990000000",
+    "address": "Street 1",
+}
+
+
+class InMemoryIdempotencyRepo:
+    def __init__(self):
+        self.rows = {}
+        self.gets = 0
+    async def get(self, telegram_id, key):
+        self.gets += 1
+        return self.rows.get((telegram_id, key))
+    async def save(self, telegram_id, key, response):
+        if (telegram_id, key) in self.rows:
+            return False
+        self.rows[(telegram_id, key)] = response
+        return True
+
+
+@pytest.mark.asyncio
+async def test_duplicate_submission_replays_stored_response():
+    import aiohttp
+
+    repo = InMemoryIdempotencyRepo()
+    runner, base, calls = await _start_app(repo)
+    headers = {"Idempotency-Key": "checkout-1"}
+    async with aiohttp.ClientSession() as session:
+        r1 = await session.post(base + "/api/create_order", json=PAYLOAD, headers=headers)
+        r2 = await session.post(base + "/api/create_order", json=PAYLOAD, headers=headers)
+        assert r1.status == 200 and r2.status == 200
+        assert await r1.json() == await r2.json() == {"status": "ok", "order_id": 1}
+        assert "Idempotent-Replayed" not in r1.headers
+        assert r2.headers["Idempotent-Replayed"] == "true"
+
+        # Повтор отвечен из LRU: ни товаров, ни уведомления, ни чтения ключа из БД
+        assert calls == {"orders": 1, "products": 1, "notifications": 1}
+        assert repo.gets == 1
+
+        # Тот же ключ с другим телом — ошибка, а не чужой ответ
+        other = dict(PAYLOAD, address="Street 2")
+        r3 = await session.post(base + "/api/create_order", json=other, headers=headers)
+        assert r3.status == 422
+        assert (await r3.json())["error"]["code"] == "idempotency_key_reused"
+
+        # Без ключа поведение прежнее: каждый запрос — новый заказ
+        r4 = await session.post(base + "/api/create_order", json=PAYLOAD)
+        assert (await r4.json())["order_id"] == 2
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_loses_race_and_replays_winner():
+    import aiohttp
+    from src.application.contracts.order.idempotency import StoredResponse
+
+    repo = InMemoryIdempotencyRepo()
+    winner = None
+
+    # Ключ «появляется» в БД между нашей проверкой и вставкой — как при
+    # параллельном запросе, закоммитившемся раньше
+    original_save = repo.save
+    async def racing_save(telegram_id, key, response):
+        nonlocal winner
+        winner = StoredResponse(response.request_hash, 200, {"status": "ok", "order_id": 42})
+        repo.rows[(telegram_id, key)] = winner
+        return await original_save(telegram_id, key, response)
+    repo.save = racing_save
+
+    runner, base, calls = await _start_app(repo)
+    async with aiohttp.ClientSession() as session:
+        r = await session.post(base + "/api/create_order", json=PAYLOAD, headers={"Idempotency-Key": "k"})
+        assert r.status == 200
+        assert await r.json() == {"status": "ok", "order_id": 42}
+        assert r.headers["Idempotent-Replayed"] == "true"
+    await runner.cleanup()
@@ -50,15 +50,28 @@ async def test_order_success_and_admin_status():
         async def add(self, user: DomainUser) -> DomainUser:
             return user
 
+        async def upsert(self, user: DomainUser) -> DomainUser:
+            return user
+
+        async def upsert_many(self, users):
+            return users
+
     class FakeProductRepo(IProductRepository):
         async def get_by_id(self, product_id: int) -> Optional[DomainProduct]:
             if product_id == 10:
                 return DomainProduct(id=10, name="P", description="D", price=Decimal("100.00"), category_id=1, created_at=None)  # type: ignore[arg-type]
             return None
+        async def get_by_ids(self, product_ids) -> dict[int, DomainProduct]:
+            found = {pid: await self.get_by_id(pid) for pid in product_ids}
+            return {pid: p for pid, p in found.items() if p}
         async def get_by_category_id(self, category_id: int) -> list[DomainProduct]:
             return []
         async def get_all(self) -> list[DomainProduct]:
             return []
+        async def find(self, query) -> list[DomainProduct]:
+            return []
+        async def count(self, query) -> int:
+            return 0
         async def add(self, product: DomainProduct) -> DomainProduct:
             return product
         async def update(self, product: DomainProduct) -> Optional[DomainProduct]:
@@ -0,0 +1,100 @@
+import hashlib
+import hmac
+
+import pytest
+from aiohttp import web
+
+
+@pytest.mark.asyncio
+async def test_public_catalog_is_cached_until_admin_write():
+    from src.presentation.web.app import setup_app
+    from dishka import make_async_container, Provider, Scope, provide
+    from src.infrastructure.di.providers import ConfigProvider, MemoryProvider
+    from aiogram import Dispatcher
+    from decimal import Decimal
+
+    from src.application.services.catalog import CategoryService, ProductService
+    from src.domain.entities.category import Category as DomainCategory
+    from src.domain.entities.product import Product as DomainProduct
+
+    db_reads = {"categories": 0, "products": 0}
+    categories = [DomainCategory(id=1, name="Мыши")]
+
+    class FakeCategoryRepo:
+        async def get_all(self):
+            db_reads["categories"] += 1
+            return list(categories)
+        async def add(self, category):
+            created = DomainCategory(id=len(categories) + 1, name=category.name)
+            categories.append(created)
+            return created
+
+    class FakeProductRepo:
+        async def get_by_category_id(self, category_id: int):
+            db_reads["products"] += 1
+            return [DomainProduct(id=10, name="P", description="D", price=Decimal("100.00"), category_id=category_id, created_at=None)]  # type: ignore[arg-type]
+        async def delete(self, product_id: int):
+            return True
+
+    class TestServiceProvider(Provider):
+        scope = Scope.REQUEST
+        @provide
+        def get_category_service(self) -> CategoryService:
+            return CategoryService(FakeCategoryRepo())  # type: ignore[arg-type]
+        @provide
+        def get_product_service(self) -> ProductService:
+            return ProductService(FakeProductRepo(), FakeCategoryRepo())  # type: ignore[arg-type]
+
+    container = make_async_container(ConfigProvider(), MemoryProvider(), TestServiceProvider())
+
+    class BotStub:
+        async def set_webhook(self, *a, **k):
+            return None
+        async def delete_webhook(self, *a, **k):
+            return None
+
+    app = setup_app(dishka_container=container, bot=BotStub(), dispatcher=Dispatcher(dishka_container=container))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host="127.0.0.1", port=0)
+    await site.start()
+    host, port = next(iter(site._server.sockets)).getsockname()[:2]
+    base = f"http://{host}:{port}"
+
+    from src.infrastructure.config import settings
+    secret = settings.app.secret_token.get_secret_value()
+    token = hmac.new(secret.encode(), b"123", hashlib.sha256).hexdigest()
+    headers = {"X-Admin-Token": token, "X-Admin-User": "123"}
+
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        for _ in range(3):
+            r = await session.get(base + "/api/categories")
+            assert await r.json() == [{"id": 1, "name": "Мыши"}]
+            r = await session.get(base + "/api/products?category_id=1")
+            assert (await r.json())[0]["id"] == 10
+        assert db_reads == {"categories": 1, "products": 1}
+
+        # Повторное открытие магазина: клиент присылает ETag и получает 304
+        r = await session.get(base + "/api/categories")
+        etag = r.headers["ETag"]
+        r = await session.get(base + "/api/categories", headers={"If-None-Match": etag})
+        assert r.status == 304
+
+        r = await session.post(base + "/api/v1/admin/categories", json={"name": "Клавиатуры"}, headers=headers)
+        assert r.status == 201
+        r = await session.get(base + "/api/categories")
+        assert [c["name"] for c in await r.json()] == ["Мыши", "Клавиатуры"]
+        assert db_reads["categories"] == 2
+
+        r = await session.delete(base + "/api/v1/admin/products/10", headers=headers)
+        assert r.status == 200
+        await session.get(base + "/api/products?category_id=1")
+        assert db_reads["products"] == 2
+
+        r = await session.get(base + "/api/v1/admin/catalog/cache", headers=headers)
+        stats = await r.json()
+        assert stats["hits"] == 6 and stats["misses"] == 4
+        assert stats["invalidations"] == 2
+
+    await runner.cleanup()
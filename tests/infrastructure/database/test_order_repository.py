@@ -0,0 +1,103 @@
+# tests/infrastructure/database/test_order_repository.py
+
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.domain.entities.order import OrderStatus
+from src.infrastructure.database.models import Order as DbOrder
+from src.infrastructure.database.models import OrderItem as DbOrderItem
+from src.infrastructure.database.repositories.order_repository import (
+    OrderItemRepository,
+    OrderRepository,
+)
+
+
+def _db_order_with_items() -> DbOrder:
+    db_order = DbOrder(
+        id=7,
+        user_id=1,
+        status=OrderStatus.PAID,
+        total_amount=Decimal("300.00"),
+        created_at=datetime(2025, 5, 1, 12, 0),
+    )
+    db_order.items = [
+        DbOrderItem(id=1, order_id=7, product_id=10, quantity=1, price_at_purchase=Decimal("100.00")),
+        DbOrderItem(id=2, order_id=7, product_id=11, quantity=2, price_at_purchase=Decimal("100.00")),
+    ]
+    return db_order
+
+
+@pytest.fixture
+def session():
+    session = AsyncMock()
+    result = MagicMock()
+    result.unique.return_value.scalar_one_or_none.return_value = _db_order_with_items()
+    session.execute.return_value = result
+    return session
+
+
+@pytest.mark.asyncio
+async def test_get_by_order_id_is_single_round_trip(session):
+    items = await OrderItemRepository(session).get_by_order_id(7)
+
+    session.execute.assert_awaited_once()
+    session.get.assert_not_called()
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "LEFT OUTER JOIN order_items" in sql
+    assert [i.product_id for i in items] == [10, 11]
+    # все позиции разделяют один доменный объект заказа
+    assert items[0].order is items[1].order
+    assert items[0].order_id == 7
+
+
+@pytest.mark.asyncio
+async def test_get_with_items_returns_order_with_items(session):
+    order = await OrderRepository(session).get_with_items(7)
+
+    assert order is not None
+    assert order.status == OrderStatus.PAID
+    assert order.created_at == datetime(2025, 5, 1, 12, 0)
+    assert len(order.items) == 2
+    assert all(i.order is order for i in order.items)
+
+
+@pytest.mark.asyncio
+async def test_create_inserts_order_with_returning():
+    from src.domain.entities.order import Order as DomainOrder
+
+    session = AsyncMock()
+    row = MagicMock(id=15, created_at=datetime(2025, 5, 1, 12, 0))
+    session.execute.return_value = MagicMock(one=MagicMock(return_value=row))
+    order = DomainOrder(id=0, user_id=1, status=OrderStatus.PENDING, total_amount=Decimal("350.50"))
+
+    created = await OrderRepository(session).create(order)
+
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO orders")
+    assert "RETURNING orders.id, orders.created_at" in sql
+    assert (created.id, created.created_at) == (15, datetime(2025, 5, 1, 12, 0))
+    session.flush.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_items_is_one_multi_row_insert():
+    from src.domain.entities.order import Order as DomainOrder
+    from src.domain.entities.order_item import OrderItem as DomainOrderItem
+
+    session = AsyncMock()
+    order = DomainOrder(id=15, user_id=1, status=OrderStatus.PENDING, total_amount=Decimal("0"))
+    items = [
+        DomainOrderItem(id=0, order=order, product_id=pid, quantity=1, price_at_purchase=Decimal("1"))
+        for pid in (10, 11, 12)
+    ]
+
+    await OrderItemRepository(session).create_items(items)
+
+    session.execute.assert_awaited_once()
+    stmt = session.execute.call_args.args[0]
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    assert str(compiled).count("(%(order_id_m") == 3
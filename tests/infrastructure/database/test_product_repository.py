@@ -0,0 +1,124 @@
+# tests/infrastructure/database/test_product_repository.py
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+
+from src.application.interfaces.repositories.product_repository import ProductQuery
+from src.application.services.catalog import ProductService
+from src.infrastructure.database.repositories.product_repository import (
+    ProductRepository,
+)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def session():
+    session = AsyncMock()
+    scalars_result = MagicMock()
+    scalars_result.all.return_value = []
+    session.scalars.return_value = scalars_result
+    session.scalar.return_value = 42
+    return session
+
+
+@pytest.mark.asyncio
+async def test_find_pushes_filters_and_page_into_sql(session):
+    repo = ProductRepository(session)
+    query = ProductQuery(category_id=3, search="50%", limit=20, offset=40)
+
+    await repo.find(query)
+
+    sql = _sql(session.scalars.call_args.args[0])
+    assert "products.category_id = " in sql
+    assert "ILIKE" in sql
+    assert "LIMIT" in sql and "OFFSET" in sql
+    # запрос не числовой — условия по id не добавляются
+    assert "products.id = " not in sql
+
+
+@pytest.mark.asyncio
+async def test_count_uses_same_filters_without_page(session):
+    repo = ProductRepository(session)
+    query = ProductQuery(search="7", limit=20, offset=40)
+
+    total = await repo.count(query)
+
+    sql = _sql(session.scalar.call_args.args[0])
+    assert total == 42
+    assert "count(*)" in sql
+    assert "products.id = " in sql
+    assert "LIMIT" not in sql and "OFFSET" not in sql
+
+
+@pytest.mark.asyncio
+async def test_search_products_skips_count_on_last_page():
+    repo = AsyncMock()
+    repo.find.return_value = ["p1", "p2"]
+    service = ProductService(repo, AsyncMock())
+
+    products, total = await service.search_products(ProductQuery(limit=10, offset=20))
+
+    assert products == ["p1", "p2"]
+    assert total == 22
+    repo.count.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_search_products_counts_full_page():
+    repo = AsyncMock()
+    repo.find.return_value = ["p"] * 10
+    repo.count.return_value = 135
+    service = ProductService(repo, AsyncMock())
+
+    _, total = await service.search_products(ProductQuery(limit=10))
+
+    assert total == 135
+    repo.count.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_find_keyset_seeks_on_id_instead_of_offset(session):
+    repo = ProductRepository(session)
+
+    await repo.find(ProductQuery(limit=20, offset=40, after_id=100))
+
+    sql = _sql(session.scalars.call_args.args[0])
+    assert "products.id > " in sql
+    assert "OFFSET" not in sql
+
+
+def _with_dialect(session, name: str):
+    bind = MagicMock()
+    bind.dialect.name = name
+    session.get_bind = MagicMock(return_value=bind)
+    return session
+
+
+_RELEVANCE = ProductQuery(search="ноутбук", order_by="relevance", limit=5)
+
+
+@pytest.mark.asyncio
+async def test_relevance_order_uses_trigram_similarity_on_postgres(session):
+    repo = ProductRepository(_with_dialect(session, "postgresql"))
+
+    await repo.find(_RELEVANCE)
+
+    sql = _sql(session.scalars.call_args.args[0])
+    assert "ILIKE" in sql
+    assert "ORDER BY greatest(word_similarity(" in sql
+    assert "LIMIT" in sql
+
+
+@pytest.mark.asyncio
+async def test_relevance_order_falls_back_without_pg_trgm_on_sqlite(session):
+    repo = ProductRepository(_with_dialect(session, "sqlite"))
+
+    await repo.find(_RELEVANCE)
+
+    sql = str(session.scalars.call_args.args[0])
+    assert "word_similarity" not in sql
+    assert "CASE WHEN" in sql
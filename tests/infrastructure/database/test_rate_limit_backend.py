@@ -0,0 +1,143 @@
+# tests/infrastructure/database/test_rate_limit_backend.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DataError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.infrastructure.database.rate_limit import PostgresRateLimitBackend, storage_key
+
+
+def _engine(conn):
+    engine = MagicMock()
+
+    @asynccontextmanager
+    async def begin():
+        yield conn
+
+    engine.begin = begin
+    return engine
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_allowed_hit_is_one_atomic_upsert():
+    conn = AsyncMock()
+    conn.execute.return_value = MagicMock(first=MagicMock(return_value=(1001.0,)))
+    backend = PostgresRateLimitBackend(_engine(conn), clock=lambda: 1000.0)
+    backend._next_sweep = float("inf")
+
+    assert await backend.hit("/api/v1/admin|1", 120, 60) == 0
+
+    conn.execute.assert_awaited_once()
+    sql = _sql(conn.execute.await_args.args[0])
+    assert "INSERT INTO rate_limit_buckets" in sql
+    assert "ON CONFLICT (key) DO UPDATE" in sql
+    assert "WHERE greatest(rate_limit_buckets.tat" in sql
+    assert "RETURNING rate_limit_buckets.tat" in sql
+
+
+@pytest.mark.asyncio
+async def test_rejected_hit_reports_retry_after():
+    conn = AsyncMock()
+    rejected = MagicMock(first=MagicMock(return_value=None))
+    current = MagicMock(scalar_one=MagicMock(return_value=1062.0))
+    conn.execute.side_effect = [rejected, current]
+    backend = PostgresRateLimitBackend(_engine(conn), clock=lambda: 1000.0)
+    backend._next_sweep = float("inf")
+
+    retry_after = await backend.hit("k", 120, 60)
+
+    # TAT опережает now на 62 c при допуске 59.5 c
+    assert retry_after == pytest.approx(2.5)
+    assert conn.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_idle_keys_are_swept_in_background_transaction():
+    request_conn = AsyncMock()
+    request_conn.execute.return_value = MagicMock(first=MagicMock(return_value=(1001.0,)))
+    sweep_conn = AsyncMock()
+    engine = MagicMock()
+    conns = iter([request_conn, sweep_conn])
+
+    @asynccontextmanager
+    async def begin():
+        yield next(conns)
+
+    engine.begin = begin
+    backend = PostgresRateLimitBackend(engine, clock=lambda: 1000.0)
+
+    await backend.hit("k", 120, 60)
+    await backend._sweep_task
+
+    request_conn.execute.assert_awaited_once()
+    assert _sql(sweep_conn.execute.await_args.args[0]).startswith(
+        "DELETE FROM rate_limit_buckets WHERE rate_limit_buckets.tat <"
+    )
+
+
+@pytest.mark.asyncio
+async def test_long_client_key_is_stored_as_fixed_length_digest():
+    conn = AsyncMock()
+    conn.execute.return_value = MagicMock(first=MagicMock(return_value=(1001.0,)))
+    backend = PostgresRateLimitBackend(_engine(conn), clock=lambda: 1000.0)
+    backend._next_sweep = float("inf")
+
+    await backend.hit("/api/v1/admin|" + "x" * 10_000, 120, 60)
+
+    params = conn.execute.await_args.args[0].compile(dialect=postgresql.dialect()).params
+    assert params["key"] == storage_key("/api/v1/admin|" + "x" * 10_000)
+    assert params["key"].startswith("/api/v1/admin|")
+    assert len(params["key"]) == len("/api/v1/admin|") + 64
+
+
+@pytest.mark.asyncio
+async def test_database_errors_fail_open():
+    conn = AsyncMock()
+    conn.execute.side_effect = ConnectionError("db down")
+    backend = PostgresRateLimitBackend(_engine(conn))
+
+    assert await backend.hit("k", 1, 60) == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_fails_open():
+    conn = AsyncMock()
+    conn.execute.side_effect = PoolTimeoutError("QueuePool limit reached")
+    backend = PostgresRateLimitBackend(_engine(conn))
+
+    assert await backend.hit("k", 1, 60) == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_backend_fails_open_after_short_timeout():
+    engine = MagicMock()
+
+    @asynccontextmanager
+    async def begin():
+        # Ожидание соединения из занятого пула
+        await asyncio.sleep(10)
+        yield AsyncMock()
+
+    engine.begin = begin
+    backend = PostgresRateLimitBackend(engine, timeout=0.01)
+
+    assert await asyncio.wait_for(backend.hit("k", 1, 60), 1) == 0
+
+
+@pytest.mark.asyncio
+async def test_data_errors_do_not_fail_open():
+    conn = AsyncMock()
+    conn.execute.side_effect = DataError("INSERT", {}, Exception("value too long"))
+    backend = PostgresRateLimitBackend(_engine(conn))
+
+    with pytest.raises(DataError):
+        await backend.hit("k", 1, 60)
@@ -0,0 +1,154 @@
+# tests/infrastructure/database/test_registration_buffer.py
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.infrastructure.database.registration_buffer import RegistrationBuffer
+from src.infrastructure.memory.known_user_cache import KnownUserCache
+
+
+class _Session:
+    @asynccontextmanager
+    async def begin(self):
+        yield
+
+
+@asynccontextmanager
+async def _session_factory():
+    yield _Session()
+
+
+class _FakeUserRepo:
+    def __init__(self):
+        self.batches: list[list[int]] = []
+        self.fail = False
+
+    async def upsert_many(self, users):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.batches.append([u.telegram_id for u in users])
+        for index, user in enumerate(users, start=1):
+            user.id = index
+        return users
+
+
+def _buffer(repo, **kwargs) -> RegistrationBuffer:
+    return RegistrationBuffer(
+        _session_factory,  # type: ignore[arg-type]
+        repo_factory=lambda session: repo,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_registrations_are_written_in_one_batch():
+    repo = _FakeUserRepo()
+    known = KnownUserCache()
+    buffer = _buffer(repo, known_users=known)
+    for telegram_id in (1, 2, 3, 2):
+        buffer.enqueue(telegram_id, f"U{telegram_id}", None)
+
+    assert await buffer.flush() == 3
+    assert repo.batches == [[1, 2, 3]]
+    assert known.get(2) is not None
+    assert len(buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_full_batch_wakes_background_flusher():
+    repo = _FakeUserRepo()
+    buffer = _buffer(repo, batch_size=2, flush_interval=60)
+    buffer.start()
+    buffer.enqueue(1, "A", None)
+    buffer.enqueue(2, "B", None)
+    for _ in range(5):
+        await asyncio.sleep(0)
+    await buffer.stop()
+
+    assert repo.batches == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_ensure_flushed_writes_only_that_users_row():
+    repo = _FakeUserRepo()
+    buffer = _buffer(repo)
+
+    await buffer.ensure_flushed(1)
+    assert repo.batches == []
+
+    buffer.enqueue(1, "A", None)
+    buffer.enqueue(2, "B", None)
+    await buffer.ensure_flushed(1)
+    assert repo.batches == [[1]]
+    assert len(buffer) == 1
+
+
+@pytest.mark.asyncio
+async def test_ensure_flushed_waits_for_batch_in_flight_without_lock():
+    release = asyncio.Event()
+
+    class _SlowRepo(_FakeUserRepo):
+        async def upsert_many(self, users):
+            await release.wait()
+            return await super().upsert_many(users)
+
+    repo = _SlowRepo()
+    buffer = _buffer(repo)
+    buffer.enqueue(1, "A", None)
+    flush = asyncio.create_task(buffer.flush())
+    await asyncio.sleep(0)
+
+    # Пользователь не в буфере и не в пачке — возврат сразу, несмотря на lock
+    await asyncio.wait_for(buffer.ensure_flushed(2), timeout=1)
+
+    waiter = asyncio.create_task(buffer.ensure_flushed(1))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    release.set()
+    await waiter
+    await flush
+    assert repo.batches == [[1]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_stays_in_buffer():
+    repo = _FakeUserRepo()
+    buffer = _buffer(repo)
+    buffer.enqueue(1, "A", None)
+    repo.fail = True
+
+    with pytest.raises(RuntimeError):
+        await buffer.flush()
+    assert len(buffer) == 1
+
+    repo.fail = False
+    await buffer.ensure_flushed(1)
+    assert repo.batches == [[1]]
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_bounded_while_database_is_down():
+    repo = _FakeUserRepo()
+    buffer = _buffer(repo, max_pending=2)
+    assert buffer.enqueue(1, "A", None) and buffer.enqueue(2, "B", None)
+    # Новый пользователь сверх лимита не принимается, обновление известного — да
+    assert not buffer.enqueue(3, "C", None)
+    assert buffer.enqueue(2, "B2", None)
+
+    repo.fail = True
+    with pytest.raises(RuntimeError):
+        await buffer.flush()
+    assert len(buffer) == 2
+
+    # Пока пачка писалась, буфер заполнили снова — возвращается только то, что влезает
+    class _Refill(_FakeUserRepo):
+        async def upsert_many(self, users):
+            buffer.enqueue(5, "E", None)
+            raise RuntimeError("db down")
+
+    buffer._repo_factory = lambda session: _Refill()
+    with pytest.raises(RuntimeError):
+        await buffer.flush()
+    assert len(buffer) == 2
@@ -0,0 +1,50 @@
+# tests/infrastructure/database/test_user_repository.py
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.domain.entities.user import User
+from src.infrastructure.database.repositories.user_repository import UserRepository
+
+
+@pytest.mark.asyncio
+async def test_upsert_is_single_insert_on_conflict_returning():
+    session = AsyncMock()
+    session.execute.return_value = [
+        MagicMock(id=3, telegram_id=42, full_name="Ann", username="ann", created_at=datetime(2025, 1, 1))
+    ]
+
+    user = await UserRepository(session).upsert(
+        User(id=0, telegram_id=42, full_name="Ann", username="ann")
+    )
+
+    session.execute.assert_awaited_once()
+    session.flush.assert_not_called()
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (telegram_id) DO UPDATE" in sql
+    assert "RETURNING users.id" in sql
+    assert user.id == 3 and user.telegram_id == 42
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_is_one_multirow_statement_without_duplicates():
+    session = AsyncMock()
+    session.execute.return_value = []
+
+    await UserRepository(session).upsert_many(
+        [
+            User(id=0, telegram_id=1, full_name="A", username=None),
+            User(id=0, telegram_id=2, full_name="B", username=None),
+            User(id=0, telegram_id=1, full_name="A2", username=None),
+        ]
+    )
+
+    session.execute.assert_awaited_once()
+    compiled = session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT (telegram_id) DO UPDATE" in str(compiled)
+    assert compiled.params["telegram_id_m0"] == 1
+    assert compiled.params["full_name_m0"] == "A2"
+    assert "telegram_id_m2" not in compiled.params
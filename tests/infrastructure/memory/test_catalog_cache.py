@@ -0,0 +1,158 @@
+# tests/infrastructure/memory/test_catalog_cache.py
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.memory.catalog_cache import (
+    CATEGORIES_KEY,
+    CatalogCache,
+    products_key,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _loader(value, calls: list):
+    async def load():
+        calls.append(value)
+        return value
+    return load
+
+
+@pytest.mark.asyncio
+async def test_second_read_is_a_hit():
+    cache = CatalogCache()
+    calls: list = []
+
+    assert await cache.get_or_load(CATEGORIES_KEY, _loader(["a"], calls)) == ["a"]
+    assert await cache.get_or_load(CATEGORIES_KEY, _loader(["b"], calls)) == ["a"]
+
+    assert calls == [["a"]]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl_and_report_age():
+    clock = _Clock()
+    cache = CatalogCache(ttl=10, clock=clock)
+    calls: list = []
+
+    await cache.get_or_load(CATEGORIES_KEY, _loader(1, calls))
+    clock.now = 4
+    assert cache.stats()["oldest_entry_age_seconds"] == 4
+    clock.now = 10
+    assert await cache.get_or_load(CATEGORIES_KEY, _loader(2, calls)) == 2
+    assert calls == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_products_of_one_category():
+    cache = CatalogCache()
+    calls: list = []
+    await cache.get_or_load(products_key(1), _loader("p1", calls))
+    await cache.get_or_load(products_key(2), _loader("p2", calls))
+    await cache.get_or_load(CATEGORIES_KEY, _loader("c", calls))
+
+    cache.invalidate_products(1)
+
+    assert await cache.get_or_load(products_key(1), _loader("p1'", calls)) == "p1'"
+    assert await cache.get_or_load(products_key(2), _loader("x", calls)) == "p2"
+    assert await cache.get_or_load(CATEGORIES_KEY, _loader("x", calls)) == "c"
+
+    cache.invalidate_products()
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["invalidations"] == 2
+
+
+@pytest.mark.asyncio
+async def test_load_started_before_invalidation_is_not_cached():
+    cache = CatalogCache()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_load():
+        started.set()
+        await release.wait()
+        return "stale"
+
+    task = asyncio.create_task(cache.get_or_load(CATEGORIES_KEY, slow_load))
+    await started.wait()
+    cache.invalidate_categories()
+    release.set()
+
+    assert await task == "stale"
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = CatalogCache()
+    release = asyncio.Event()
+    loads = 0
+
+    async def slow_load():
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return ["p"]
+
+    waiters = [
+        asyncio.create_task(cache.get_or_load(products_key(1), slow_load))
+        for _ in range(100)
+    ]
+    await asyncio.sleep(0)
+    assert cache.stats()["inflight"] == 1
+    release.set()
+
+    assert all(r == ["p"] for r in await asyncio.gather(*waiters))
+    assert loads == 1
+    stats = cache.stats()
+    assert (stats["loads"], stats["coalesced_waiters"], stats["inflight"]) == (1, 99, 0)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_abort_shared_load():
+    cache = CatalogCache()
+    release = asyncio.Event()
+
+    async def slow_load():
+        await release.wait()
+        return "c"
+
+    first = asyncio.create_task(cache.get_or_load(CATEGORIES_KEY, slow_load))
+    second = asyncio.create_task(cache.get_or_load(CATEGORIES_KEY, slow_load))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "c"
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_shared_and_not_cached():
+    cache = CatalogCache()
+    release = asyncio.Event()
+
+    async def failing_load():
+        await release.wait()
+        raise ConnectionError("db down")
+
+    waiters = [
+        asyncio.create_task(cache.get_or_load(CATEGORIES_KEY, failing_load))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert cache.stats()["loads"] == 1
+    assert await cache.get_or_load(CATEGORIES_KEY, _loader("ok", [])) == "ok"
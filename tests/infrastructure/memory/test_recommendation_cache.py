@@ -0,0 +1,72 @@
+# tests/infrastructure/memory/test_recommendation_cache.py
+
+from src.infrastructure.memory.recommendation_cache import (
+    RecommendationCache,
+    normalize_query,
+)
+
+ANSWER = {"product_id": 7, "explanation": "Подойдёт для работы."}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_query_normalization_ignores_case_order_and_stop_words():
+    assert normalize_query("Ноутбук для работы") == normalize_query("работы, НОУТБУК!")
+    assert normalize_query("нужен ноутбук для работы") == normalize_query("ноутбуки работа")
+
+
+def test_exact_hit_is_scoped_to_catalog_version():
+    cache = RecommendationCache()
+    cache.put("Ноутбук для работы", 1, ANSWER)
+
+    assert cache.get("ноутбук, для работы", 1) == ANSWER
+    assert cache.get("ноутбук для работы", 2) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_entries_expire_and_are_evicted_lru():
+    clock = _Clock()
+    cache = RecommendationCache(ttl=60, max_entries=2, clock=clock)
+    cache.put("ноутбук", 1, ANSWER)
+    cache.put("наушники", 1, ANSWER)
+    cache.get("ноутбук", 1)
+    cache.put("клавиатура", 1, ANSWER)
+
+    assert cache.get("наушники", 1) is None
+    assert cache.get("ноутбук", 1) == ANSWER
+
+    clock.now = 61
+    assert cache.get("ноутбук", 1) is None
+
+
+def test_similar_query_hits_only_above_threshold():
+    weights = {"ноутбук": 0.2, "игров": 3.0, "работ": 3.0, "учеб": 3.0, "мощн": 1.0}
+    cache = RecommendationCache(similarity_threshold=0.8, idf=lambda term: weights.get(term, 1.0))
+    cache.put("мощный игровой ноутбук", 1, ANSWER)
+
+    # Отличается только малоинформативным словом — достаточно близко
+    assert cache.get("игровой мощный", 1) == ANSWER
+    # Совпадает только частое «ноутбук» — это другой вопрос
+    assert cache.get("ноутбук для учёбы", 1) is None
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_similarity_is_disabled_by_default():
+    cache = RecommendationCache()
+    cache.put("мощный игровой ноутбук", 1, ANSWER)
+
+    assert cache.get("игровой мощный", 1) is None
+
+
+def test_returned_response_is_a_copy():
+    cache = RecommendationCache()
+    cache.put("ноутбук", 1, ANSWER)
+    cache.get("ноутбук", 1)["product_id"] = 99
+
+    assert cache.get("ноутбук", 1)["product_id"] == 7
@@ -0,0 +1,184 @@
+# tests/infrastructure/outbox/test_outbox_dispatcher.py
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram.methods import SendMessage
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from sqlalchemy.dialects import postgresql
+
+from src.application.contracts.notifications.outbox import OutboxMessage
+from src.domain.entities.order import Order, OrderStatus
+from src.infrastructure.database.repositories.outbox_repository import OutboxRepository
+from src.infrastructure.outbox.dispatcher import OutboxDispatcher
+from src.infrastructure.outbox.notifier import (
+    ORDER_CREATED,
+    OutboxNotifier,
+    order_created_payload,
+    order_from_payload,
+)
+
+
+def _order() -> Order:
+    return Order(
+        id=5,
+        user_id=1,
+        status=OrderStatus.PENDING,
+        total_amount=Decimal("250.00"),
+        created_at=datetime(2025, 5, 1, 12, 0),
+    )
+
+
+class _Session:
+    in_transaction = False
+    transactions = 0
+
+    @asynccontextmanager
+    async def begin(self):
+        _Session.in_transaction = True
+        _Session.transactions += 1
+        try:
+            yield
+        finally:
+            _Session.in_transaction = False
+
+
+@asynccontextmanager
+async def _session_factory():
+    yield _Session()
+
+
+def _dispatcher(outbox, notifier, **kwargs) -> OutboxDispatcher:
+    return OutboxDispatcher(
+        _session_factory,  # type: ignore[arg-type]
+        notifier,
+        repo_factory=lambda session: outbox,
+        **kwargs,
+    )
+
+
+def _message(message_id: int, attempts: int = 0) -> OutboxMessage:
+    return OutboxMessage(
+        id=message_id,
+        kind=ORDER_CREATED,
+        payload=order_created_payload(123, _order(), full_name="Tester"),
+        attempts=attempts,
+    )
+
+
+@pytest.mark.asyncio
+async def test_outbox_notifier_writes_order_snapshot():
+    outbox = AsyncMock()
+
+    await OutboxNotifier(outbox).notify_order_created(
+        telegram_id=123, order=_order(), phone="+79990000000"
+    )
+
+    kind, payload = outbox.add.await_args.args
+    assert kind == ORDER_CREATED
+    assert payload["telegram_id"] == 123
+    assert payload["phone"] == "+79990000000"
+    assert order_from_payload(payload) == _order()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_once_delivers_and_marks_sent():
+    outbox = AsyncMock()
+    outbox.claim_batch.return_value = [_message(1), _message(2)]
+    notifier = AsyncMock()
+
+    processed = await _dispatcher(outbox, notifier, batch_size=10).dispatch_once()
+
+    assert processed == 2
+    outbox.claim_batch.assert_awaited_once_with(10, lease=300.0)
+    assert notifier.notify_order_created.await_count == 2
+    kwargs = notifier.notify_order_created.await_args.kwargs
+    assert kwargs["telegram_id"] == 123 and kwargs["order"].id == 5
+    assert kwargs["full_name"] == "Tester"
+    outbox.mark_sent.assert_awaited_once_with([1, 2])
+    outbox.mark_failed.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_once_retries_failed_message_with_backoff():
+    outbox = AsyncMock()
+    outbox.claim_batch.return_value = [_message(1, attempts=2), _message(2)]
+    notifier = AsyncMock()
+    notifier.notify_order_created.side_effect = [ConnectionError("timeout"), None]
+
+    await _dispatcher(outbox, notifier).dispatch_once()
+
+    message_id, error, retry_in = outbox.mark_failed.await_args.args
+    assert message_id == 1 and "timeout" in error
+    assert retry_in == 8.0  # 2 ** (attempts + 1)
+    outbox.mark_sent.assert_awaited_once_with([2])
+
+
+@pytest.mark.asyncio
+async def test_dispatch_once_gives_up_on_permanent_error_and_max_attempts():
+    outbox = AsyncMock()
+    outbox.claim_batch.return_value = [_message(1), _message(2, attempts=4)]
+    notifier = AsyncMock()
+    notifier.notify_order_created.side_effect = [
+        TelegramForbiddenError(SendMessage(chat_id=123, text="x"), "bot was blocked"),
+        ConnectionError("timeout"),
+    ]
+
+    await _dispatcher(outbox, notifier, max_attempts=5).dispatch_once()
+
+    retries = [call.args[2] for call in outbox.mark_failed.await_args_list]
+    assert retries == [None, None]
+    outbox.mark_sent.assert_awaited_once_with([])
+
+
+@pytest.mark.asyncio
+async def test_sends_happen_outside_of_transactions():
+    outbox = AsyncMock()
+    outbox.claim_batch.return_value = [_message(1), _message(2)]
+    notifier = AsyncMock()
+    in_transaction: list[bool] = []
+    notifier.notify_order_created.side_effect = lambda **kwargs: in_transaction.append(
+        _Session.in_transaction
+    )
+    _Session.transactions = 0
+
+    await _dispatcher(outbox, notifier).dispatch_once()
+
+    assert in_transaction == [False, False]
+    # аренда пачки и запись результатов — две короткие транзакции
+    assert _Session.transactions == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_stops_the_rest_of_the_batch():
+    outbox = AsyncMock()
+    outbox.claim_batch.return_value = [_message(1), _message(2), _message(3)]
+    notifier = AsyncMock()
+    notifier.notify_order_created.side_effect = TelegramRetryAfter(
+        SendMessage(chat_id=123, text="x"), "flood", retry_after=30
+    )
+
+    await _dispatcher(outbox, notifier).dispatch_once()
+
+    assert notifier.notify_order_created.await_count == 1
+    assert outbox.mark_failed.await_args.args[0] == 1
+    assert outbox.mark_failed.await_args.args[2] == 30.0
+    outbox.release.assert_awaited_once_with([2, 3], 30.0)
+
+
+@pytest.mark.asyncio
+async def test_claim_batch_leases_rows_skipping_locked_ones():
+    session = AsyncMock()
+    session.execute.return_value = []
+
+    await OutboxRepository(session).claim_batch(50, lease=120)
+
+    stmt = session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE outbox_messages SET next_attempt_at=")
+    assert "sent_at IS NULL" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "RETURNING outbox_messages.id" in sql
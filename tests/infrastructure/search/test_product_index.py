@@ -0,0 +1,195 @@
+# tests/infrastructure/search/test_product_index.py
+
+import asyncio
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.application.services.ai_prompt import (
+    PROMPT_HEAD,
+    PROMPT_MIDDLE,
+    build_prompt,
+    format_product_line,
+)
+from src.domain.entities.product import Product
+from src.infrastructure.search.product_index import ProductIndex
+from src.infrastructure.search.stemmer import stem_ru, tokenize
+
+
+def _product(product_id: int, name: str, description: str = "") -> Product:
+    return Product(
+        id=product_id,
+        name=name,
+        description=description,
+        price=Decimal("100.00"),
+        category_id=1,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+CATALOG = [
+    _product(1, "Игровой ноутбук Nitro", "Мощная видеокарта RTX 4060 и экран 144 Гц"),
+    _product(2, "Ультрабук для работы", "Лёгкий ноутбук с долгой автономностью"),
+    _product(3, "Беспроводные наушники", "Шумоподавление и 30 часов работы"),
+    _product(4, "Механическая клавиатура", "Игровая клавиатура с подсветкой"),
+]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_word_forms_share_a_stem():
+    assert stem_ru("ноутбуки") == stem_ru("ноутбука") == stem_ru("ноутбуком")
+    assert stem_ru("игровой") == stem_ru("игровые")
+    assert tokenize("Ищу НАУШНИКИ для RTX") == ["наушник", "rtx"]
+
+
+def test_search_ranks_relevant_products_first():
+    index = ProductIndex()
+    index.rebuild(CATALOG)
+
+    ids = [p.id for p in index.search("нужен игровой ноутбук с хорошей видеокартой", 3)]
+    assert ids[0] == 1
+    assert set(ids) == {1, 2, 4}
+    assert [p.id for p in index.search("наушников", 3)] == [3]
+
+
+def test_unmatched_query_falls_back_to_catalog_head():
+    index = ProductIndex()
+    index.rebuild(CATALOG)
+
+    assert [p.id for p in index.search("подарок маме", 2)] == [1, 2]
+
+
+def test_incremental_updates_match_full_rebuild():
+    incremental = ProductIndex()
+    incremental.rebuild(CATALOG[:2])
+    incremental.upsert(CATALOG[2])
+    incremental.upsert(_product(1, "Планшет", "Большой экран"))
+    incremental.upsert(CATALOG[3])
+    incremental.remove(2)
+
+    rebuilt = ProductIndex()
+    rebuilt.rebuild([_product(1, "Планшет", "Большой экран"), CATALOG[2], CATALOG[3]])
+
+    for query in ("ноутбук", "экран", "игровая клавиатура", "работы"):
+        assert [p.id for p in incremental.search(query, 3)] == [p.id for p in rebuilt.search(query, 3)]
+    assert incremental._postings == rebuilt._postings
+    assert len(incremental) == 3
+
+
+def test_index_becomes_stale_after_ttl_or_invalidate():
+    clock = _Clock()
+    index = ProductIndex(ttl=60, clock=clock)
+    assert index.is_stale()
+
+    index.rebuild(CATALOG)
+    assert not index.is_stale()
+    clock.now = 60
+    assert index.is_stale()
+
+    index.rebuild(CATALOG)
+    index.invalidate()
+    assert index.is_stale()
+
+
+def test_catalog_block_is_prebuilt_per_version():
+    index = ProductIndex()
+    index.rebuild(CATALOG)
+    version = index.version
+
+    block = index.catalog_block()
+    assert block == "\n".join(format_product_line(p) for p in CATALOG)
+    assert index.catalog_block() is block
+
+    index.upsert(_product(2, "Ультрабук Pro", "Новая модель"))
+    assert index.version > version
+    assert "Ультрабук Pro" in index.catalog_block()
+
+    index.remove(3)
+    assert "наушники" not in index.catalog_block()
+
+
+def test_prompt_context_uses_prebuilt_lines():
+    index = ProductIndex()
+    index.rebuild(CATALOG)
+
+    block = index.context_block(index.search("наушники", 1))
+    prompt = build_prompt(block, "хочу наушники")
+
+    assert block == format_product_line(CATALOG[2])
+    assert prompt.startswith(PROMPT_HEAD + block + PROMPT_MIDDLE + "хочу наушники")
+    assert "Игровой ноутбук" not in prompt
+
+
+def test_rebuild_with_same_content_keeps_version():
+    index = ProductIndex()
+    index.rebuild(CATALOG)
+    version = index.version
+    block = index.catalog_block()
+
+    index.rebuild(list(reversed(CATALOG)))
+    assert index.version == version
+    assert index.catalog_block() is block
+    assert 3 in index and 99 not in index
+
+    index.rebuild(CATALOG[:3])
+    assert index.version > version
+    assert 4 not in index
+
+    # После точечного изменения перестройка к прежнему содержимому — новая версия
+    version = index.version
+    index.upsert(CATALOG[3])
+    index.rebuild(CATALOG[:3])
+    assert index.version == version + 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refresh_loads_and_builds_once_off_the_loop(monkeypatch):
+    index = ProductIndex()
+    loads = 0
+    build_threads = []
+    build = ProductIndex._build
+
+    def tracking_build(self, products):
+        build_threads.append(threading.current_thread())
+        return build(self, products)
+
+    monkeypatch.setattr(ProductIndex, "_build", tracking_build)
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return CATALOG
+
+    await asyncio.gather(*(index.refresh(load) for _ in range(5)))
+
+    assert loads == 1
+    assert build_threads and build_threads[0] is not threading.main_thread()
+    assert not index.is_stale() and len(index) == 4
+    assert [p.id for p in index.search("наушники", 1)] == [3]
+
+
+@pytest.mark.asyncio
+async def test_refresh_does_not_lose_an_upsert_made_during_the_build():
+    index = ProductIndex()
+
+    async def load():
+        return CATALOG
+
+    async def upsert_while_building():
+        await asyncio.sleep(0)
+        index.upsert(_product(5, "Монитор", "IPS 27 дюймов"))
+
+    await asyncio.gather(index.refresh(load), upsert_while_building())
+
+    # Снимок из БД подменил индекс, но следующий запрос перестроит его снова
+    assert index.is_stale()
@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message, Update
+
+from src.presentation.middlewares import LoggingMiddleware, setup_update_logging
+
+
+def _update(update_id: int = 1) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 77, "type": "private"},
+                "from": {"id": 77, "is_bot": False, "first_name": "U"},
+                "text": "hello",
+            },
+        }
+    )
+
+
+async def greet(message: Message) -> None:
+    return None
+
+
+def _dispatcher() -> Dispatcher:
+    dp = Dispatcher()
+    router = Router()
+    router.message.register(greet)
+    dp.include_router(router)
+    return dp
+
+
+@pytest.mark.asyncio
+async def test_update_is_logged_as_single_line(caplog):
+    dp = _dispatcher()
+    setup_update_logging(dp)
+    with caplog.at_level(logging.INFO, logger="bot.updates"):
+        await dp.feed_update(Bot(token="42:TEST"), _update())
+
+    records = [r.getMessage() for r in caplog.records if r.name == "bot.updates"]
+    assert len(records) == 1
+    line = records[0]
+    assert "\n" not in line
+    assert "type=message" in line
+    assert "chat=77" in line
+    assert "handler=greet" in line
+    assert "status=ok" in line
+
+
+@pytest.mark.asyncio
+async def test_full_dump_is_sampled(caplog):
+    rolls = iter([0.5, 0.001])
+    dp = _dispatcher()
+    dp.update.outer_middleware(LoggingMiddleware(0.01, rng=lambda: next(rolls)))
+    with caplog.at_level(logging.INFO, logger="bot.updates"):
+        await dp.feed_update(Bot(token="42:TEST"), _update(1))
+        await dp.feed_update(Bot(token="42:TEST"), _update(2))
+
+    dumps = [r.getMessage() for r in caplog.records if r.getMessage().startswith("update dump")]
+    assert len(dumps) == 1
+    assert '"update_id":2' in dumps[0]
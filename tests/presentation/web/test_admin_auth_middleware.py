@@ -0,0 +1,83 @@
+# tests/presentation/web/test_admin_auth_middleware.py
+
+import hashlib
+import hmac
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.presentation.web import middlewares
+from src.presentation.web.app_keys import REQUEST_ADMIN_USER
+
+SECRET = "s3cret"
+
+
+def _headers(user: str, secret: str = SECRET) -> dict:
+    token = hmac.new(secret.encode(), user.encode(), hashlib.sha256).hexdigest()
+    return {"X-Admin-Token": token, "X-Admin-User": user}
+
+
+def _client(admin_ids: str = "") -> TestClient:
+    async def whoami(request: web.Request) -> web.Response:
+        return web.json_response({"admin": request.get(REQUEST_ADMIN_USER)})
+
+    app = web.Application(
+        middlewares=[middlewares.admin_auth_middleware(secret_token=SECRET, admin_ids=admin_ids)]
+    )
+    app.router.add_get("/api/v1/admin/whoami", whoami)
+    app.router.add_route("OPTIONS", "/api/v1/admin/whoami", whoami)
+    app.router.add_get("/api/categories", whoami)
+    return TestClient(TestServer(app))
+
+
+@pytest.mark.asyncio
+async def test_valid_token_attaches_admin_identity():
+    async with _client() as client:
+        r = await client.get("/api/v1/admin/whoami", headers=_headers("42"))
+        assert r.status == 200
+        assert await r.json() == {"admin": "42"}
+
+
+@pytest.mark.asyncio
+async def test_rejects_bad_token_and_users_outside_admin_ids():
+    async with _client(admin_ids=" 1, 2 ,") as client:
+        r = await client.get("/api/v1/admin/whoami")
+        assert r.status == 401
+        assert (await r.json())["error"]["code"] == "unauthorized"
+
+        r = await client.get("/api/v1/admin/whoami", headers=_headers("1", secret="other"))
+        assert r.status == 401
+
+        r = await client.get("/api/v1/admin/whoami", headers=_headers("3"))
+        assert r.status == 401
+
+        r = await client.get("/api/v1/admin/whoami", headers=_headers("2"))
+        assert await r.json() == {"admin": "2"}
+
+
+@pytest.mark.asyncio
+async def test_public_routes_and_preflight_skip_auth():
+    async with _client() as client:
+        r = await client.get("/api/categories")
+        assert await r.json() == {"admin": None}
+        r = await client.options("/api/v1/admin/whoami")
+        assert r.status == 200
+
+
+@pytest.mark.asyncio
+async def test_verdict_is_cached_per_user_and_token(monkeypatch):
+    calls = []
+    real_new = hmac.new
+
+    def counting_new(*args, **kwargs):
+        calls.append(args[1])
+        return real_new(*args, **kwargs)
+
+    headers = _headers("42")
+    async with _client() as client:
+        monkeypatch.setattr(middlewares.hmac, "new", counting_new)
+        for _ in range(5):
+            r = await client.get("/api/v1/admin/whoami", headers=headers)
+            assert r.status == 200
+    assert calls == [b"42"]
@@ -0,0 +1,189 @@
+# tests/presentation/web/test_concurrency_limit.py
+
+import asyncio
+import hashlib
+import hmac
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.infrastructure.config import settings
+from src.presentation.web.app_keys import REQUEST_ADMIN_USER
+from src.presentation.web.concurrency import ConcurrencyLimiter, Shed, parse_concurrency
+from src.presentation.web.middlewares import _client_key, concurrency_limit_middleware
+
+
+def _signed_init_data(user_id: int) -> dict:
+    payload = {"auth_date": "1700000000", "user": {"id": user_id}}
+    secret_key = hashlib.sha256(settings.bot.token.get_secret_value().encode()).digest()
+    check_string = "\n".join(f"{k}={payload[k]}" for k in sorted(payload))
+    payload["hash"] = hmac.new(secret_key, check_string.encode(), hashlib.sha256).hexdigest()
+    return payload
+
+
+async def _settle():
+    # Передача слота проходит через несколько итераций цикла событий
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_parse_concurrency():
+    assert parse_concurrency("20/100") == (20, 100)
+    assert parse_concurrency("5") == (5, 0)
+    with pytest.raises(ValueError):
+        parse_concurrency("0/10")
+
+
+@pytest.mark.asyncio
+async def test_queue_hands_slots_over_in_fifo_order():
+    limiter = ConcurrencyLimiter(1, 2)
+    order = []
+
+    await limiter.acquire("a")
+
+    async def queued(key):
+        await limiter.acquire(key)
+        order.append(key)
+
+    waiters = [asyncio.create_task(queued(k)) for k in ("b", "c")]
+    await asyncio.sleep(0)
+    assert limiter.stats()["queue_depth"] == 2
+
+    with pytest.raises(Shed) as shed:
+        await limiter.acquire("d")
+    assert shed.value.reason == "queue_full"
+
+    limiter.release("a")
+    await _settle()
+    assert order == ["b"]
+    limiter.release("b")
+    await asyncio.gather(*waiters)
+    assert order == ["b", "c"]
+
+    limiter.release("c")
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+    assert stats["shed"]["queue_full"] == 1 and stats["max_queue_depth_seen"] == 2
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_cancellation_do_not_leak_slots():
+    limiter = ConcurrencyLimiter(1, 5, queue_timeout=0.01)
+    await limiter.acquire("a")
+
+    with pytest.raises(Shed) as shed:
+        await limiter.acquire("b")
+    assert shed.value.reason == "timeout"
+
+    limiter = ConcurrencyLimiter(1, 5, queue_timeout=10)
+    await limiter.acquire("a")
+    waiter = asyncio.create_task(limiter.acquire("b"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    limiter.release("a")
+
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+    await limiter.acquire("c")  # слот свободен
+
+
+@pytest.mark.asyncio
+async def test_per_key_cap_counts_queued_requests():
+    limiter = ConcurrencyLimiter(1, 10, per_key=2)
+    await limiter.acquire("user")
+    queued = asyncio.create_task(limiter.acquire("user"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Shed) as shed:
+        await limiter.acquire("user")
+    assert shed.value.reason == "per_key"
+
+    limiter.release("user")
+    await queued
+    limiter.release("user")
+    assert limiter.stats()["shed"]["per_key"] == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_with_503_and_keys_by_verified_webhook_sender():
+    release = asyncio.Event()
+
+    async def slow(request: web.Request) -> web.Response:
+        await release.wait()
+        return web.json_response(await request.json())
+
+    def update(user_id: int) -> dict:
+        return {"update_id": user_id, "message": {"from": {"id": user_id}}}
+
+    limiter = ConcurrencyLimiter(1, 1, per_key=1)
+    app = web.Application(
+        middlewares=[concurrency_limit_middleware({"/webhook": limiter}, webhook_secret="s3cret")]
+    )
+    app.router.add_post("/webhook", slow)
+    headers = {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+
+    async with TestClient(TestServer(app)) as client:
+        first = asyncio.create_task(client.post("/webhook", json=update(1), headers=headers))
+        await asyncio.sleep(0.05)
+
+        # Тот же пользователь уже в работе
+        r = await client.post("/webhook", json=update(1), headers=headers)
+        assert r.status == 429
+
+        second = asyncio.create_task(client.post("/webhook", json=update(2), headers=headers))
+        await asyncio.sleep(0.05)
+        r = await client.post("/webhook", json=update(3), headers=headers)
+        assert r.status == 503
+        assert r.headers["Retry-After"] == "1"
+        assert (await r.json())["error"]["code"] == "overloaded"
+
+        release.set()
+        responses = await asyncio.gather(first, second)
+        # Обработчик читает тело повторно после middleware
+        assert [await resp.json() for resp in responses] == [update(1), update(2)]
+
+    assert limiter.stats()["shed"] == {"queue_full": 1, "timeout": 0, "per_key": 1}
+
+
+@pytest.mark.asyncio
+async def test_client_key_trusts_only_verified_identities():
+    async def key(request: web.Request) -> web.Response:
+        return web.json_response({"key": await _client_key(request, "s3cret")})
+
+    async def admin(request: web.Request) -> web.Response:
+        # Так делает admin_auth_middleware после проверки токена
+        request[REQUEST_ADMIN_USER] = "7"
+        return await key(request)
+
+    app = web.Application()
+    app.router.add_post("/api/create_order", key)
+    app.router.add_post("/webhook", key)
+    app.router.add_get("/api/v1/admin/load", admin)
+
+    async def client_key(client, method, path, **kwargs):
+        resp = await client.request(method, path, **kwargs)
+        return (await resp.json())["key"]
+
+    async with TestClient(TestServer(app)) as client:
+        # Неподписанные id из тела и заголовок X-Admin-User не доверяются
+        spoofed = await client_key(
+            client, "POST", "/api/create_order",
+            json={"user": {"id": 1}}, headers={"X-Admin-User": "1"},
+        )
+        assert spoofed.startswith("ip:")
+        forged = await client_key(
+            client, "POST", "/api/create_order", json={"user": {"id": 1}, "hash": "00"}
+        )
+        assert forged.startswith("ip:")
+        wrong_secret = await client_key(
+            client, "POST", "/webhook",
+            json={"message": {"from": {"id": 1}}},
+            headers={"X-Telegram-Bot-Api-Secret-Token": "nope"},
+        )
+        assert wrong_secret.startswith("ip:")
+
+        assert await client_key(client, "POST", "/api/create_order", json=_signed_init_data(5)) == "tg:5"
+        assert await client_key(client, "GET", "/api/v1/admin/load") == "tg:7"
@@ -0,0 +1,37 @@
+# tests/presentation/web/test_cursor_pagination.py
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from src.presentation.web.api_handlers import (
+    _encode_cursor,
+    _next_cursor,
+    _parse_cursor,
+)
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor("2025-01-01T10:00:00", 15)
+
+    request = make_mocked_request("GET", f"/api/v1/admin/orders?after={cursor}")
+
+    assert _parse_cursor(request) == ["2025-01-01T10:00:00", 15]
+
+
+def test_missing_cursor_keeps_offset_mode():
+    request = make_mocked_request("GET", "/api/v1/admin/orders?limit=10&offset=20")
+
+    assert _parse_cursor(request) is None
+
+
+def test_broken_cursor_is_rejected():
+    request = make_mocked_request("GET", "/api/v1/admin/orders?after=!!not-base64")
+
+    with pytest.raises(ValueError):
+        _parse_cursor(request)
+
+
+def test_next_cursor_only_for_full_page():
+    assert _next_cursor([1, 2, 3], 3, lambda x: (x,)) == _encode_cursor(3)
+    assert _next_cursor([1, 2], 3, lambda x: (x,)) is None
+    assert _next_cursor([1, 2, 3], 0, lambda x: (x,)) is None
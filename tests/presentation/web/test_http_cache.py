@@ -0,0 +1,81 @@
+# tests/presentation/web/test_http_cache.py
+
+import gzip
+import json
+import threading
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from src.infrastructure.memory.catalog_cache import CatalogSnapshot
+from src.presentation.web.http_cache import snapshot_response
+
+PAYLOAD = [{"id": i, "name": f"Товар {i}", "price": 100.0, "category_id": 1} for i in range(50)]
+
+
+def _get(headers: dict | None = None):
+    return make_mocked_request("GET", "/api/products?category_id=1", headers=headers or {})
+
+
+def test_snapshot_is_encoded_once_with_content_hash_etag():
+    snapshot = CatalogSnapshot.from_payload(PAYLOAD)
+
+    assert json.loads(snapshot.body) == PAYLOAD
+    assert gzip.decompress(snapshot.gzip) == snapshot.body
+    assert snapshot.etag.startswith('W/"')
+    assert CatalogSnapshot.from_payload(PAYLOAD).etag == snapshot.etag
+    assert CatalogSnapshot.from_payload(PAYLOAD[:-1]).etag != snapshot.etag
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_built_off_the_event_loop(monkeypatch):
+    threads = []
+    from_payload = CatalogSnapshot.from_payload.__func__
+
+    def tracking(cls, payload):
+        threads.append(threading.current_thread())
+        return from_payload(cls, payload)
+
+    monkeypatch.setattr(CatalogSnapshot, "from_payload", classmethod(tracking))
+
+    snapshot = await CatalogSnapshot.build(PAYLOAD)
+
+    assert threads[0] is not threading.main_thread()
+    assert json.loads(snapshot.body) == PAYLOAD
+
+
+def test_matching_if_none_match_returns_304():
+    snapshot = CatalogSnapshot.from_payload(PAYLOAD)
+    opaque = snapshot.etag.removeprefix("W/")
+
+    for header in (snapshot.etag, opaque, f'"other", {snapshot.etag}', "*"):
+        resp = snapshot_response(_get({"If-None-Match": header}), snapshot)
+        assert resp.status == 304
+        assert resp.headers["ETag"] == snapshot.etag
+        assert resp.body is None
+
+    resp = snapshot_response(_get({"If-None-Match": '"other"'}), snapshot)
+    assert resp.status == 200
+
+
+def test_picks_precompressed_variant_by_accept_encoding():
+    snapshot = CatalogSnapshot.from_payload(PAYLOAD)
+
+    resp = snapshot_response(_get({"Accept-Encoding": "gzip, deflate"}), snapshot)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.body is snapshot.gzip
+    assert resp.headers["Vary"] == "Accept-Encoding"
+
+    for accept in ("", "gzip;q=0", "identity"):
+        resp = snapshot_response(_get({"Accept-Encoding": accept}), snapshot)
+        assert "Content-Encoding" not in resp.headers
+        assert resp.body is snapshot.body
+        assert resp.content_type == "application/json"
+
+
+def test_tiny_payload_is_not_compressed():
+    snapshot = CatalogSnapshot.from_payload([])
+
+    assert snapshot.gzip is None and snapshot.br is None
+    resp = snapshot_response(_get({"Accept-Encoding": "gzip, br"}), snapshot)
+    assert resp.body == b"[]"
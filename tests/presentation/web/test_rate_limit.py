@@ -0,0 +1,123 @@
+# tests/presentation/web/test_rate_limit.py
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.presentation.web.middlewares import rate_limit_middleware
+from src.infrastructure.memory.rate_limit import GcraRateLimiter, parse_limit
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_limit():
+    assert parse_limit("120/60") == (120, 60.0)
+    with pytest.raises(ValueError):
+        parse_limit("0/60")
+
+
+def test_allows_burst_then_one_request_per_interval():
+    clock = _Clock()
+    limiter = GcraRateLimiter(10, 3, clock=clock)
+
+    assert all(limiter.hit("a") == 0 for _ in range(10))
+    retry_after = limiter.hit("a")
+    assert retry_after == pytest.approx(0.3, abs=1e-6)
+    assert limiter.hit("b") == 0  # у другого ключа свой лимит
+
+    clock.now += 0.3
+    assert limiter.hit("a") == 0
+    assert limiter.hit("a") > 0
+
+
+def test_idle_keys_are_swept_and_key_count_is_capped():
+    clock = _Clock()
+    limiter = GcraRateLimiter(120, 60, max_keys=100, clock=clock)
+
+    for i in range(1000):
+        limiter.hit(f"rotating-{i}")
+    assert len(limiter) == 100
+
+    # Через interval состояние всех ключей совпадает с новым — они вычищаются
+    clock.now += 0.5
+    limiter.hit("fresh")
+    assert len(limiter) == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_applies_longest_prefix_and_sets_retry_after():
+    async def ok(request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    clock = _Clock()
+    app = web.Application(
+        middlewares=[
+            rate_limit_middleware(
+                limits={"/api/v1/admin": "3/60", "/api/v1/admin/orders": "1/60"},
+                clock=clock,
+            )
+        ]
+    )
+    app.router.add_get("/api/v1/admin/products", ok)
+    app.router.add_get("/api/v1/admin/orders", ok)
+    app.router.add_get("/api/categories", ok)
+
+    headers = {"X-Admin-User": "1"}
+    async with TestClient(TestServer(app)) as client:
+        statuses = [(await client.get("/api/v1/admin/products", headers=headers)).status for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+
+        assert (await client.get("/api/v1/admin/orders", headers=headers)).status == 200
+        r = await client.get("/api/v1/admin/orders", headers=headers)
+        assert r.status == 429
+        assert r.headers["Retry-After"] == "60"
+        assert (await r.json())["error"] == "rate_limited"
+
+        for _ in range(10):
+            assert (await client.get("/api/categories")).status == 200
+
+
+@pytest.mark.asyncio
+async def test_workers_sharing_a_backend_share_the_limit():
+    from src.infrastructure.memory.rate_limit import InMemoryRateLimitBackend
+    from src.presentation.web.app_keys import APP_RATE_LIMIT_BACKEND
+
+    async def ok(request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    shared = InMemoryRateLimitBackend()
+    clients = []
+    for _ in range(2):
+        app = web.Application(middlewares=[rate_limit_middleware(limits={"/api/v1/admin": "2/60"})])
+        app[APP_RATE_LIMIT_BACKEND] = shared
+        app.router.add_get("/api/v1/admin/orders", ok)
+        clients.append(TestClient(TestServer(app)))
+
+    headers = {"X-Admin-User": "1"}
+    async with clients[0] as first, clients[1] as second:
+        assert (await first.get("/api/v1/admin/orders", headers=headers)).status == 200
+        assert (await second.get("/api/v1/admin/orders", headers=headers)).status == 200
+        assert (await first.get("/api/v1/admin/orders", headers=headers)).status == 429
+        assert (await second.get("/api/v1/admin/orders", headers=headers)).status == 429
+
+
+@pytest.mark.asyncio
+async def test_rotating_admin_header_does_not_escape_the_limit():
+    async def ok(request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    app = web.Application(middlewares=[rate_limit_middleware(limits={"/api/v1/admin": "2/60"})])
+    app.router.add_get("/api/v1/admin/orders", ok)
+
+    async with TestClient(TestServer(app)) as client:
+        statuses = [
+            (await client.get("/api/v1/admin/orders", headers={"X-Admin-User": str(i)})).status
+            for i in range(3)
+        ]
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,61 @@
+# tests/presentation/web/test_telegram_auth.py
+
+import hashlib
+import hmac
+
+import pytest
+
+from src.infrastructure.config import settings
+from src.presentation.web.auth import telegram as auth
+
+
+def _signed(user_id: int = 42) -> dict:
+    payload = {"auth_date": "1700000000", "user": {"id": user_id, "first_name": "T"}}
+    secret_key = hashlib.sha256(settings.bot.token.get_secret_value().encode()).digest()
+    check_string = "\n".join(f"{k}={payload[k]}" for k in sorted(payload))
+    payload["hash"] = hmac.new(secret_key, check_string.encode(), hashlib.sha256).hexdigest()
+    return payload
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    auth._verified.clear()
+    yield
+    auth._verified.clear()
+
+
+@pytest.mark.asyncio
+async def test_valid_payload_is_verified_once_and_not_mutated(monkeypatch):
+    payload = _signed()
+    original = dict(payload)
+
+    first = await auth.validate_telegram_data(payload)
+    assert first["status"] == "ok" and first["user_id"] == 42
+    assert payload == original
+
+    # Повтор обслуживается кэшем, HMAC подписи не пересчитывается
+    monkeypatch.setattr(auth, "_check_signature", lambda data: pytest.fail("not cached"))
+    assert await auth.validate_telegram_data(dict(payload)) == first
+
+
+@pytest.mark.asyncio
+async def test_cached_hash_with_other_fields_is_rejected():
+    payload = _signed(user_id=42)
+    assert (await auth.validate_telegram_data(payload))["status"] == "ok"
+
+    forged = dict(payload, user={"id": 1, "first_name": "T"})
+    result = await auth.validate_telegram_data(forged)
+    assert result == {"status": "error", "message": "invalid_signature"}
+
+
+@pytest.mark.asyncio
+async def test_cache_entry_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth, "_clock", lambda: now[0])
+    payload = _signed()
+    await auth.validate_telegram_data(payload)
+    assert payload["hash"] in auth._verified
+
+    now[0] += auth._VERIFIED_TTL
+    assert auth._cached_result(payload) is None
+    assert payload["hash"] not in auth._verified
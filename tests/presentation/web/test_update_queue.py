@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from src.presentation.web.update_queue import UpdateQueue
+
+
+class _RecordingDispatcher:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.seen: list[int] = []
+
+    async def feed_update(self, bot, update):
+        await asyncio.sleep(self.delay)
+        self.seen.append(update.update_id)
+
+
+def _message(update_id: int, chat_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "text": "hi",
+        },
+    }
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_per_chat_order_is_preserved():
+    dispatcher = _RecordingDispatcher(delay=0.001)
+    queue = UpdateQueue(dispatcher, bot=None, workers=3, max_size=100)
+    queue.start()
+    for update_id in range(1, 21):
+        assert queue.submit(_message(update_id, chat_id=update_id % 2))
+    await queue.stop()
+
+    assert sorted(dispatcher.seen) == list(range(1, 21))
+    odd = [u for u in dispatcher.seen if u % 2]
+    even = [u for u in dispatcher.seen if not u % 2]
+    assert odd == sorted(odd)
+    assert even == sorted(even)
+    assert queue.stats()["processed"] == 20
+
+
+@pytest.mark.asyncio
+async def test_redelivery_is_dropped_until_ttl_expires():
+    clock = _Clock()
+    dispatcher = _RecordingDispatcher()
+    queue = UpdateQueue(dispatcher, bot=None, workers=1, dedup_ttl=60, clock=clock)
+    queue.start()
+    assert queue.submit(_message(1, chat_id=7))
+    assert queue.submit(_message(1, chat_id=7))
+    clock.now = 61
+    assert queue.submit(_message(1, chat_id=7))
+    await queue.stop()
+
+    assert dispatcher.seen == [1, 1]
+    assert queue.stats()["duplicates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_without_remembering_update():
+    dispatcher = _RecordingDispatcher()
+    queue = UpdateQueue(dispatcher, bot=None, workers=1, max_size=1)
+    assert queue.submit(_message(1, chat_id=7))
+    assert not queue.submit(_message(2, chat_id=7))
+
+    queue.start()
+    await queue.stop()
+    # Отвергнутое обновление при повторной доставке принимается
+    assert queue.submit(_message(2, chat_id=7))
+    assert queue.stats()["rejected_full"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_update_does_not_stop_worker():
+    class _Failing(_RecordingDispatcher):
+        async def feed_update(self, bot, update):
+            if update.update_id == 1:
+                raise RuntimeError("boom")
+            await super().feed_update(bot, update)
+
+    dispatcher = _Failing()
+    queue = UpdateQueue(dispatcher, bot=None, workers=1)
+    queue.start()
+    queue.submit(_message(1, chat_id=7))
+    queue.submit(_message(2, chat_id=7))
+    await queue.stop()
+
+    assert dispatcher.seen == [2]
+    assert queue.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_chat_does_not_block_other_chats():
+    release = asyncio.Event()
+
+    class _Blocking(_RecordingDispatcher):
+        async def feed_update(self, bot, update):
+            if update.update_id == 1:
+                await release.wait()
+            await super().feed_update(bot, update)
+
+    dispatcher = _Blocking()
+    queue = UpdateQueue(dispatcher, bot=None, workers=2)
+    queue.start()
+    # Чаты 1 и 3 при шардировании chat_id % 2 попали бы к одному воркеру
+    queue.submit(_message(1, chat_id=1))
+    queue.submit(_message(2, chat_id=1))
+    for update_id in range(3, 7):
+        queue.submit(_message(update_id, chat_id=3))
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+    # Чат 3 обработан целиком, второе обновление чата 1 ждёт первое
+    assert dispatcher.seen == [3, 4, 5, 6]
+    assert queue.stats()["active_chats"] == 1
+
+    release.set()
+    await queue.stop()
+    assert dispatcher.seen == [3, 4, 5, 6, 1, 2]